@@ -4,13 +4,74 @@ Shared Check Runner - Inove AI Framework
 =========================================
 Common utilities for checklist.py and verify_all.py.
 Provides Colors, print helpers, and check execution logic.
+
+Each check runs in its own process group: a timeout or cancellation kills
+everything the check spawned (e.g. build workers), and the CPU time and
+peak RSS of each check are reported in the summary.
+
+Check output is streamed line by line to the console and to a rotating log
+per check (.agents/logs/checks/<check>.log); only a bounded tail of each
+stream is kept in memory for the summary.
+
+Checks that declare input globs are cached under .agents/cache/checks/:
+the pass/fail result and output are reused while the command and the
+content of every input file are unchanged, and reported as "cached".
 """
 
 import sys
+import hashlib
+import json
+import os
+import re
+import signal
 import subprocess
+import threading
+import time
 from pathlib import Path
+from collections import deque
 from datetime import datetime
-from typing import List, Optional
+from typing import IO, Dict, List, Optional
+
+# How often a running check looks at its cancel event (seconds)
+_CANCEL_POLL = 0.2
+
+CHECK_CACHE_DIR = Path(".agents") / "cache" / "checks"
+CHECK_CACHE_VERSION = 1
+CHECK_LOG_DIR = Path(".agents") / "logs" / "checks"
+
+# Output kept in memory per stream (the full output goes to the log)
+_TAIL_LINES = 200
+_MAX_LINE_CHARS = 2000
+
+# Above this size a check log rolls over to <check>.log.1
+_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+# Console lines from parallel checks must not interleave mid-line
+_print_lock = threading.Lock()
+
+# Never part of a check's inputs (dependencies, build output, VCS)
+_SKIP_DIRS = {".git", "node_modules", ".next", "__pycache__", ".pytest_cache"}
+
+# Files modified this recently may change again within the same mtime tick,
+# so their digest is recomputed on the next run instead of being trusted
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Input globs of the standard checks, relative to the check's working directory
+FRAMEWORK_INPUTS = [
+    "*.md", ".agents/*.md", ".agents/.shared/**", ".agents/agents/**", ".agents/config/**",
+    ".agents/rules/**", ".agents/scripts/**", ".agents/skills/**", ".agents/workflows/**",
+    ".claude/**", ".codex/**", ".gemini/**", "squads/**",
+]
+TRACEABILITY_INPUTS = [
+    "docs/BACKLOG.md", "docs/planning/0*.md",
+    ".agents/scripts/validate_traceability.py", ".agents/scripts/backlog_index.py",
+]
+WEB_TYPECHECK_INPUTS = ["src/**", "*.ts", "tsconfig*.json", "package.json", "package-lock.json"]
+WEB_LINT_INPUTS = ["src/**", "*.ts", "*.mjs", "*.js", "package.json", "package-lock.json"]
+# next build also runs the prebuild data generation over ../.agents
+WEB_BUILD_INPUTS = ["src/**", "public/**", "*.ts", "*.mjs", "*.json"] + [
+    f"../{pattern}" for pattern in FRAMEWORK_INPUTS if pattern.startswith(".agents/")
+]
 
 
 class Colors:
@@ -46,56 +107,404 @@ def print_error(text: str):
     print(f"{Colors.RED}❌ {text}{Colors.ENDC}")
 
 
-def run_check(name: str, cmd: list, cwd: str, timeout: int = 300) -> dict:
+# ---------------------------------------------------------------------------
+# Result cache (content hash of the declared inputs + command)
+# ---------------------------------------------------------------------------
+
+def _glob_regex(pattern: str) -> "re.Pattern":
+    """'**' spans directories, '*' and '?' stay within one path component."""
+    regex = ""
+    for token in re.split(r"(\*\*/?|\*|\?)", pattern):
+        if token in ("**/", "**"):
+            regex += "(?:.*/)?" if token == "**/" else ".*"
+        elif token == "*":
+            regex += "[^/]*"
+        elif token == "?":
+            regex += "[^/]"
+        else:
+            regex += re.escape(token)
+    return re.compile(regex)
+
+
+def expand_inputs(root: Path, patterns: List[str]) -> List[Path]:
+    """
+    Files matched by input globs, relative to root (sorted, deduplicated).
+
+    Only the directory before the first wildcard is walked, and patterns
+    without '**' stop at their own depth.
+    """
+    files = set()
+    for pattern in patterns:
+        parts = pattern.replace(os.sep, "/").split("/")
+        if not parts[0]:
+            parts[0] = "/"  # Absolute path (e.g. the script of a script check)
+        static = 0
+        while static < len(parts) and not any(c in parts[static] for c in "*?["):
+            static += 1
+        base = root.joinpath(*parts[:static]) if static else root
+        rest = "/".join(parts[static:])
+        if not rest:
+            if base.is_file() or base.is_symlink():
+                files.add(base)
+            continue
+
+        regex = _glob_regex(rest)
+        max_depth = None if "**" in rest else rest.count("/")
+        for dirpath, dirnames, filenames in os.walk(base):
+            rel_dir = os.path.relpath(dirpath, base).replace(os.sep, "/")
+            depth = 0 if rel_dir == "." else rel_dir.count("/") + 1
+            if max_depth is not None and depth >= max_depth:
+                dirnames[:] = []
+            else:
+                dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+            if max_depth is not None and depth > max_depth:
+                continue
+            for filename in filenames:
+                rel = filename if rel_dir == "." else f"{rel_dir}/{filename}"
+                if regex.fullmatch(rel):
+                    files.add(Path(dirpath) / filename)
+    return sorted(files)
+
+
+class _CheckCache:
+    """Cached result of one check, valid while its command and inputs are unchanged."""
+
+    def __init__(self, cache_dir: Path, name: str, cmd: list, cwd: str, inputs: List[str]):
+        self.cmd = [str(c) for c in cmd]
+        self.cwd = Path(cwd)
+        self.inputs = inputs
+        ident = json.dumps([name, str(self.cwd.resolve()), self.cmd])
+        self.path = Path(cache_dir) / f"{hashlib.sha256(ident.encode()).hexdigest()[:16]}.json"
+        try:
+            entry = json.loads(self.path.read_text(encoding="utf-8"))
+            self.entry = entry if entry.get("version") == CHECK_CACHE_VERSION else {}
+        except (OSError, ValueError):
+            self.entry = {}
+        self.files: Dict[str, list] = {}
+        self.key = self._input_key()
+
+    def _input_key(self) -> str:
+        """sha256 over the command and the (path, content digest) of every input."""
+        known = self.entry.get("files", {})
+        digest = hashlib.sha256(json.dumps(self.cmd).encode())
+        now_ns = time.time_ns()
+        for path in expand_inputs(self.cwd, self.inputs):
+            rel = os.path.relpath(path, self.cwd).replace(os.sep, "/")
+            try:
+                st = path.lstat()
+                stamp = [st.st_mtime_ns, st.st_size]
+                memo = known.get(rel)
+                if memo and memo[:2] == stamp:
+                    sha = memo[2]
+                elif path.is_symlink():
+                    sha = "link:" + os.readlink(path)
+                else:
+                    sha = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                continue  # Vanished while hashing
+            if now_ns - stamp[0] >= _RACY_WINDOW_NS:
+                self.files[rel] = stamp + [sha]
+            digest.update(f"{rel}\0{sha}\n".encode())
+        return digest.hexdigest()
+
+    def lookup(self) -> Optional[dict]:
+        if self.entry.get("key") != self.key:
+            return None
+        return self.entry.get("result")
+
+    def store(self, result: dict) -> None:
+        entry = {"version": CHECK_CACHE_VERSION, "key": self.key, "files": self.files, "result": result}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # Cache is best-effort
+
+
+# ---------------------------------------------------------------------------
+# Output capture (console + rotating log + bounded tail)
+# ---------------------------------------------------------------------------
+
+class _RotatingLog:
+    """Append-only check log that rolls over to .1 when it grows past max_bytes."""
+
+    def __init__(self, path: Path, max_bytes: int = _LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8", errors="replace")
+        self._size = self._file.tell()
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            if self._size >= self.max_bytes:
+                self._file.close()
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+                self._file = open(self.path, "w", encoding="utf-8", errors="replace")
+                self._size = 0
+            self._file.write(text)
+            self._size += len(text)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _log_path(log_dir: Path, name: str) -> Path:
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "check"
+    return Path(log_dir) / f"{slug}.log"
+
+
+class _StreamTail:
+    """Drains one pipe: echoes each line, logs it, and keeps the last lines."""
+
+    def __init__(self, stream: IO[str], label: str, log: Optional[_RotatingLog],
+                 started: float, echo: Optional[str]):
+        self.lines = deque(maxlen=_TAIL_LINES)
+        self.total = 0
+        self._args = (stream, label, log, started, echo)
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self) -> None:
+        stream, label, log, started, echo = self._args
+        for line in iter(stream.readline, ""):
+            self.total += 1
+            if len(line) > _MAX_LINE_CHARS:
+                line = line[:_MAX_LINE_CHARS] + "…\n"
+            self.lines.append(line)
+            if log is not None:
+                log.write(f"[{time.monotonic() - started:7.1f}s] {label}: {line}")
+            if echo:
+                with _print_lock:
+                    print(f"  {echo} │ {line}", end="" if line.endswith("\n") else "\n", flush=True)
+        stream.close()
+
+    def text(self) -> str:
+        omitted = self.total - len(self.lines)
+        head = f"... ({omitted} earlier line(s) omitted)\n" if omitted > 0 else ""
+        return head + "".join(self.lines)
+
+
+# ---------------------------------------------------------------------------
+# Process groups and resource accounting
+# ---------------------------------------------------------------------------
+
+def _group_popen_kwargs() -> dict:
+    """Popen arguments that start the check as the leader of a new process group."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    """Kill the check and everything it spawned that is still in its group."""
+    try:
+        if os.name == "nt":
+            subprocess.call(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass  # Group already gone
+
+
+# os.waitid(WNOWAIT) to see the exit without reaping, os.wait4 for the rusage
+_WAIT4 = hasattr(os, "wait4") and hasattr(os, "waitid")
+
+
+def _wait_exit(proc: subprocess.Popen, timeout: float) -> bool:
+    """
+    Wait up to 'timeout' seconds for the check to exit, without reaping it.
+
+    Until it is reaped the leader's pid cannot be reused, so _kill_group()
+    cannot hit the group of another check started meanwhile.
+    """
+    if not _WAIT4:
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        return True
+    flags = os.WEXITED | os.WNOHANG | os.WNOWAIT
+    if os.waitid(os.P_PID, proc.pid, flags) is None:
+        time.sleep(timeout)
+        return os.waitid(os.P_PID, proc.pid, flags) is not None
+    return True
+
+
+def _reap(proc: subprocess.Popen):
+    """
+    Wait for the check to end and return its rusage (None where os.wait4
+    does not exist).
+
+    wait4 gives the usage of this child and the descendants it reaped, so
+    checks running in parallel threads do not pollute each other's numbers
+    (a RUSAGE_CHILDREN delta would count every child the process reaped).
+    """
+    if not _WAIT4:
+        proc.wait()
+        return None
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage
+
+
+def _usage_fields(usage) -> dict:
+    """Result fields for a rusage: cpu (user + system seconds) and max_rss_mb."""
+    if usage is None:
+        return {}
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    rss_unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {"cpu": usage.ru_utime + usage.ru_stime,
+            "max_rss_mb": usage.ru_maxrss / rss_unit}
+
+
+# ---------------------------------------------------------------------------
+# Running checks
+# ---------------------------------------------------------------------------
+
+def run_check(name: str, cmd: list, cwd: str, timeout: int = 300,
+              cancel: Optional[threading.Event] = None,
+              inputs: Optional[List[str]] = None, cache_dir: Optional[Path] = None,
+              log_dir: Optional[Path] = None, echo: bool = True) -> dict:
     """
     Run a validation command and capture results.
 
     Args:
         name: Display name for the check
-        cmd: Command list for subprocess.run
+        cmd: Command list for subprocess.Popen
         cwd: Working directory
         timeout: Timeout in seconds (default 5 minutes)
+        cancel: When set while the check runs, the command is killed and the
+            check is reported as skipped (used by --stop-on-fail)
+        inputs: Globs (relative to cwd) of the files the check depends on;
+            with cache_dir, an unchanged command + inputs reuses the last result
+        cache_dir: Result cache directory (normally <project>/.agents/cache/checks)
+        log_dir: Directory of the per-check logs with the full, timestamped
+            output (normally <project>/.agents/logs/checks)
+        echo: Stream the output to the console while the check runs
 
     Returns:
         dict with keys: name, passed, output, error, skipped, duration
+        (plus cancelled=True for a cancelled check, cached=True for a reused
+        result, log=<path> when logged, cpu + max_rss_mb where the platform
+        reports them). output/error hold the last lines only.
     """
+    cache = _CheckCache(cache_dir, name, cmd, cwd, inputs) if inputs and cache_dir else None
+    cached = cache.lookup() if cache else None
+    if cached is not None:
+        if cached["passed"]:
+            print_success(f"{name}: PASSED (cached)")
+        else:
+            print_error(f"{name}: FAILED (cached)")
+        return {**cached, "name": name, "cached": True}
+
+    log = None
+    if log_dir is not None:
+        try:
+            log = _RotatingLog(_log_path(log_dir, name))
+            log.write(f"=== {datetime.now().isoformat(timespec='seconds')} {' '.join(map(str, cmd))} (cwd: {cwd})\n")
+        except OSError:
+            log = None  # Logging is best-effort
+    try:
+        result = _run_command(name, cmd, cwd, timeout, cancel, log, echo)
+    finally:
+        if log is not None:
+            log.close()
+    if log is not None:
+        result["log"] = str(log.path)
+    if cache and result.pop("completed", False):
+        cache.store(result)
+    return result
+
+
+def _run_command(name: str, cmd: list, cwd: str, timeout: int,
+                 cancel: Optional[threading.Event], log: Optional[_RotatingLog] = None,
+                 echo: bool = True) -> dict:
+    """run_check() without the cache; completed=True when the command ran to its exit."""
     print_step(f"Running: {name}")
     start_time = datetime.now()
+    started = time.monotonic()
 
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=timeout,
-            cwd=cwd
+            errors="replace",
+            bufsize=1,
+            cwd=cwd,
+            **_group_popen_kwargs()
         )
+        prefix = name if echo else None
+        out = _StreamTail(proc.stdout, "out", log, started, prefix)
+        err = _StreamTail(proc.stderr, "err", log, started, prefix)
+
+        outcome = None
+        deadline = started + timeout
+        poll = 0.01
+        try:
+            while outcome is None:
+                if _wait_exit(proc, poll):
+                    outcome = "exited"
+                elif cancel is not None and cancel.is_set():
+                    outcome = "cancelled"
+                elif time.monotonic() >= deadline:
+                    outcome = "timeout"
+                poll = min(poll * 2, _CANCEL_POLL)
+        except BaseException:
+            # Ctrl-C only reaches this process: the check has its own session
+            _kill_group(proc)
+            _reap(proc)
+            raise
+        # Also sweeps up processes the check left running after it exited
+        _kill_group(proc)
+        usage = _reap(proc)
+        for tail in (out, err):
+            # A process that escaped the group may still hold the pipe open
+            tail.thread.join(None if outcome == "exited" else 1)
 
         duration = (datetime.now() - start_time).total_seconds()
-        passed = result.returncode == 0
+        resources = _usage_fields(usage)
+        if log is not None:
+            log.write(f"=== {outcome} after {duration:.1f}s (exit code {proc.returncode})"
+                      f"{_format_resources(resources)}\n")
+
+        if outcome == "cancelled":
+            print_warning(f"{name}: CANCELLED ({duration:.1f}s)")
+            return {"name": name, "passed": True, "output": out.text(), "error": "Cancelled",
+                    "skipped": True, "cancelled": True, "duration": duration, **resources}
+        if outcome == "timeout":
+            print_error(f"{name}: TIMEOUT (>{duration:.0f}s)")
+            return {"name": name, "passed": False, "output": out.text(), "error": "Timeout",
+                    "skipped": False, "duration": duration, **resources}
+
+        stdout, stderr = out.text(), err.text()
+        passed = proc.returncode == 0
 
         if passed:
             print_success(f"{name}: PASSED ({duration:.1f}s)")
         else:
             print_error(f"{name}: FAILED ({duration:.1f}s)")
-            if result.stderr:
-                print(f"  Error: {result.stderr[:300]}")
+            if stderr:
+                print(f"  Error: {stderr[-300:]}")
 
         return {
             "name": name,
             "passed": passed,
-            "output": result.stdout,
-            "error": result.stderr,
+            "output": stdout,
+            "error": stderr,
             "skipped": False,
-            "duration": duration
+            "duration": duration,
+            "completed": True,
+            **resources
         }
 
-    except subprocess.TimeoutExpired:
-        duration = (datetime.now() - start_time).total_seconds()
-        print_error(f"{name}: TIMEOUT (>{duration:.0f}s)")
-        return {"name": name, "passed": False, "output": "", "error": "Timeout",
-                "skipped": False, "duration": duration}
-
     except Exception as e:
         duration = (datetime.now() - start_time).total_seconds()
         print_error(f"{name}: ERROR - {str(e)}")
@@ -104,7 +513,9 @@ def run_check(name: str, cmd: list, cwd: str, timeout: int = 300) -> dict:
 
 
 def run_script_check(name: str, script_path: Path, project_path: str,
-                     timeout: int = 300) -> dict:
+                     timeout: int = 300, cancel: Optional[threading.Event] = None,
+                     inputs: Optional[List[str]] = None, cache_dir: Optional[Path] = None,
+                     log_dir: Optional[Path] = None, echo: bool = True) -> dict:
     """
     Run a Python script check.
 
@@ -113,6 +524,8 @@ def run_script_check(name: str, script_path: Path, project_path: str,
         script_path: Path to the Python script
         project_path: Working directory
         timeout: Timeout in seconds
+        cancel, inputs, cache_dir, log_dir, echo: See run_check (the script
+            itself is always one of the inputs)
 
     Returns:
         Result dict (same format as run_check)
@@ -123,7 +536,9 @@ def run_script_check(name: str, script_path: Path, project_path: str,
                 "skipped": True, "duration": 0}
 
     cmd = [sys.executable, str(script_path)]
-    return run_check(name, cmd, project_path, timeout)
+    if inputs is not None:
+        inputs = list(inputs) + [str(script_path)]
+    return run_check(name, cmd, project_path, timeout, cancel, inputs, cache_dir, log_dir, echo)
 
 
 def print_summary(results: List[dict], show_duration: bool = False,
@@ -133,7 +548,8 @@ def print_summary(results: List[dict], show_duration: bool = False,
 
     Args:
         results: List of check result dicts
-        show_duration: Include duration info per check
+        show_duration: Include duration info per check (CPU seconds and
+            peak RSS are shown whenever the check reports them)
         show_categories: Group results by category
 
     Returns:
@@ -189,7 +605,18 @@ def _print_result_line(r: dict, show_duration: bool = False, indent: str = ""):
         status = f"{Colors.RED}❌{Colors.ENDC}"
 
     duration_str = ""
-    if show_duration and not r.get("skipped") and r.get("duration"):
-        duration_str = f" ({r['duration']:.1f}s)"
+    if r.get("cached"):
+        duration_str = " (cached)"
+    elif not r.get("skipped"):
+        parts = [f"{r['duration']:.1f}s"] if show_duration and r.get("duration") else []
+        if "cpu" in r:
+            parts += [f"cpu {r['cpu']:.1f}s", f"rss {r['max_rss_mb']:.0f} MB"]
+        duration_str = f" ({', '.join(parts)})" if parts else ""
 
     print(f"{indent}{status} {r['name']}{duration_str}")
+
+
+def _format_resources(resources: dict) -> str:
+    if not resources:
+        return ""
+    return f", cpu {resources['cpu']:.1f}s, max rss {resources['max_rss_mb']:.0f} MB"
@@ -24,6 +24,7 @@ from typing import List, Optional, Tuple
 # Ensure the scripts directory is in sys.path for sibling imports
 sys.path.insert(0, str(Path(__file__).parent))
 from platform_compat import get_agent_source, find_backlog
+from backlog_index import load_backlog
 
 
 def extract_task_ids_from_text(text: str) -> List[str]:
@@ -94,21 +95,12 @@ def get_pending_tasks(backlog_path: Path) -> List[Tuple[str, str]]:
     Returns:
         Lista de tuplas (task_id, task_title)
     """
-    content = backlog_path.read_text(encoding='utf-8')
-
-    # Regex para tarefas pendentes: "- [ ] **Story X.X:** Título"
-    pattern = re.compile(
-        r'-\s*\[\s*\]\s*\*\*(?:Story|Epic)\s+(\d+(?:\.\d+)?):\*\*\s*(.+?)(?:\n|$)',
-        re.IGNORECASE
-    )
-
-    tasks = []
-    for match in pattern.finditer(content):
-        task_id = match.group(1)
-        task_title = match.group(2).strip()
-        tasks.append((task_id, task_title))
+    backlog = load_backlog(backlog_path)
+    if backlog is None:
+        return []
 
-    return tasks
+    # Tarefas pendentes (lean ou fat): "- [ ] Story X.X: Título" / "- [ ] **Story X.X:** Título"
+    return [(item.id, item.title) for item in backlog.pending()]
 
 
 def suggest_completion_candidates(
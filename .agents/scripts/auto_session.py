@@ -18,6 +18,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from platform_compat import get_agent_source, find_logs_dir, ensure_docs_structure
+from session_store import SessionStore
 
 SESSION_PATHS = [
     Path(".agents/.session_state.json"),
@@ -378,6 +379,12 @@ def end_session(activities: str = None, quick: bool = False) -> bool:
 
     update_daily_log_end(session)
 
+    # Mirror the finished session into the structured session store
+    try:
+        SessionStore(find_logs_dir(auto_create=True)).sync_day(session['date'])
+    except Exception as e:
+        print(f"Nota: Não foi possível atualizar o session store: {e}")
+
     clear_session()
 
     badge = _agent_badge(session['agent'])
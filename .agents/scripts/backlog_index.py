@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Backlog Index - Inove AI Framework
+Single-pass parser for BACKLOG.md shared by every script that reads the backlog.
+
+Builds a typed tree (epics, stories, top-level checkboxes with their byte
+offsets, owner/model tags) in one pass over the file and caches it on disk,
+keyed by the backlog's mtime and size, so repeat invocations skip parsing.
+
+Usage:
+    from backlog_index import load_backlog, mark_done
+
+    backlog = load_backlog(Path("docs/BACKLOG.md"))
+    for epic in backlog.epics:
+        print(epic.num, epic.name, epic.done, epic.total)
+
+    story = backlog.get("1.1")          # O(1) lookup
+    mark_done(Path("docs/BACKLOG.md"), ["1.1", "1.2"])   # flips [ ] -> [x] in place
+
+CLI:
+    python3 .agents/scripts/backlog_index.py [backlog_path]   # Summary + cache status
+
+Supported formats:
+    - Lean:    - [ ] Story 1.1: Title
+    - Fat:     - [ ] **Story 1.1:** Title   (description below; also **Story 1.1**: Title)
+    - Heading: ### Story 1.1: Title         (traceability-style, no checkbox)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+sys.path.insert(0, str(Path(__file__).parent))
+from platform_compat import get_agent_root, find_backlog
+
+
+# Bump when the tree layout changes so stale caches are discarded
+INDEX_VERSION = 2
+
+# A backlog modified this recently may change again within the same mtime
+# tick without changing size (a [ ] -> [x] flip): its stamp is not trusted
+_RACY_WINDOW_NS = 2_000_000_000
+
+_EPIC_RE = re.compile(
+    r"^##\s+Epic\s+(\d+):\s+(.+?)\s*(?:\[(P\d+)\])?\s*(?:\[OWNER:\s*(.+?)\])?\s*(?:\[MODEL:\s*(.+?)\])?\s*(?:[✅🔴⏳].*)?$"
+)
+# Lines that can carry structure: headings and top-level list items
+_STRUCT_LINE_RE = re.compile(rb"^[#-][^\n]*", re.MULTILINE)
+# Any top-level checkbox (not indented subtasks)
+_CHECKBOX_RE = re.compile(r"^-\s*\[([ xX])\]")
+# Story/Epic label right after the checkbox (lean, fat, or bare "**1.1:**")
+_ITEM_RE = re.compile(
+    r"^-\s*\[[ xX]\]\s*(\*\*)?(?:(Story|Epic)\s+)?(\d+(?:\.\d+)?)(?:\*\*)?:?\*?\*?\s*(.*)",
+    re.IGNORECASE,
+)
+_HEADING_STORY_RE = re.compile(r"^###?\s*Story\s+(\d+\.\d+)[:\s]+(.+)", re.IGNORECASE)
+
+
+@dataclass
+class BacklogItem:
+    """A Story (or Epic-level task) entry in the backlog."""
+    id: str
+    title: str
+    kind: str = "story"            # "story" | "epic"
+    style: str = "lean"            # "lean" | "fat" | "heading"
+    checked: Optional[bool] = None  # None for heading-style stories (no checkbox)
+    epic_num: Optional[int] = None
+    line: int = 0                  # 1-based line number
+    mark_offset: Optional[int] = None  # byte offset of the char inside "[ ]"
+    description: str = ""
+
+    @property
+    def status(self) -> str:
+        return "done" if self.checked else "pending"
+
+
+@dataclass
+class BacklogEpic:
+    """An Epic heading with its stories and checkbox counters."""
+    num: int
+    name: str
+    priority: Optional[str] = None
+    owner: Optional[str] = None
+    model: Optional[str] = None
+    line: int = 0
+    done: int = 0       # top-level [x] checkboxes under this epic
+    pending: int = 0    # top-level [ ] checkboxes under this epic
+    stories: list = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.done + self.pending
+
+
+@dataclass
+class Backlog:
+    """Parsed BACKLOG.md."""
+    epics: list = field(default_factory=list)
+    items: list = field(default_factory=list)   # document order, includes items outside epics
+
+    def __post_init__(self):
+        self._by_id = {}
+        self._epics_by_num = {}
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._by_id = {}
+        for item in self.items:
+            key = item.id if item.kind == "story" else f"epic {item.id}"
+            self._by_id.setdefault(key, item)
+        self._epics_by_num = {}
+        for epic in self.epics:
+            self._epics_by_num.setdefault(epic.num, epic)
+
+    @property
+    def stories(self) -> list:
+        return [i for i in self.items if i.kind == "story"]
+
+    def get(self, task_id: str) -> Optional[BacklogItem]:
+        """Lookup by id ('1.1', 'Story 1.1', 'Epic 2')."""
+        raw = task_id.strip().lower()
+        clean = raw.replace("story", "").replace("epic", "").strip(" -")
+        if raw.startswith("epic"):
+            return self._by_id.get(f"epic {clean}")
+        return self._by_id.get(clean) or self._by_id.get(f"epic {clean}")
+
+    def epic(self, num: int) -> Optional[BacklogEpic]:
+        return self._epics_by_num.get(int(num))
+
+    def pending(self) -> list:
+        """Unchecked checkbox items (stories and epic tasks) in document order."""
+        return [i for i in self.items if i.checked is False]
+
+    def to_dict(self) -> dict:
+        """Compact, positional form used by the disk cache."""
+        return {
+            "epics": [
+                [e.num, e.name, e.priority, e.owner, e.model, e.line, e.done, e.pending,
+                 [s.line for s in e.stories]]
+                for e in self.epics
+            ],
+            "items": [
+                [i.id, i.title, i.kind, i.style, i.checked, i.epic_num, i.line, i.mark_offset, i.description]
+                for i in self.items
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Backlog":
+        items = [BacklogItem(*row) for row in data.get("items", [])]
+        by_line = {i.line: i for i in items}
+        epics = []
+        for row in data.get("epics", []):
+            epic = BacklogEpic(*row[:8])
+            epic.stories = [by_line[line] for line in row[8] if line in by_line]
+            epics.append(epic)
+        return cls(epics=epics, items=items)
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def parse_backlog(source: Union[str, bytes]) -> Backlog:
+    """
+    Parse backlog text in a single pass.
+
+    Only lines starting with '#' or '-' are decoded and matched; description
+    bodies are sliced between structural lines.
+
+    Args:
+        source: Backlog content (bytes preferred so offsets are exact)
+
+    Returns:
+        Backlog tree
+    """
+    data = source.encode("utf-8") if isinstance(source, str) else source
+
+    epics: list[BacklogEpic] = []
+    items: list[BacklogItem] = []
+    current_epic: Optional[BacklogEpic] = None
+    current_item: Optional[BacklogItem] = None
+    desc_start = 0
+
+    def close_item(end: int):
+        if current_item is not None:
+            current_item.description = data[desc_start:end].decode("utf-8", errors="replace").strip()
+
+    lineno = 1
+    last_pos = 0
+    for m in _STRUCT_LINE_RE.finditer(data):
+        line_offset = m.start()
+        lineno += data.count(b"\n", last_pos, line_offset)
+        last_pos = line_offset
+        line = m.group(0).decode("utf-8", errors="replace").rstrip("\r")
+
+        if line[0] == "#":
+            em = _EPIC_RE.match(line)
+            if em:
+                close_item(line_offset)
+                current_item = None
+                current_epic = BacklogEpic(
+                    num=int(em.group(1)),
+                    name=em.group(2).strip(),
+                    priority=em.group(3),
+                    owner=em.group(4).strip() if em.group(4) else None,
+                    model=em.group(5).strip() if em.group(5) else None,
+                    line=lineno,
+                )
+                epics.append(current_epic)
+                continue
+            hm = _HEADING_STORY_RE.match(line)
+            if hm:
+                close_item(line_offset)
+                current_item = BacklogItem(
+                    id=hm.group(1),
+                    title=hm.group(2).replace("**", "").strip(),
+                    style="heading",
+                    epic_num=current_epic.num if current_epic else None,
+                    line=lineno,
+                )
+                desc_start = m.end()
+                items.append(current_item)
+                if current_epic:
+                    current_epic.stories.append(current_item)
+            continue
+
+        cm = _CHECKBOX_RE.match(line)
+        if not cm:
+            continue
+        checked = cm.group(1) != " "
+        if current_epic:
+            if checked:
+                current_epic.done += 1
+            else:
+                current_epic.pending += 1
+
+        im = _ITEM_RE.match(line)
+        # Bare "- [ ] 1.1: x" is only an item in fat form ("**1.1:**")
+        if not im or not (im.group(2) or im.group(1)):
+            continue
+        kind = (im.group(2) or "story").lower()
+        item_id = im.group(3)
+        if kind == "story" and "." not in item_id:
+            kind = "epic"
+        close_item(line_offset)
+        current_item = BacklogItem(
+            id=item_id,
+            title=im.group(4).strip(),
+            kind=kind,
+            style="fat" if im.group(1) else "lean",
+            checked=checked,
+            epic_num=current_epic.num if current_epic else None,
+            line=lineno,
+            mark_offset=data.index(b"[", line_offset) + 1,
+        )
+        desc_start = m.end()
+        items.append(current_item)
+        if current_epic and kind == "story":
+            current_epic.stories.append(current_item)
+
+    close_item(len(data))
+    return Backlog(epics=epics, items=items)
+
+
+# ---------------------------------------------------------------------------
+# Disk cache (keyed by mtime_ns + size)
+# ---------------------------------------------------------------------------
+
+_MEMO: dict = {}
+
+
+def _default_cache_dir() -> Path:
+    return get_agent_root() / "cache" / "backlog"
+
+
+def _cache_file(path: Path, cache_dir: Path) -> Path:
+    key = hashlib.md5(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{key}.json"
+
+
+def _stat_key(path: Path) -> tuple:
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _stored_key(stat_key: tuple) -> tuple:
+    """Key to cache a tree under: a racy stat_key is stored as one that never matches."""
+    if time.time_ns() - stat_key[0] < _RACY_WINDOW_NS:
+        return (-1, -1)
+    return stat_key
+
+
+def _write_cache(path: Path, cache_dir: Path, stat_key: tuple, backlog: Backlog) -> None:
+    payload = {
+        "version": INDEX_VERSION,
+        "path": str(path.resolve()),
+        "mtime_ns": stat_key[0],
+        "size": stat_key[1],
+        "tree": backlog.to_dict(),
+    }
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        target = _cache_file(path, cache_dir)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        pass  # Cache is best-effort
+
+
+def _read_cache(path: Path, cache_dir: Path, stat_key: tuple) -> Optional[Backlog]:
+    cache_file = _cache_file(path, cache_dir)
+    try:
+        payload = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        payload.get("version") != INDEX_VERSION
+        or payload.get("mtime_ns") != stat_key[0]
+        or payload.get("size") != stat_key[1]
+    ):
+        return None
+    try:
+        return Backlog.from_dict(payload["tree"])
+    except (KeyError, TypeError):
+        return None
+
+
+def load_backlog(path: Path = None, cache_dir: Path = None, use_cache: bool = True) -> Optional[Backlog]:
+    """
+    Load the backlog tree, reusing the on-disk cache when mtime and size match.
+
+    Args:
+        path: BACKLOG.md path (default: find_backlog())
+        cache_dir: Cache directory (default: .agents/cache/backlog)
+        use_cache: Set False to force a fresh parse
+
+    Returns:
+        Backlog tree or None if the file does not exist
+    """
+    path = Path(path) if path else find_backlog()
+    if not path or not path.exists():
+        return None
+
+    cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+    stat_key = _stat_key(path)
+    memo_key = (str(path.resolve()), stat_key)
+    if use_cache and _stored_key(stat_key) != stat_key:
+        use_cache = False  # Racy: the file may change again under the same stamp
+
+    if use_cache:
+        if memo_key in _MEMO:
+            return _MEMO[memo_key]
+        cached = _read_cache(path, cache_dir, stat_key)
+        if cached is not None:
+            _MEMO[memo_key] = cached
+            return cached
+
+    backlog = parse_backlog(path.read_bytes())
+    if use_cache:
+        _remember(path, cache_dir, stat_key, backlog)
+    return backlog
+
+
+def _remember(path: Path, cache_dir: Path, stat_key: tuple, backlog: Backlog) -> None:
+    """Cache the tree on disk and in memory, unless its stat_key is racy."""
+    stored = _stored_key(stat_key)
+    _write_cache(path, cache_dir, stored, backlog)
+    if stored == stat_key:
+        _MEMO[(str(path.resolve()), stat_key)] = backlog
+
+
+def mark_done(path: Path, task_ids: Iterable[str], cache_dir: Path = None) -> tuple[list, list]:
+    """
+    Flip unchecked checkboxes to [x] by byte offset, without re-parsing.
+
+    The caller is responsible for holding the 'backlog' lock.
+
+    Returns:
+        (marked_ids, missing_ids) - missing covers unknown or already done ids
+    """
+    path = Path(path)
+    cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+    backlog = load_backlog(path, cache_dir)
+    data = bytearray(path.read_bytes())
+
+    # Offsets must point at "[ ]" - if the file changed under us, parse what we read
+    def offsets_valid(items):
+        return all(
+            i.mark_offset is not None and data[i.mark_offset - 1:i.mark_offset + 2] == b"[ ]"
+            for i in items
+        )
+
+    targets, missing = [], []
+    for task_id in task_ids:
+        item = backlog.get(task_id) if backlog else None
+        if item is None or item.checked is not False:
+            missing.append(task_id)
+        else:
+            targets.append(item)
+
+    if targets and not offsets_valid(targets):
+        backlog = parse_backlog(bytes(data))
+        targets, missing = [], []
+        for task_id in task_ids:
+            item = backlog.get(task_id)
+            if item is None or item.checked is not False:
+                missing.append(task_id)
+            else:
+                targets.append(item)
+
+    if not targets:
+        return [], missing
+
+    for item in targets:
+        data[item.mark_offset] = ord("x")
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(bytes(data))
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    # Only now that the file says so: the tree may be the memoized one
+    for item in targets:
+        item.checked = True
+        epic = backlog.epic(item.epic_num) if item.epic_num is not None else None
+        if epic:
+            epic.pending -= 1
+            epic.done += 1
+    resolved = str(path.resolve())
+    for key in [k for k, v in _MEMO.items() if v is backlog and k[0] == resolved]:
+        del _MEMO[key]
+
+    # Structure is unchanged: re-key the updated tree instead of re-parsing
+    _remember(path, cache_dir, _stat_key(path), backlog)
+
+    return [i.id for i in targets], missing
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else find_backlog()
+    if not path or not path.exists():
+        print("BACKLOG.md nao encontrado.")
+        sys.exit(1)
+
+    cache_dir = _default_cache_dir()
+    cached = _read_cache(path, cache_dir, _stat_key(path)) is not None
+    backlog = load_backlog(path, cache_dir)
+
+    stories = backlog.stories
+    done = sum(1 for s in stories if s.checked)
+    print(f"Backlog: {path}")
+    print(f"   Epics:   {len(backlog.epics)}")
+    print(f"   Stories: {len(stories)} ({done} done)")
+    print(f"   Cache:   {'hit' if cached else 'miss (reindexado)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Use this for incremental validation during development.
 Usage:
     python scripts/checklist.py .                    # Run core checks
     python scripts/checklist.py . --url <URL>        # Include performance checks
+    python scripts/checklist.py . --no-cache         # Ignore cached results
 
 Priority Order:
     P0: Security Scan (vulnerabilities, secrets)
@@ -27,21 +28,23 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 from _check_runner import (
     print_header, print_error, print_warning,
-    run_script_check, run_check, print_summary
+    run_script_check, run_check, print_summary,
+    CHECK_CACHE_DIR, CHECK_LOG_DIR, FRAMEWORK_INPUTS, TRACEABILITY_INPUTS,
+    WEB_BUILD_INPUTS, WEB_LINT_INPUTS, WEB_TYPECHECK_INPUTS,
 )
 from recovery import with_retry
 
-# Core checks (Python scripts relative to project root)
+# Core checks (Python scripts relative to project root, input globs for the cache)
 CORE_CHECKS = [
-    ("Framework Validation", ".agents/scripts/validate_installation.py", True),
-    ("Traceability Check", ".agents/scripts/validate_traceability.py", False),
+    ("Framework Validation", ".agents/scripts/validate_installation.py", True, FRAMEWORK_INPUTS),
+    ("Traceability Check", ".agents/scripts/validate_traceability.py", False, TRACEABILITY_INPUTS),
 ]
 
 # Web-specific checks (run if web/ directory exists)
 WEB_CHECKS = [
-    ("TypeScript Check", ["npx", "tsc", "--noEmit"], True),
-    ("Lint Check", ["npm", "run", "lint"], False),
-    ("Build Check", ["npm", "run", "build"], False),
+    ("TypeScript Check", ["npx", "tsc", "--noEmit"], True, WEB_TYPECHECK_INPUTS),
+    ("Lint Check", ["npm", "run", "lint"], False, WEB_LINT_INPUTS),
+    ("Build Check", ["npm", "run", "build"], False, WEB_BUILD_INPUTS),
 ]
 
 
@@ -58,6 +61,7 @@ Examples:
     parser.add_argument("project", help="Project path to validate")
     parser.add_argument("--url", help="URL for performance checks (lighthouse, playwright)")
     parser.add_argument("--skip-performance", action="store_true", help="Skip performance checks even if URL provided")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every check, ignoring cached results")
 
     args = parser.parse_args()
 
@@ -72,15 +76,17 @@ Examples:
     print(f"URL: {args.url if args.url else 'Not provided (performance checks skipped)'}")
 
     results = []
+    cache_dir = None if args.no_cache else project_path / CHECK_CACHE_DIR
+    log_dir = project_path / CHECK_LOG_DIR
 
     # Run core checks (Python scripts) with retry for timeout-prone checks
     print_header("CORE CHECKS")
-    for name, script_rel, required in CORE_CHECKS:
+    for name, script_rel, required, inputs in CORE_CHECKS:
         script = project_path / script_rel
 
         @with_retry(max_attempts=2, backoff=2, exceptions=(Exception,))
-        def _run_check(n=name, s=script):
-            return run_script_check(n, s, str(project_path))
+        def _run_check(n=name, s=script, i=inputs):
+            return run_script_check(n, s, str(project_path), inputs=i, cache_dir=cache_dir, log_dir=log_dir)
 
         result = _run_check()
         results.append(result)
@@ -95,8 +101,8 @@ Examples:
     web_dir = project_path / "web"
     if web_dir.exists() and (web_dir / "package.json").exists():
         print_header("WEB CHECKS")
-        for name, cmd, required in WEB_CHECKS:
-            result = run_check(name, cmd, str(web_dir))
+        for name, cmd, required, inputs in WEB_CHECKS:
+            result = run_check(name, cmd, str(web_dir), inputs=inputs, cache_dir=cache_dir, log_dir=log_dir)
             results.append(result)
 
             if required and not result["passed"] and not result.get("skipped"):
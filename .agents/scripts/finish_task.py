@@ -4,37 +4,49 @@ Finish Task - Inove AI Framework (v2)
 Marks a task as complete in BACKLOG.md AND updates the story file.
 
 Usage:
-    python3 .agents/scripts/finish_task.py <TASK_ID> [--force]
+    python3 .agents/scripts/finish_task.py <TASK_ID> [<TASK_ID> ...] [--force]
     python3 .agents/scripts/finish_task.py "1.1"
+    python3 .agents/scripts/finish_task.py 1.1 1.2 1.3
+    python3 .agents/scripts/finish_task.py --from-file done.txt   # one ID per line
     python3 .agents/scripts/finish_task.py "Epic 1" --force
 
 Changes (v2):
     - GUARD: Refuses to mark [x] if story file does not exist
     - Updates story file frontmatter status to 'done'
     - Injects dependency context into downstream stories
-    - Triggers progress_tracker.py to update PROJECT_STATUS.md
+    - Updates PROJECT_STATUS.md via progress_tracker (in-process)
+    - Batch mode: one checkpoint, one backlog write, each story file written once
 """
 
 import sys
 import re
-import subprocess
+import argparse
 from pathlib import Path
+from typing import Union
 
 sys.path.insert(0, str(Path(__file__).parent))
+from backlog_index import Backlog, load_backlog, mark_done, parse_backlog
 from lock_manager import LockManager
-from platform_compat import get_agent_source, find_backlog, find_story_file, parse_story_frontmatter
+from platform_compat import (
+    get_agent_source,
+    find_backlog,
+    find_stories_dir,
+    get_story_index,
+    parse_frontmatter_content,
+)
 from recovery import git_checkpoint, git_rollback
-from shard_epic import update_story_status, inject_dependency_context, extract_agent_workspace
+from progress_tracker import update_project_status
+from shard_epic import set_story_status, add_dependency_context, workspace_from_content
 
 
-def check_epic_ownership(content: str, task_id: str, agent_source: str, force: bool) -> tuple[bool, str]:
+def check_epic_ownership(content: Union[str, Backlog], task_id: str, agent_source: str, force: bool) -> tuple[bool, str]:
     """
     Check if the agent has permission to modify the task based on Epic ownership.
 
     Returns:
         (allow, message) - allow=True if can proceed, message with warning if any
     """
-    clean_id = task_id.lower().replace("story", "").replace("epic", "").strip()
+    clean_id = _clean_task_id(task_id)
 
     epic_num_match = re.match(r'^(\d+)', clean_id)
     if not epic_num_match:
@@ -42,16 +54,12 @@ def check_epic_ownership(content: str, task_id: str, agent_source: str, force: b
 
     epic_num = epic_num_match.group(1)
 
-    epic_pattern = re.compile(
-        rf"^##\s+Epic\s+{epic_num}:\s+(.+?)\s*(?:\[OWNER:\s*(.+?)\])?\s*(?:[✅🔴⏳].*)?$",
-        re.MULTILINE,
-    )
-
-    epic_match = epic_pattern.search(content)
-    if not epic_match:
+    backlog = content if isinstance(content, Backlog) else parse_backlog(content)
+    epic = backlog.epic(int(epic_num))
+    if not epic:
         return True, ""
 
-    epic_owner = epic_match.group(2).strip() if epic_match.group(2) else None
+    epic_owner = epic.owner
 
     if not epic_owner:
         return True, ""
@@ -71,90 +79,89 @@ def _is_epic_task(task_id: str) -> bool:
     return "epic" in clean_id or "." not in clean_id
 
 
-def mark_task_complete(backlog_path: Path, task_id: str, force: bool = False) -> tuple[bool, str]:
-    """Mark a task as complete in the lean backlog (flip [ ] to [x])."""
-    lock_mgr = LockManager()
-    agent_source = get_agent_source()
+def _clean_task_id(task_id: str) -> str:
+    return task_id.lower().replace("story", "").replace("epic", "").strip(" -")
 
-    if not lock_mgr.wait_for_lock("backlog", agent_source, max_wait=30):
-        return False, "BACKLOG bloqueado por outro agente. Tente novamente."
 
-    try:
-        content = backlog_path.read_text(encoding="utf-8")
-    except Exception as e:
-        lock_mgr.release_lock("backlog", agent_source)
-        return False, f"Erro ao ler o arquivo: {e}"
+def mark_tasks_complete(
+    backlog_path: Path, task_ids: list[str], force: bool = False, lock_mgr: LockManager = None
+) -> tuple[bool, list[str]]:
+    """
+    Mark several tasks as complete in the backlog (flip [ ] to [x]).
 
-    # Check ownership
-    allow, ownership_msg = check_epic_ownership(content, task_id, agent_source, force)
-    if not allow:
-        lock_mgr.release_lock("backlog", agent_source)
-        return False, ownership_msg
-
-    clean_id = task_id.lower().replace("story", "").replace("epic", "").strip()
-
-    # Patterns for lean and fat formats
-    patterns = [
-        # Lean: - [ ] Story 1.1: Title
-        (rf"(-\s*\[)\s*(\]\s*Story\s+{re.escape(clean_id)}:)", r"\1x\2"),
-        # Fat: - [ ] **Story 1.1:** Title
-        (rf"(-\s*\[)\s*(\]\s*\*\*(?:Story|Epic)\s+{re.escape(clean_id)}:)", r"\1x\2"),
-        # Fallback: - [ ] **1.1:**
-        (rf"(-\s*\[)\s*(\]\s*\*\*{re.escape(clean_id)}:)", r"\1x\2"),
-    ]
-
-    new_content = content
-    found = False
-
-    for pattern, replacement in patterns:
-        if re.search(pattern, new_content, re.IGNORECASE):
-            new_content = re.sub(pattern, replacement, new_content, flags=re.IGNORECASE)
-            found = True
-            break
-
-    if not found:
-        lock_mgr.release_lock("backlog", agent_source)
-        return False, f"Tarefa '{task_id}' nao encontrada ou ja concluida."
+    All-or-nothing: every ID is validated (ownership, exists) under a single
+    'backlog' lock before BACKLOG.md is written, once. Tasks that are already
+    done are reported and skipped. Pass the caller's lock_mgr when it already
+    holds the batch locks (locks are re-entrant per manager).
+
+    Returns:
+        (success, messages)
+    """
+    lock_mgr = lock_mgr or LockManager()
+    agent_source = get_agent_source()
+
+    if not lock_mgr.wait_for_lock("backlog", agent_source, max_wait=30):
+        return False, ["BACKLOG bloqueado por outro agente. Tente novamente."]
 
     try:
-        backlog_path.write_text(new_content, encoding="utf-8")
-        success_msg = f"Tarefa '{task_id}' marcada como concluida em {backlog_path.name}."
-        if ownership_msg:
-            success_msg = f"{ownership_msg}\n{success_msg}"
-        return True, success_msg
-    except Exception as e:
-        return False, f"Erro ao salvar arquivo: {e}"
+        try:
+            backlog = load_backlog(backlog_path)
+        except Exception as e:
+            return False, [f"Erro ao ler o arquivo: {e}"]
+
+        warnings, errors = [], []
+        targets, seen = [], set()
+        for task_id in task_ids:
+            # Check ownership
+            allow, ownership_msg = check_epic_ownership(backlog, task_id, agent_source, force)
+            if not allow:
+                errors.append(ownership_msg)
+                continue
+            if ownership_msg and ownership_msg not in warnings:
+                warnings.append(ownership_msg)
+
+            item = backlog.get(task_id)
+            if item is None:
+                errors.append(f"Tarefa '{task_id}' nao encontrada ou ja concluida.")
+            elif item.checked:
+                # Idempotent in batches: already-done tasks are just reported
+                warnings.append(f"Tarefa '{task_id}' ja estava concluida (ignorada).")
+            elif (item.kind, item.id) not in seen:
+                seen.add((item.kind, item.id))
+                targets.append(task_id)
+
+        if errors:
+            return False, errors
+        if not targets:
+            return False, [f"Tarefa '{t}' nao encontrada ou ja concluida." for t in task_ids]
+
+        # Flip [ ] -> [x] at the checkbox offsets recorded by the backlog index
+        # (lean: "- [ ] Story 1.1:", fat: "- [ ] **Story 1.1:**" / "- [ ] **1.1:**")
+        try:
+            marked, missing = mark_done(backlog_path, targets)
+        except Exception as e:
+            return False, [f"Erro ao salvar arquivo: {e}"]
+        if missing:
+            return False, [f"Tarefa '{t}' nao encontrada ou ja concluida." for t in missing]
+
+        if len(marked) == 1:
+            done_msg = f"Tarefa '{targets[0]}' marcada como concluida em {backlog_path.name}."
+        else:
+            done_msg = f"{len(marked)} tarefas marcadas como concluidas em {backlog_path.name}."
+        return True, warnings + [done_msg]
     finally:
         lock_mgr.release_lock("backlog", agent_source)
 
 
-def _update_story_file(task_id: str) -> tuple[bool, str]:
-    """Update story file frontmatter status to 'done'."""
-    clean_id = task_id.lower().replace("story", "").replace("epic", "").strip()
-
-    if update_story_status(clean_id, "done"):
-        return True, f"Story file {clean_id} atualizado para 'done'."
-    return False, f"Story file para {clean_id} nao encontrado (status nao atualizado)."
-
-
-def _inject_downstream(task_id: str) -> list[str]:
-    """Inject dependency context into stories that depend on the completed story."""
-    clean_id = task_id.lower().replace("story", "").replace("epic", "").strip()
-    messages = []
-
-    # Read completed story metadata
-    story_file = find_story_file(clean_id)
-    if not story_file:
-        return messages
+def mark_task_complete(backlog_path: Path, task_id: str, force: bool = False) -> tuple[bool, str]:
+    """Mark a task as complete in the lean backlog (flip [ ] to [x])."""
+    success, messages = mark_tasks_complete(backlog_path, [task_id], force)
+    return success, "\n".join(messages)
 
-    fm = parse_story_frontmatter(story_file)
-    unlocks = fm.get("unlocks", [])
-    if not unlocks:
-        return messages
 
-    # Get workspace summary for context injection
-    workspace = extract_agent_workspace(story_file)
-    title = fm.get("story", clean_id)
+def _context_line(story_id: str, content: str) -> str:
+    """Build the '> Story X (title): summary' line injected downstream."""
+    workspace = workspace_from_content(content)
 
     # Build context line from workspace (first meaningful lines or fallback)
     if workspace and workspace != "> Notas do agente durante implementacao":
@@ -166,29 +173,107 @@ def _inject_downstream(task_id: str) -> list[str]:
     summary = summary[:200]
 
     # Read the story title from the file
-    content = story_file.read_text(encoding="utf-8")
     title_match = re.search(r'^# Story .+?: (.+)$', content, re.MULTILINE)
-    story_title = title_match.group(1) if title_match else f"Story {clean_id}"
+    story_title = title_match.group(1) if title_match else f"Story {story_id}"
 
-    context_line = f"> Story {clean_id} ({story_title}): {summary}"
+    return f"> Story {story_id} ({story_title}): {summary}"
 
-    for unlock_id in unlocks:
-        if isinstance(unlock_id, str):
-            success = inject_dependency_context(unlock_id, context_line)
-            if success:
-                messages.append(f"Contexto injetado em Story {unlock_id}")
+
+def update_story_files(story_ids: list[str]) -> list[str]:
+    """
+    Set status 'done' on the completed stories and inject their context
+    into downstream (unlocked) stories.
+
+    Edits are applied in memory; each affected file is written once.
+
+    Returns:
+        Messages for the console
+    """
+    index = get_story_index(find_stories_dir())
+    files = index.resolve_many(story_ids)
+    originals: dict[Path, str] = {}
+    contents: dict[Path, str] = {}
+    messages = []
+
+    def load(path: Path) -> str:
+        if path not in contents:
+            originals[path] = contents[path] = path.read_text(encoding="utf-8")
+        return contents[path]
+
+    # Step 1: status -> done
+    for sid in story_ids:
+        path = files.get(sid)
+        if not path:
+            messages.append(f"Story: Story file para {sid} nao encontrado (status nao atualizado).")
+            continue
+        updated = set_story_status(load(path), "done")
+        if updated != contents[path]:
+            contents[path] = updated
+            messages.append(f"Story: Story file {sid} atualizado para 'done'.")
+        else:
+            messages.append(f"Story: Story file {sid} ja estava 'done'.")
+
+    # Step 2: downstream context
+    for sid in story_ids:
+        path = files.get(sid)
+        if not path:
+            continue
+        content = load(path)
+        unlocks = [u for u in parse_frontmatter_content(content).get("unlocks", []) if isinstance(u, str)]
+        if not unlocks:
+            continue
+        context_line = _context_line(sid, content)
+        for unlock_id, unlock_file in index.resolve_many(unlocks).items():
+            if unlock_file is None:
+                continue
+            injected = add_dependency_context(load(unlock_file), context_line)
+            if injected is not None:
+                contents[unlock_file] = injected
+                messages.append(f"Downstream: Contexto injetado em Story {unlock_id}")
+
+    for path, content in contents.items():
+        if content != originals[path]:
+            path.write_text(content, encoding="utf-8")
 
     return messages
 
 
+def _read_task_ids(args: argparse.Namespace) -> list[str]:
+    """Task IDs from argv and --from-file (one per line, '#' comments), de-duplicated."""
+    task_ids = list(args.task_ids)
+    if args.from_file:
+        text = sys.stdin.read() if args.from_file == "-" else Path(args.from_file).read_text(encoding="utf-8")
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                task_ids.append(line)
+    return list(dict.fromkeys(t.strip() for t in task_ids if t.strip()))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="finish_task",
+        description="Marca tarefas como concluidas no BACKLOG.md e nos story files.",
+    )
+    parser.add_argument("task_ids", nargs="*", help="IDs das tarefas (ex: 1.1 1.2 'Epic 1')")
+    parser.add_argument("--from-file", metavar="PATH", help="Arquivo com um ID por linha ('-' para stdin)")
+    parser.add_argument("--force", action="store_true", help="Ignora ownership do Epic")
+    return parser
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python finish_task.py <TASK_ID> [--force]")
-        print("Exemplo: python finish_task.py '1.1'")
+    args = build_parser().parse_args()
+    try:
+        task_ids = _read_task_ids(args)
+    except OSError as e:
+        print(f"Erro ao ler --from-file: {e}")
+        sys.exit(1)
+
+    if not task_ids:
+        print("Uso: python finish_task.py <TASK_ID> [<TASK_ID> ...] [--from-file PATH] [--force]")
+        print("Exemplo: python finish_task.py '1.1' '1.2'")
         sys.exit(1)
 
-    task_id = sys.argv[1]
-    force = "--force" in sys.argv
     root = Path.cwd()
 
     backlog_file = find_backlog(root_path=root)
@@ -197,53 +282,63 @@ def main():
         sys.exit(1)
 
     # GUARD: Story file must exist (Codex rule)
-    if not _is_epic_task(task_id):
-        clean_id = task_id.lower().replace("story", "").replace("epic", "").strip()
-        story_file = find_story_file(clean_id)
-        if not story_file:
+    story_ids = list(dict.fromkeys(_clean_task_id(t) for t in task_ids if not _is_epic_task(t)))
+    missing = [sid for sid, f in get_story_index(find_stories_dir(root)).resolve_many(story_ids).items() if not f]
+    if missing:
+        for clean_id in missing:
             print(f"Story file nao encontrado para '{clean_id}'.")
-            print(f"   Crie o story file em docs/stories/ antes de marcar como completo.")
-            print(f"   Execute: python3 .agents/scripts/shard_epic.py generate --story {clean_id}")
-            sys.exit(1)
+        print(f"   Crie o story file em docs/stories/ antes de marcar como completo.")
+        print(f"   Execute: python3 .agents/scripts/shard_epic.py generate --story {missing[0]}")
+        sys.exit(1)
 
-    # Git checkpoint
-    checkpoint_label = f"finish-task-{task_id}"
+    # BACKLOG.md and the story files are locked together for the whole batch
+    # (all or none, lease renewed while it runs)
+    lock_mgr = LockManager()
+    try:
+        with lock_mgr.hold_many(["backlog", "stories"], get_agent_source(), wait=30):
+            exit_code = _finish_batch(backlog_file, task_ids, story_ids, args.force, lock_mgr)
+    except TimeoutError:
+        print("BACKLOG/stories bloqueados por outro agente. Tente novamente.")
+        sys.exit(1)
+    if exit_code:
+        sys.exit(exit_code)
+
+
+def _finish_batch(
+    backlog_file: Path, task_ids: list[str], story_ids: list[str], force: bool, lock_mgr: LockManager
+) -> int:
+    """Steps 1-4 of finish_task, run while the batch locks are held."""
+    # Git checkpoint (one for the whole batch)
+    if len(task_ids) == 1:
+        checkpoint_label = f"finish-task-{task_ids[0]}"
+    else:
+        checkpoint_label = f"finish-task-batch-{len(task_ids)}"
     had_changes = git_checkpoint(checkpoint_label)
 
-    # Step 1: Mark [x] in backlog
-    success, message = mark_task_complete(backlog_file, task_id, force)
+    # Step 1: Mark [x] in backlog (single write)
+    success, messages = mark_tasks_complete(backlog_file, task_ids, force, lock_mgr)
 
     if not success:
-        print(f"{message}")
+        for message in messages:
+            print(f"{message}")
         if had_changes:
             git_rollback(checkpoint_label)
-        sys.exit(1)
-
-    print(f"Backlog: {message}")
+        return 1
 
-    # Step 2: Update story file status
-    if not _is_epic_task(task_id):
-        sf_success, sf_msg = _update_story_file(task_id)
-        print(f"Story: {sf_msg}")
+    for message in messages:
+        print(f"Backlog: {message}")
 
-        # Step 3: Inject downstream context
-        downstream_msgs = _inject_downstream(task_id)
-        for msg in downstream_msgs:
-            print(f"Downstream: {msg}")
+    # Steps 2-3: story files + downstream context (each file written once)
+    for message in update_story_files(story_ids):
+        print(message)
 
-    # Step 4: Trigger progress tracker
+    # Step 4: Update PROJECT_STATUS.md in-process
     try:
-        subprocess.run(
-            [sys.executable, str(Path(__file__).parent / "progress_tracker.py")],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+        update_project_status(backlog_file)
         print("PROJECT_STATUS.md atualizado.")
-    except subprocess.CalledProcessError as e:
-        print(f"Aviso: progress_tracker falhou: {e.stderr[:200] if e.stderr else 'unknown error'}")
-    except FileNotFoundError:
-        print("Aviso: progress_tracker.py nao encontrado.")
+    except Exception as e:
+        print(f"Aviso: progress_tracker falhou: {str(e)[:200]}")
+    return 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Lock Broker - Inove AI Framework
+Servidor local de locks (opcional) para muitos agentes na mesma máquina.
+
+Mantém a tabela de locks em memória e atende o LockManager por um socket
+Unix (.agents/locks/broker.sock): nada de syscalls e JSON por arquivo a
+cada aquisição, e os pedidos são concedidos na ordem de chegada (FIFO).
+
+Com o broker no ar, todo LockManager (shard_epic, finish_task,
+sync_tracker, ...) passa a usá-lo sem mudar nada; sem ele, volta aos
+arquivos de lock. Na subida o broker importa os locks em arquivo e, ao
+encerrar, grava os que ainda estão ativos de volta em arquivo.
+
+Mesma semântica dos arquivos: modos S/X, recursos hierárquicos com
+intenções, leases (timeout/renew) e liberação imediata de donos mortos
+(pid verificado a cada _SWEEP_INTERVAL).
+
+Uso:
+    python3 .agents/scripts/lock_broker.py start     # Primeiro plano (Ctrl+C encerra)
+    python3 .agents/scripts/lock_broker.py status
+    python3 .agents/scripts/lock_broker.py stop
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lock_manager import (
+    BROKER_PIDFILE,
+    BROKER_SOCKET,
+    LockManager,
+    broker_running,
+    _BOOT_ID,
+    _COMPATIBLE,
+    _HOSTNAME,
+    _INTENT_OF,
+    _intent_children,
+    _parent_resources,
+)
+
+# Intervalo da varredura de leases vencidos e donos mortos (segundos)
+_SWEEP_INTERVAL = 0.5
+
+
+# ---------------------------------------------------------------------------
+# Cliente
+# ---------------------------------------------------------------------------
+
+class BrokerClient:
+    """
+    Cliente do broker (usado internamente pelo LockManager).
+
+    Mantém um pool de conexões por processo, então threads diferentes não
+    esperam umas pelas outras. Qualquer falha de transporte vira
+    ConnectionError, e o LockManager volta para os arquivos de lock.
+    """
+
+    def __init__(self, socket_path: Path):
+        self.socket_path = Path(socket_path)
+        self._idle: List[Tuple[socket.socket, object]] = []
+        self._mutex = threading.Lock()
+
+    def _connection(self, reuse: bool = True) -> Tuple[socket.socket, object, bool]:
+        with self._mutex:
+            if reuse and self._idle:
+                return (*self._idle.pop(), True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise ConnectionError(f"Broker indisponível em {self.socket_path}")
+        return sock, sock.makefile("rb"), False
+
+    def _discard_idle(self) -> None:
+        with self._mutex:
+            idle, self._idle = self._idle, []
+        for sock, _ in idle:
+            sock.close()
+
+    def call(self, message: dict, on_waiting: Optional[Callable[[str, dict], None]] = None) -> dict:
+        """Envia uma operação e devolve a resposta final (avisos 'waiting' vão para on_waiting)."""
+        sock, reader, reused = self._connection()
+        answered = False
+        try:
+            sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+            while True:
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError("Broker encerrou a conexão")
+                answered = True
+                reply = json.loads(line)
+                if "waiting" not in reply:
+                    break
+                if on_waiting:
+                    on_waiting(*reply["waiting"])
+        except (OSError, ValueError) as e:
+            sock.close()
+            if reused and not answered:
+                # Conexão ociosa de um broker anterior (reiniciado): descarta o pool e refaz
+                self._discard_idle()
+                return self.call(message, on_waiting)
+            raise ConnectionError(f"Falha na comunicação com o broker: {e}")
+
+        with self._mutex:
+            self._idle.append((sock, reader))
+        if "error" in reply:
+            raise ConnectionError(reply["error"])
+        return reply
+
+    def acquire(
+        self,
+        requests: List[Tuple[str, str]],
+        agent: str,
+        timeout: int,
+        metadata: dict,
+        wait: float,
+        on_conflict: Optional[Callable[[str, dict], None]] = None,
+    ) -> Optional[Tuple[str, dict]]:
+        """Mesmo contrato de LockManager._try_acquire, esperando até 'wait' na fila do broker."""
+        reply = self.call({
+            "op": "acquire", "requests": requests, "agent": agent, "timeout": timeout,
+            "metadata": metadata, "wait": wait, "pid": os.getpid(),
+        }, on_conflict)
+        return None if reply["ok"] else tuple(reply["conflict"])
+
+    def release(self, resource: str, agent: str, modes: List[str]) -> bool:
+        return self.call({"op": "release", "resource": resource, "agent": agent, "modes": modes})["ok"]
+
+    def renew(self, resource: str, agent: str, modes: List[str]) -> bool:
+        return self.call({"op": "renew", "resource": resource, "agent": agent, "modes": modes})["ok"]
+
+    def info(self, resource: str) -> Optional[dict]:
+        return self.call({"op": "info", "resource": resource})["info"]
+
+    def list(self, include_intents: bool = False) -> dict:
+        return self.call({"op": "list", "include_intents": include_intents})["locks"]
+
+    def force_release(self, resource: str) -> bool:
+        return self.call({"op": "force_release", "resource": resource})["ok"]
+
+    def cleanup(self) -> int:
+        return self.call({"op": "cleanup"})["count"]
+
+    def status(self) -> dict:
+        return self.call({"op": "status"})
+
+    def shutdown(self) -> dict:
+        return self.call({"op": "shutdown"})
+
+
+_clients: Dict[str, BrokerClient] = {}
+_clients_mutex = threading.Lock()
+
+
+def get_client(socket_path: Path) -> BrokerClient:
+    """Cliente compartilhado do processo para um socket."""
+    key = str(socket_path)
+    with _clients_mutex:
+        if key not in _clients:
+            _clients[key] = BrokerClient(socket_path)
+        return _clients[key]
+
+
+# ---------------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------------
+
+class _Waiter:
+    """Pedido na fila FIFO, aguardando compatibilidade."""
+    __slots__ = ("requests", "agent", "timeout", "metadata", "pid", "future")
+
+    def __init__(self, requests, agent, timeout, metadata, pid, future):
+        self.requests = requests
+        self.agent = agent
+        self.timeout = timeout
+        self.metadata = metadata
+        self.pid = pid
+        self.future = future
+
+
+class LockBroker:
+    """Tabela de locks em memória servida por socket Unix."""
+
+    def __init__(self, locks_dir: Path = None):
+        # Sem broker: acesso direto aos arquivos (importar/exportar, stale, stats)
+        self.files = LockManager(locks_dir, use_broker=False)
+        self.socket_path = self.files.locks_dir / BROKER_SOCKET
+        self.pid_path = self.files.locks_dir / BROKER_PIDFILE
+        self.table: Dict[str, List[dict]] = {}
+        self.queue: List[_Waiter] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._closing = False
+
+    # -- Tabela ---------------------------------------------------------------
+
+    def _holders(self, resource: str) -> List[dict]:
+        return self.table.get(resource, [])
+
+    def _set_holders(self, resource: str, holders: List[dict]) -> None:
+        if holders:
+            self.table[resource] = holders
+        else:
+            self.table.pop(resource, None)
+
+    def _info(self, resource: str) -> Optional[dict]:
+        holders = [dict(h) for h in self._holders(resource)]
+        return self.files._summary(holders) if holders else None
+
+    @staticmethod
+    def _plan(requests: List[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        return [
+            (res, res_mode, resource)
+            for resource, mode in requests
+            for res, res_mode in LockManager._plan(resource, mode)
+        ]
+
+    def _conflict(
+        self, requests: List[Tuple[str, str]], agent: str, queued: List[_Waiter] = ()
+    ) -> Optional[Tuple[str, dict]]:
+        """Primeiro conflito com os donos atuais ou com pedidos que chegaram antes."""
+        plan = self._plan(requests)
+        for res, res_mode, _ in plan:
+            for holder in self._holders(res):
+                if holder["locked_by"] != agent and holder["mode"] not in _COMPATIBLE[res_mode]:
+                    return res, dict(holder)
+        for waiter in queued:
+            if waiter.agent == agent:
+                continue
+            for w_res, w_mode, _ in self._plan(waiter.requests):
+                for res, res_mode, _ in plan:
+                    if w_res == res and w_mode not in _COMPATIBLE[res_mode]:
+                        return res, {"locked_by": waiter.agent, "mode": w_mode, "queued": True}
+        return None
+
+    def _grant(self, requests, agent: str, timeout: int, metadata: dict, pid: int) -> None:
+        """Registra o lote (mesmas regras de LockManager._try_acquire)."""
+        now = datetime.now().isoformat()
+        for res, res_mode, resource in self._plan(requests):
+            holders = self.table.setdefault(res, [])
+            entry = next((h for h in holders if h["locked_by"] == agent and h["mode"] == res_mode), None)
+            if entry is None:
+                entry = {"locked_by": agent, "mode": res_mode}
+                holders.append(entry)
+            entry.update(locked_at=now, pid=pid, host=_HOSTNAME, boot_id=_BOOT_ID)
+            if res == resource:
+                entry["timeout"] = timeout
+                entry.update(metadata)
+            else:
+                entry["timeout"] = max(entry.get("timeout", 0), timeout)
+                entry["for"] = {**_intent_children(entry), resource: pid}
+
+    def _remove(self, resource: str, match: Callable[[dict], bool]) -> List[dict]:
+        """Remove os donos S/X de 'resource' que casam com 'match' e as intenções que sustentavam."""
+        holders = self._holders(resource)
+        removed = [h for h in holders if h["mode"] in _INTENT_OF and match(h)]
+        if not removed:
+            return []
+        removed_ids = {id(h) for h in removed}
+        self._set_holders(resource, [h for h in holders if id(h) not in removed_ids])
+
+        for holder in removed:
+            intent = _INTENT_OF[holder["mode"]]
+            for parent in _parent_resources(resource):
+                kept = []
+                for other in self._holders(parent):
+                    if other["locked_by"] == holder["locked_by"] and other["mode"] == intent:
+                        other["for"] = _intent_children(other)
+                        other["for"].pop(resource, None)
+                        if not other["for"]:
+                            continue
+                    kept.append(other)
+                self._set_holders(parent, kept)
+        return removed
+
+    def _grant_waiters(self) -> None:
+        """Concede, em ordem de chegada, os pedidos que ficaram compatíveis."""
+        blocked: List[_Waiter] = []
+        for waiter in list(self.queue):
+            if waiter.future.done():
+                self.queue.remove(waiter)
+            elif self._conflict(waiter.requests, waiter.agent, blocked) is None:
+                self.queue.remove(waiter)
+                self._grant(waiter.requests, waiter.agent, waiter.timeout, waiter.metadata, waiter.pid)
+                waiter.future.set_result(None)
+            else:
+                blocked.append(waiter)
+
+    def _sweep(self) -> int:
+        """Remove locks com lease vencido ou dono morto. Returns: quantidade removida."""
+        count = 0
+        for resource in list(self.table):
+            for holder in list(self._holders(resource)):
+                if holder["mode"] not in _INTENT_OF:
+                    continue  # Intenções saem junto com os descendentes
+                reason = self.files._stale_reason(holder)
+                if reason:
+                    self._remove(resource, lambda h, stale=holder: h is stale)
+                    self.files._record("steal", resource, holder["mode"], "broker",
+                                       from_agent=holder["locked_by"], from_mode=holder["mode"], reason=reason)
+                    count += 1
+        if count:
+            self._grant_waiters()
+        return count
+
+    # -- Operações ------------------------------------------------------------
+
+    async def _op_acquire(self, msg: dict, writer: asyncio.StreamWriter) -> dict:
+        requests = [tuple(r) for r in msg["requests"]]
+        agent, timeout = msg["agent"], msg["timeout"]
+        metadata, pid, wait = msg.get("metadata") or {}, msg.get("pid"), msg.get("wait", 0)
+
+        self._sweep()
+        conflict = self._conflict(requests, agent, self.queue)
+        if conflict is None:
+            self._grant(requests, agent, timeout, metadata, pid)
+            return {"ok": True}
+        if wait <= 0:
+            return {"ok": False, "conflict": conflict}
+
+        waiter = _Waiter(requests, agent, timeout, metadata, pid, self._loop.create_future())
+        self.queue.append(waiter)
+        await self._send(writer, {"waiting": conflict})
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), wait)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._grant_waiters()  # Quem estava atrás deste pedido pode seguir
+                return {"ok": False, "conflict": self._conflict(requests, agent, self.queue) or conflict}
+        except ConnectionAbortedError:
+            return {"error": "Broker encerrando"}
+        return {"ok": True}
+
+    def _op_release(self, msg: dict) -> dict:
+        resource, agent, modes = msg["resource"], msg["agent"], set(msg["modes"])
+        holders = self._holders(resource)
+        removed = self._remove(resource, lambda h: h["locked_by"] == agent and h["mode"] in modes)
+        if removed:
+            self._grant_waiters()
+            return {"ok": True}
+        # Não pode liberar lock de outro agente
+        return {"ok": not any(h["locked_by"] != agent and h["mode"] in _INTENT_OF for h in holders)}
+
+    def _op_renew(self, msg: dict) -> dict:
+        resource, agent, modes = msg["resource"], msg["agent"], set(msg["modes"])
+        self._sweep()
+        mine = [h for h in self._holders(resource) if h["locked_by"] == agent and h["mode"] in modes]
+        if not mine:
+            return {"ok": False}
+        now = datetime.now().isoformat()
+        intents = {_INTENT_OF[h["mode"]] for h in mine}
+        for holder in mine:
+            holder["locked_at"] = now
+        for parent in _parent_resources(resource):
+            for holder in self._holders(parent):
+                if holder["locked_by"] == agent and holder["mode"] in intents:
+                    holder["locked_at"] = now
+        return {"ok": True}
+
+    def _op_info(self, msg: dict) -> dict:
+        self._sweep()
+        return {"info": self._info(msg["resource"])}
+
+    def _op_list(self, msg: dict) -> dict:
+        self._sweep()
+        locks = {}
+        for resource in sorted(self.table):
+            info = self._info(resource)
+            if info and (msg.get("include_intents") or info["mode"] in _INTENT_OF):
+                locks[resource] = info
+        return {"locks": locks}
+
+    def _op_force_release(self, msg: dict) -> dict:
+        resource = msg["resource"]
+        self._remove(resource, lambda h: True)
+        self.table.pop(resource, None)
+        self._grant_waiters()
+        return {"ok": True}
+
+    def _op_cleanup(self, msg: dict) -> dict:
+        return {"count": self._sweep()}
+
+    def _op_status(self, msg: dict) -> dict:
+        return {
+            "ok": True, "pid": os.getpid(), "socket": str(self.socket_path),
+            "resources": len(self.table), "queued": len(self.queue),
+        }
+
+    def _op_shutdown(self, msg: dict) -> dict:
+        self._stopped.set()
+        return {"ok": True}
+
+    # -- Conexões -------------------------------------------------------------
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, reply: dict) -> None:
+        writer.write((json.dumps(reply) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    op = msg["op"]
+                except (ValueError, KeyError, TypeError):
+                    await self._send(writer, {"error": "Mensagem inválida"})
+                    continue
+
+                if self._closing:
+                    reply = {"error": "Broker encerrando"}
+                elif op == "acquire":
+                    reply = await self._op_acquire(msg, writer)
+                else:
+                    handler = getattr(self, f"_op_{op}", None)
+                    reply = handler(msg) if handler else {"error": f"Operação desconhecida: {op}"}
+                await self._send(writer, reply)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # Cliente saiu ou o broker está encerrando
+        finally:
+            writer.close()
+
+    async def _sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(_SWEEP_INTERVAL)
+            self._sweep()
+
+    # -- Ciclo de vida --------------------------------------------------------
+
+    def _import_file_locks(self) -> None:
+        """Traz os locks em arquivo para a memória (chamado sob a tabela de arquivos)."""
+        for lock_file in self.files.locks_dir.rglob("*.lock"):
+            resource = lock_file.relative_to(self.files.locks_dir).with_suffix("").as_posix()
+            holders = self.files._read_holders(resource)
+            if holders:
+                self.table[resource] = holders
+            lock_file.unlink(missing_ok=True)
+
+    def _export_file_locks(self) -> None:
+        """Grava os locks ainda ativos de volta em arquivo (chamado sob a tabela de arquivos)."""
+        self._sweep()
+        for resource, holders in self.table.items():
+            self.files._write_holders(resource, holders)
+
+    async def serve(self) -> None:
+        """Sobe o broker e atende até stop()/shutdown/SIGTERM."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        try:
+            self._loop.add_signal_handler(signal.SIGTERM, self._stopped.set)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass  # Fora da thread principal (testes) ou sem suporte a sinais
+
+        # Importa e publica sob a tabela de arquivos: nenhum cliente em modo
+        # arquivo escreve entre a importação e o socket ficar visível
+        with self.files._table_lock():
+            if broker_running(self.files.locks_dir):
+                raise RuntimeError(f"Broker já está rodando em {self.socket_path}")
+            self.socket_path.unlink(missing_ok=True)
+            self._import_file_locks()
+            server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+            self.pid_path.write_text(str(os.getpid()))
+
+        sweeper = asyncio.create_task(self._sweeper())
+        try:
+            await self._stopped.wait()
+        finally:
+            sweeper.cancel()
+            with self.files._table_lock():
+                self._closing = True
+                for waiter in self.queue:
+                    if not waiter.future.done():
+                        waiter.future.set_exception(ConnectionAbortedError())
+                self.queue.clear()
+                self._export_file_locks()
+                self.socket_path.unlink(missing_ok=True)
+                self.pid_path.unlink(missing_ok=True)
+            server.close()
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+    def stop(self) -> None:
+        """Encerra o broker a partir de outra thread."""
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    locks_dir = Path(".agents/locks")
+
+    if command == "start":
+        broker = LockBroker(locks_dir)
+        print(f"🔌 Broker de locks em {broker.socket_path} (pid {os.getpid()}). Ctrl+C encerra.")
+        try:
+            broker.run()
+        except KeyboardInterrupt:
+            pass
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print("Broker encerrado; locks ativos gravados em arquivo.")
+    elif command in ("status", "stop"):
+        if not broker_running(locks_dir):
+            print("📭 Broker não está rodando (LockManager usa os arquivos de lock)")
+            sys.exit(0 if command == "status" else 1)
+        client = get_client(locks_dir / BROKER_SOCKET)
+        if command == "stop":
+            client.shutdown()
+            print("✅ Broker encerrado")
+        else:
+            status = client.status()
+            print(f"🔌 Broker ativo (pid {status['pid']})")
+            print(f"   Recursos com lock: {status['resources']}")
+            print(f"   Pedidos na fila:   {status['queued']}")
+    else:
+        print(f"Comando desconhecido: {command}")
+        print("Uso: lock_broker.py [start|status|stop]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,52 +4,448 @@ Lock Manager - Inove AI Framework
 Sistema de locks para coordenar edições concorrentes entre agentes.
 
 Uso:
-    from lock_manager import LockManager
+    from lock_manager import LockManager, SHARED
 
     lock_mgr = LockManager()
-    if lock_mgr.acquire_lock("backlog", "antigravity"):
+    if lock_mgr.acquire("backlog", "antigravity", wait=30):   # bloqueia até liberar
         try:
             # Modificar BACKLOG.md
             ...
         finally:
             lock_mgr.release_lock("backlog", "antigravity")
+
+    # Leitura: vários leitores ao mesmo tempo, bloqueia apenas escritores
+    lock_mgr.acquire("backlog", "codex", mode=SHARED)
+
+    # Recursos hierárquicos: agentes em stories diferentes não se bloqueiam
+    lock_mgr.acquire("backlog/epic-3/story-3.2", "claude_code")
+
+    # Operações longas: o lease é renovado em background até o bloco terminar
+    with lock_mgr.hold("stories", "claude_code", wait=30):
+        ...
+
+    # Vários recursos: todos ou nenhum, em ordem canônica (sem deadlock)
+    with lock_mgr.hold_many([("backlog", SHARED), "stories"], "claude_code"):
+        ...
+
+Modos: SHARED (S, leitura) e EXCLUSIVE (X, escrita, padrão). Um lock em
+"a/b/c" registra locks de intenção (IS/IX) em "a" e "a/b", de modo que um
+lock exclusivo em "a" espera quem trabalha dentro dele, e vice-versa.
+
+Cada recurso tem um arquivo JSON <resource>.lock com a lista de donos
+(metadados para diagnóstico). Quem detém um lock segura um flock
+compartilhado em <resource>.<modo>.gate; quem espera dorme em flock
+exclusivo no gate do dono conflitante e acorda assim que ele libera, sem
+polling. O gate de um modo sai junto com o seu último dono.
+
+Tentativas, esperas, tempos de posse e locks tomados de donos mortos ou
+expirados são anexados a stats.jsonl; `lock_manager.py stats` mostra os
+percentis por recurso.
+
+O timeout de um lock é um lease: renew() (ou hold()) o estende. Donos
+mortos são recuperados na hora: cada lock registra pid, hostname e boot id,
+e um pid que não existe mais nesta máquina (ou de antes de um reboot)
+libera o recurso sem esperar o timeout.
+
+Com o broker (lock_broker.py start) no ar, as mesmas operações vão por
+socket Unix para a tabela em memória dele, com fila FIFO; sem ele, valem
+os arquivos acima. A troca é transparente para quem usa o LockManager.
 """
 
 import os
 import sys
 import json
+import random
+import socket
 import time
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, a espera cai para polling
+    fcntl = None
 
 sys.path.insert(0, str(Path(__file__).parent))
 from platform_compat import get_agent_source as _platform_get_agent_source
 
+# Intervalo de polling quando não há flock (Windows) ou o dono não segura o gate
+_POLL_INTERVAL = 0.05
+
+# Backoff máximo (com jitter) quando o conflito não tem gate para esperar
+_MAX_BACKOFF = 1.0
+
+# Uma espera que estoura o prazo deixa sua thread parada no flock (com o fd
+# aberto) até o dono soltar o gate. Acima deste número de threads paradas
+# no processo, novas esperas viram polling com backoff
+_MAX_PARKED_WAITERS = 16
+_parked_waiters = 0
+_parked_lock = threading.Lock()
+
+# Histórico de contenção: acima deste tamanho, stats.jsonl vira stats.jsonl.1
+_STATS_MAX_BYTES = 5 * 1024 * 1024
+
+# Faixas do histograma do comando stats (ms)
+_HISTOGRAM_BUCKETS = [(1, "<1ms"), (10, "<10ms"), (100, "<100ms"), (1000, "<1s"), (10000, "<10s"), (float("inf"), "≥10s")]
+
+# Sem fcntl, o mutex da tabela é um arquivo; acima desta idade o dono morreu
+_TABLE_MUTEX_STALE = 10
+
+# Broker opcional (lock_broker.py): socket e pid dentro de locks_dir
+BROKER_SOCKET = "broker.sock"
+BROKER_PIDFILE = "broker.pid"
+
+
+def _read_boot_id() -> Optional[str]:
+    """Identificador do boot atual (Linux); None onde não existe."""
+    try:
+        return Path("/proc/sys/kernel/random/boot_id").read_text().strip() or None
+    except OSError:
+        return None
+
+
+# Identificam a máquina/boot do dono, para a checagem de pid ser confiável
+_HOSTNAME = socket.gethostname()
+_BOOT_ID = _read_boot_id()
+
+# Modos de lock (granularidade múltipla)
+SHARED = "S"
+EXCLUSIVE = "X"
+INTENT_SHARED = "IS"
+INTENT_EXCLUSIVE = "IX"
+
+# Modos de outros agentes compatíveis com cada modo pedido
+_COMPATIBLE = {
+    INTENT_SHARED: {INTENT_SHARED, INTENT_EXCLUSIVE, SHARED},
+    INTENT_EXCLUSIVE: {INTENT_SHARED, INTENT_EXCLUSIVE},
+    SHARED: {INTENT_SHARED, SHARED},
+    EXCLUSIVE: set(),
+}
+_INTENT_OF = {SHARED: INTENT_SHARED, EXCLUSIVE: INTENT_EXCLUSIVE}
+_STRENGTH = {INTENT_SHARED: 0, INTENT_EXCLUSIVE: 1, SHARED: 2, EXCLUSIVE: 3}
+_MODE_LABELS = {
+    SHARED: "leitura",
+    EXCLUSIVE: "escrita",
+    INTENT_SHARED: "intenção de leitura",
+    INTENT_EXCLUSIVE: "intenção de escrita",
+}
+
+
+def _park(delta: int) -> None:
+    """Conta as threads de espera abandonadas ainda paradas no flock."""
+    global _parked_waiters
+    with _parked_lock:
+        _parked_waiters += delta
+
+
+def _flock_wait(fd: int, wait: float) -> Optional[int]:
+    """
+    Bloqueia em flock(LOCK_EX) por até 'wait' segundos.
+
+    flock não tem timeout, então a espera roda numa thread auxiliar. Se o
+    prazo estourar, a thread fica parada (contada em _parked_waiters) e
+    fecha o fd assim que (e se) conseguir o lock, liberando-o na hora.
+
+    Returns:
+        O próprio fd com o lock adquirido, ou None se estourou o prazo.
+    """
+    state = {"acquired": False, "abandoned": False, "finished": False}
+    mutex = threading.Lock()
+    done = threading.Event()
+
+    def _waiter():
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            ok = True
+        except OSError:
+            ok = False
+        with mutex:
+            state["finished"] = True
+            if ok and not state["abandoned"]:
+                state["acquired"] = True
+            else:
+                os.close(fd)
+                if state["abandoned"]:
+                    _park(-1)
+        done.set()
+
+    threading.Thread(target=_waiter, name="lock-gate-wait", daemon=True).start()
+    done.wait(wait)
+    with mutex:
+        if state["acquired"]:
+            return fd
+        if not state["finished"]:
+            state["abandoned"] = True
+            _park(1)
+    return None
+
+
+def _pid_alive(pid) -> bool:
+    """False só quando o processo comprovadamente não existe mais."""
+    if not isinstance(pid, int) or pid <= 0 or os.name == "nt":
+        return True  # Sem como verificar (no Windows, os.kill(pid, 0) envia CTRL_C)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # EPERM: existe, de outro usuário
+    try:
+        # Zumbi (terminou, ainda não coletado pelo pai) também é dono morto
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        return stat[stat.rindex(")") + 2:][:1] != "Z"
+    except (OSError, ValueError):
+        return True
+
+
+def broker_running(locks_dir: Path) -> bool:
+    """True se há um broker vivo registrado em locks_dir (socket + pid)."""
+    if not (locks_dir / BROKER_SOCKET).exists():
+        return False
+    try:
+        pid = int((locks_dir / BROKER_PIDFILE).read_text().strip())
+    except (OSError, ValueError):
+        return False
+    return _pid_alive(pid)
+
+
+class _BrokerStarted(Exception):
+    """O broker subiu enquanto esta operação ia pelos arquivos: refazer por ele."""
+
+
+def _intent_children(holder: dict) -> dict:
+    """Descendentes que sustentam um lock de intenção: {resource: pid}."""
+    children = holder.get("for") or {}
+    if isinstance(children, list):  # Formato sem pid por descendente
+        return {child: holder.get("pid") for child in children}
+    return dict(children)
+
+
+class _LeaseRenewer(threading.Thread):
+    """Renova periodicamente os leases de um conjunto de locks (usado por hold())."""
+
+    def __init__(self, manager: "LockManager", locks: List[Tuple[str, str]], agent: str, interval: float):
+        super().__init__(name="lock-lease-renewer", daemon=True)
+        self.manager = manager
+        self.locks = locks
+        self.agent = agent
+        self.interval = max(interval, _POLL_INTERVAL)
+        self.lost = []  # Locks cujo lease expirou antes da renovação
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for resource, mode in self.locks:
+                try:
+                    if not self.manager.renew(resource, self.agent, mode=mode) and resource not in self.lost:
+                        self.lost.append(resource)
+                except OSError:
+                    pass  # Tenta de novo no próximo ciclo
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Percentil por posto mais próximo ('values' já ordenado)."""
+    if not values:
+        return 0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def _parent_resources(resource: str) -> List[str]:
+    """Ancestrais de um recurso hierárquico: 'a/b/c' -> ['a', 'a/b']."""
+    parts = resource.split("/")
+    return ["/".join(parts[:i]) for i in range(1, len(parts))]
+
 
 class LockManager:
     """Gerencia locks de recursos para prevenir edições concorrentes."""
 
-    def __init__(self, locks_dir: Path = None, default_timeout: int = 300):
+    def __init__(self, locks_dir: Path = None, default_timeout: int = 300, use_broker: bool = True):
         """
         Inicializa o LockManager.
 
         Args:
             locks_dir: Diretório onde os locks serão armazenados
             default_timeout: Timeout padrão em segundos (5 minutos)
+            use_broker: Usa o broker local quando ele estiver rodando
         """
         self.locks_dir = locks_dir or Path(".agents/locks")
         self.locks_dir.mkdir(parents=True, exist_ok=True)
         self.default_timeout = default_timeout
+        self.use_broker = use_broker
+        self._files_only = False  # Broker registrado mas sem responder: usa os arquivos
+        self._held = {}          # (resource, mode, agent) -> profundidade (re-entrante por instância)
+        self._gates = {}         # (resource, mode) -> fd com flock compartilhado
+        self._gate_refs = {}     # (resource, mode) -> nº de locks desta instância que usam o gate
+        self._since = {}         # (resource, mode, agent) -> instante da aquisição (monotonic)
 
     def _get_lock_file(self, resource: str) -> Path:
         """Retorna o caminho do arquivo de lock para um recurso."""
         return self.locks_dir / f"{resource}.lock"
 
+    def _get_gate_file(self, resource: str, mode: str) -> Path:
+        """Arquivo onde os donos de um modo fazem flock (removido com o último dono do modo)."""
+        return self.locks_dir / f"{resource}.{mode}.gate"
+
+    def _get_stats_file(self) -> Path:
+        """Histórico append-only de contenção (uma linha JSON por evento)."""
+        return self.locks_dir / "stats.jsonl"
+
     def _get_agent_source(self) -> str:
         """Detecta qual agente está executando."""
         return _platform_get_agent_source()
 
+    @staticmethod
+    def _check_mode(mode: str) -> None:
+        if mode not in _INTENT_OF:
+            raise ValueError(f"Modo de lock inválido: {mode!r} (use SHARED ou EXCLUSIVE)")
+
+    @staticmethod
+    def _plan(resource: str, mode: str) -> List[Tuple[str, str]]:
+        """(recurso, modo) a registrar: intenção nos ancestrais + o próprio lock."""
+        return [(parent, _INTENT_OF[mode]) for parent in _parent_resources(resource)] + [(resource, mode)]
+
+    def _lock_requests(self, resources: Iterable, mode: str) -> List[Tuple[str, str]]:
+        """
+        Normaliza um lote de recursos em ordem canônica.
+
+        Itens são 'recurso' (usa 'mode') ou (recurso, modo); repetidos ficam
+        com o modo mais forte.
+        """
+        wanted = {}
+        for item in resources:
+            resource, res_mode = (item, mode) if isinstance(item, str) else item
+            self._check_mode(res_mode)
+            if wanted.get(resource) != EXCLUSIVE:
+                wanted[resource] = res_mode
+        return sorted(wanted.items())
+
+    # -- Broker ---------------------------------------------------------------
+
+    def _broker_client(self):
+        """Cliente do broker se ele estiver rodando, senão None (um stat no caminho comum)."""
+        if not self.use_broker or self._files_only or not broker_running(self.locks_dir):
+            return None
+        from lock_broker import get_client  # Import tardio: lock_broker importa este módulo
+        return get_client(self.locks_dir / BROKER_SOCKET)
+
+    def _routed(self, op: str, file_op: Callable, *args, retry: bool = True):
+        """Executa 'op' no broker quando ele está no ar; senão (ou se cair), 'file_op' nos arquivos."""
+        broker = self._broker_client()
+        if broker is not None:
+            try:
+                return getattr(broker, op)(*args)
+            except ConnectionError:
+                pass  # Broker caiu ou está encerrando: segue pelos arquivos
+        try:
+            return file_op(*args)
+        except _BrokerStarted:
+            if retry:
+                return self._routed(op, file_op, *args, retry=False)
+        # Broker registrado mas sem responder: não há como coordenar por ele
+        self._files_only = True
+        try:
+            return file_op(*args)
+        finally:
+            self._files_only = False
+
+    # -- Tabela de locks ------------------------------------------------------
+
+    @contextmanager
+    def _table_lock(self, check_broker: bool = True):
+        """
+        Seção crítica curta para ler-verificar-escrever os arquivos de lock.
+
+        Raises:
+            _BrokerStarted: Se o broker assumiu a tabela (check_broker=True)
+        """
+        if fcntl is not None:
+            fd = os.open(str(self.locks_dir / ".table"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._check_broker(check_broker)
+                yield
+            finally:
+                os.close(fd)
+            return
+
+        mutex = self.locks_dir / ".table.mutex"
+        while not self._atomic_create_file(mutex, str(os.getpid())):
+            try:
+                if time.time() - mutex.stat().st_mtime > _TABLE_MUTEX_STALE:
+                    mutex.unlink()  # Dono morreu dentro da seção crítica
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.01)
+        try:
+            self._check_broker(check_broker)
+            yield
+        finally:
+            mutex.unlink(missing_ok=True)
+
+    def _check_broker(self, check_broker: bool) -> None:
+        """Dentro da tabela: o broker sobe e desce sob ela, então esta leitura é decisiva."""
+        if check_broker and self.use_broker and not self._files_only and broker_running(self.locks_dir):
+            raise _BrokerStarted()
+
+    def _read_holders(self, resource: str, live_only: bool = True) -> List[dict]:
+        """
+        Donos registrados de um recurso.
+
+        Aceita o formato antigo (um único dono no topo do JSON, modo exclusivo).
+        """
+        try:
+            data = json.loads(self._get_lock_file(resource).read_text())
+        except (json.JSONDecodeError, IOError, ValueError):
+            return []
+        if not isinstance(data, dict):
+            return []
+
+        holders = data["holders"] if isinstance(data.get("holders"), list) else [data]
+        holders = [dict(h) for h in holders if isinstance(h, dict) and "locked_by" in h]
+        for holder in holders:
+            holder.setdefault("mode", EXCLUSIVE)
+        if live_only:
+            holders = [h for h in holders if not self._is_stale(h)]
+        return holders
+
+    def _write_holders(self, resource: str, holders: List[dict]) -> None:
+        """
+        Grava (ou remove, se vazia) a lista de donos de forma atômica.
+
+        O gate de um modo sem donos também sai (sob a tabela, onde os donos
+        o criam), para locks_dir não crescer com cada story. Quem ainda
+        espera no gate removido acorda quando o último fd dele fecha.
+        """
+        lock_file = self._get_lock_file(resource)
+        held_modes = {h["mode"] for h in holders}
+        for mode in _COMPATIBLE.keys() - held_modes:
+            try:
+                self._get_gate_file(resource, mode).unlink(missing_ok=True)
+            except OSError:
+                pass
+        if not holders:
+            lock_file.unlink(missing_ok=True)
+            return
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = lock_file.with_name(f".{lock_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._summary(holders), indent=2))
+        os.replace(tmp, lock_file)
+
+    @staticmethod
+    def _summary(holders: List[dict]) -> dict:
+        """Dono principal (modo mais forte, mais antigo) no topo + lista completa."""
+        primary = min(holders, key=lambda h: -_STRENGTH.get(h["mode"], _STRENGTH[EXCLUSIVE]))
+        return {**primary, "holders": holders}
+
     def _is_stale(self, lock_data: dict) -> bool:
         """
         Verifica se um lock está expirado (stale).
@@ -60,13 +456,38 @@ class LockManager:
         Returns:
             True se o lock está expirado
         """
+        return self._stale_reason(lock_data) is not None
+
+    def _stale_reason(self, lock_data: dict) -> Optional[str]:
+        """'expired' (lease vencido ou dados inválidos), 'dead' (dono morto) ou None."""
         try:
             locked_at = datetime.fromisoformat(lock_data['locked_at'])
             timeout = lock_data.get('timeout', self.default_timeout)
             expiration = locked_at + timedelta(seconds=timeout)
-            return datetime.now() > expiration
-        except (KeyError, ValueError):
-            return True  # Se dados inválidos, considera stale
+            if datetime.now() > expiration:
+                return "expired"  # Lease não renovado a tempo
+        except (KeyError, ValueError, TypeError):
+            return "expired"  # Se dados inválidos, considera stale
+        return None if self._owner_alive(lock_data) else "dead"
+
+    @staticmethod
+    def _owner_alive(lock_data: dict) -> bool:
+        """
+        Verifica se o processo dono de um lock ainda existe.
+
+        Só decide para locks desta máquina; de outro host, vale apenas o lease.
+        Um lock de intenção vive enquanto algum descendente que o sustenta viver.
+        """
+        if lock_data.get('host', _HOSTNAME) != _HOSTNAME:
+            return True
+        if lock_data.get('boot_id') and _BOOT_ID and lock_data['boot_id'] != _BOOT_ID:
+            return False  # Criado antes do último reboot
+
+        if lock_data.get('mode') in (INTENT_SHARED, INTENT_EXCLUSIVE):
+            pids = _intent_children(lock_data).values()
+        else:
+            pids = [lock_data.get('pid')]
+        return any(_pid_alive(pid) for pid in pids)
 
     def get_lock_info(self, resource: str) -> Optional[dict]:
         """
@@ -76,27 +497,14 @@ class LockManager:
             resource: Nome do recurso
 
         Returns:
-            Dict com informações do lock ou None se não existir
+            Dict do dono principal (locked_by, locked_at, mode, ...) com a
+            lista completa em 'holders', ou None se não houver lock ativo
         """
-        lock_file = self._get_lock_file(resource)
+        return self._routed("info", self._lock_info_file, resource)
 
-        if not lock_file.exists():
-            return None
-
-        try:
-            lock_data = json.loads(lock_file.read_text())
-
-            # Verifica se está stale
-            if self._is_stale(lock_data):
-                # Remove lock expirado
-                lock_file.unlink()
-                return None
-
-            return lock_data
-        except (json.JSONDecodeError, IOError):
-            # Se arquivo corrompido, remove
-            lock_file.unlink()
-            return None
+    def _lock_info_file(self, resource: str) -> Optional[dict]:
+        holders = self._read_holders(resource)
+        return self._summary(holders) if holders else None
 
     def _atomic_create_file(self, file_path: Path, content: str) -> bool:
         """
@@ -125,107 +533,502 @@ class LockManager:
         except OSError:
             return False
 
+    # -- Gates (espera sem polling) -------------------------------------------
+
+    def _hold_gates(self, resource: str, mode: str, agent: str, gates: bool = True) -> None:
+        """Segura flock compartilhado nos gates de um lock recém-adquirido (gates=False: via broker)."""
+        depth = self._held.get((resource, mode, agent), 0)
+        self._held[(resource, mode, agent)] = depth + 1
+        if depth:
+            return  # Readquirido por esta instância: só aumenta a profundidade
+        self._since[(resource, mode, agent)] = time.monotonic()
+        for key in self._plan(resource, mode):
+            refs = self._gate_refs.get(key, 0)
+            if refs == 0 and gates and fcntl is not None:
+                try:
+                    fd = os.open(str(self._get_gate_file(*key)), os.O_RDWR | os.O_CREAT, 0o644)
+                    # Só um waiter acordando segura LOCK_EX, e por um instante
+                    fcntl.flock(fd, fcntl.LOCK_SH)
+                    self._gates[key] = fd
+                except OSError:
+                    pass
+            self._gate_refs[key] = refs + 1
+
+    def _release_gates(self, resource: str, mode: str, agent: str) -> None:
+        """Solta os gates (fechar o fd libera o flock e acorda quem espera)."""
+        if self._held.pop((resource, mode, agent), None) is None:
+            return
+        since = self._since.pop((resource, mode, agent), None)
+        if since is not None:
+            self._record("release", resource, mode, agent, hold_ms=round((time.monotonic() - since) * 1000, 1))
+        for key in self._plan(resource, mode):
+            refs = self._gate_refs.get(key, 0) - 1
+            if refs > 0:
+                self._gate_refs[key] = refs
+                continue
+            self._gate_refs.pop(key, None)
+            fd = self._gates.pop(key, None)
+            if fd is not None:
+                os.close(fd)
+
+    def _sleep_on_gate(self, resource: str, mode: str, wait: float) -> bool:
+        """
+        Dorme até os donos de (resource, mode) soltarem o gate.
+
+        Returns:
+            False se não houve espera (gate livre ou removido, sem fcntl ou
+            com _MAX_PARKED_WAITERS esperas abandonadas ainda paradas)
+        """
+        if fcntl is None or _parked_waiters >= _MAX_PARKED_WAITERS:
+            return False
+        try:
+            # Sem O_CREAT: gate removido quer dizer que o dono já liberou
+            fd = os.open(str(self._get_gate_file(resource, mode)), os.O_RDWR)
+        except OSError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fd = _flock_wait(fd, wait)
+            if fd is not None:
+                os.close(fd)
+            return True
+        os.close(fd)
+        return False
+
+    def _seconds_until_stale(self, holder: dict) -> float:
+        """Segundos até um lock expirar (mínimo de um intervalo de polling)."""
+        try:
+            locked_at = datetime.fromisoformat(holder['locked_at'])
+            timeout = holder.get('timeout', self.default_timeout)
+        except (KeyError, ValueError, TypeError):
+            return _POLL_INTERVAL
+        remaining = (locked_at + timedelta(seconds=timeout) - datetime.now()).total_seconds()
+        return max(remaining, _POLL_INTERVAL)
+
+    # -- Aquisição e liberação ------------------------------------------------
+
+    def _try_acquire(
+        self, requests: List[Tuple[str, str]], agent: str, timeout: int, metadata: dict
+    ) -> Optional[Tuple[str, dict]]:
+        """
+        Registra um lote de locks e as intenções nos ancestrais, tudo ou nada.
+
+        Verificação e escrita acontecem na mesma seção crítica, então nenhum
+        outro agente vê (nem espera por) um lote adquirido pela metade.
+        Locks do mesmo agente nunca conflitam entre si (readquirir renova).
+
+        Returns:
+            None se adquiriu, ou (recurso, dono) do primeiro conflito
+        """
+        plan = [
+            (res, res_mode, resource)
+            for resource, mode in requests
+            for res, res_mode in self._plan(resource, mode)
+        ]
+        targets = dict(requests)
+        steals = []
+        with self._table_lock():
+            current = {}
+            for res, res_mode, _ in plan:
+                if res not in current:
+                    current[res] = []
+                    for holder in self._read_holders(res, live_only=False):
+                        reason = self._stale_reason(holder)
+                        if reason is None:
+                            current[res].append(holder)
+                        elif res in targets and holder["locked_by"] != agent and holder["mode"] in _INTENT_OF:
+                            steals.append((res, holder, reason))
+                for holder in current[res]:
+                    if holder["locked_by"] != agent and holder["mode"] not in _COMPATIBLE[res_mode]:
+                        return res, holder
+
+            now = datetime.now().isoformat()
+            for res, res_mode, resource in plan:
+                holders = current[res]
+                entry = next(
+                    (h for h in holders if h["locked_by"] == agent and h["mode"] == res_mode), None
+                )
+                if entry is None:
+                    entry = {"locked_by": agent, "mode": res_mode}
+                    holders.append(entry)
+                # Renovar por outro processo do mesmo agente transfere a posse
+                entry.update(locked_at=now, pid=os.getpid(), host=_HOSTNAME, boot_id=_BOOT_ID)
+                if res == resource:
+                    entry["timeout"] = timeout
+                    entry.update(metadata)
+                else:
+                    # Intenção vale enquanto algum lock descendente do agente existir
+                    entry["timeout"] = max(entry.get("timeout", 0), timeout)
+                    entry["for"] = {**_intent_children(entry), resource: os.getpid()}
+            for res, holders in current.items():
+                self._write_holders(res, holders)
+            # Gates tomados ainda na seção crítica: quem vir o lock registrado
+            # já encontra o gate ocupado e dorme nele
+            for resource, mode in requests:
+                self._hold_gates(resource, mode, agent)
+
+        for res, holder, reason in steals:
+            self._record("steal", res, targets[res], agent, from_agent=holder["locked_by"],
+                         from_mode=holder["mode"], reason=reason)
+        return None
+
     def acquire_lock(
         self,
         resource: str,
         agent: str = None,
         timeout: int = None,
+        mode: str = EXCLUSIVE,
         **metadata
     ) -> bool:
         """
-        Tenta adquirir um lock para um recurso.
-
-        Usa operações atômicas (O_CREAT | O_EXCL) para prevenir race conditions.
+        Tenta adquirir um lock para um recurso (sem esperar).
 
         Args:
-            resource: Nome do recurso a bloquear
+            resource: Nome do recurso a bloquear ('backlog' ou 'backlog/epic-3/story-3.2')
             agent: Nome do agente (detectado automaticamente se não fornecido)
             timeout: Timeout em segundos (usa default_timeout se não fornecido)
+            mode: SHARED (leitura) ou EXCLUSIVE (escrita)
             **metadata: Metadados adicionais para o lock
 
         Returns:
             True se conseguiu adquirir o lock, False caso contrário
         """
-        lock_file = self._get_lock_file(resource)
-        agent = agent or self._get_agent_source()
-        timeout = timeout or self.default_timeout
+        self._check_mode(mode)
+        return self._acquire_all([(resource, mode)], agent, 0, timeout, metadata)
 
-        # Verifica se já existe lock (e se está stale)
-        existing_lock = self.get_lock_info(resource)
+    def release_lock(self, resource: str, agent: str = None, mode: str = None) -> bool:
+        """
+        Libera um lock de um recurso (e as intenções que ele criou nos ancestrais).
 
-        if existing_lock:
-            # Verifica se é o mesmo agente
-            if existing_lock['locked_by'] == agent:
-                # Renova o lock (reescrita é segura para o mesmo agente)
-                existing_lock['locked_at'] = datetime.now().isoformat()
-                lock_file.write_text(json.dumps(existing_lock, indent=2))
-                return True
+        Args:
+            resource: Nome do recurso
+            agent: Nome do agente (detectado automaticamente se não fornecido)
+            mode: Libera só este modo (padrão: todos os locks do agente no recurso)
 
-            # Lock pertence a outro agente e não está stale
+        Returns:
+            True se conseguiu liberar, False caso contrário
+        """
+        agent = agent or self._get_agent_source()
+        modes = {mode} if mode else set(_INTENT_OF)
+
+        # Aquisições aninhadas na mesma instância: só a mais externa libera
+        nested = {m for m in modes if self._held.get((resource, m, agent), 0) > 1}
+        for m in nested:
+            self._held[(resource, m, agent)] -= 1
+        modes -= nested
+        if nested and not any((resource, m, agent) in self._held for m in modes):
+            return True
+
+        if not self._routed("release", self._release_file, resource, agent, sorted(modes)):
             return False
 
-        # Cria novo lock usando operação atômica
-        lock_data = {
-            "locked_by": agent,
-            "locked_at": datetime.now().isoformat(),
-            "pid": os.getpid(),
-            "timeout": timeout,
-            **metadata
-        }
+        # Remove o JSON antes de soltar os gates: quem acordar já encontra o recurso livre
+        for released in modes:
+            self._release_gates(resource, released, agent)
+        return True
+
+    def _release_file(self, resource: str, agent: str, modes: List[str]) -> bool:
+        with self._table_lock():
+            holders = self._read_holders(resource)
+            mine = [h for h in holders if h["locked_by"] == agent and h["mode"] in modes]
+            if not mine and any(h["locked_by"] != agent and h["mode"] in _INTENT_OF for h in holders):
+                return False  # Não pode liberar lock de outro agente
+
+            if mine:
+                self._write_holders(resource, [h for h in holders if h not in mine])
+                intents = {_INTENT_OF[h["mode"]] for h in mine}
+                for parent in _parent_resources(resource):
+                    self._drop_intents(parent, resource, lambda h: h["locked_by"] == agent and h["mode"] in intents)
+        return True
+
+    def _drop_intents(self, parent: str, resource: str, match) -> None:
+        """Tira 'resource' das intenções de 'parent' que casam com 'match' (sob a tabela)."""
+        holders = self._read_holders(parent)
+        kept = []
+        for holder in holders:
+            if holder["mode"] not in _INTENT_OF and match(holder):
+                holder["for"] = _intent_children(holder)
+                holder["for"].pop(resource, None)
+                if not holder["for"]:
+                    continue
+            kept.append(holder)
+        self._write_holders(parent, kept)
+
+    def acquire(
+        self,
+        resource: str,
+        agent: str = None,
+        wait: float = 30,
+        timeout: int = None,
+        mode: str = EXCLUSIVE,
+        **metadata
+    ) -> bool:
+        """
+        Adquire um lock, bloqueando até 'wait' segundos se estiver ocupado.
 
-        content = json.dumps(lock_data, indent=2)
+        A espera dorme no flock do gate do dono conflitante e acorda assim
+        que ele libera (sem intervalo de polling). Se o dono não segura o
+        gate (processo que terminou sem liberar), espera o lock expirar.
 
-        # Security fix: Usa criação atômica para prevenir race condition (TOCTOU)
-        if self._atomic_create_file(lock_file, content):
-            return True
+        Args:
+            resource: Nome do recurso
+            agent: Nome do agente (detectado automaticamente se não fornecido)
+            wait: Tempo máximo de espera em segundos (0 = não bloqueia)
+            timeout: Timeout do lock em segundos (usa default_timeout se não fornecido)
+            mode: SHARED (leitura) ou EXCLUSIVE (escrita)
+            **metadata: Metadados adicionais para o lock
 
-        # Se falhou, pode ser que outro processo criou o lock entre nossa verificação
-        # e a tentativa de criação. Verificamos novamente.
-        existing_lock = self.get_lock_info(resource)
-        if existing_lock and existing_lock['locked_by'] == agent:
-            # É nosso lock (caso raro de retry)
-            return True
+        Returns:
+            True se adquiriu, False se estourou o tempo de espera
+        """
+        self._check_mode(mode)
+        return self._acquire_all([(resource, mode)], agent, wait, timeout, metadata)
 
-        return False
+    def acquire_many(
+        self,
+        resources: Iterable,
+        agent: str = None,
+        wait: float = 30,
+        timeout: int = None,
+        mode: str = EXCLUSIVE,
+        **metadata
+    ) -> bool:
+        """
+        Adquire vários locks de uma vez: todos ou nenhum.
+
+        Os recursos são ordenados canonicamente e registrados numa única
+        seção crítica; enquanto algum estiver ocupado, nenhum fica retido,
+        então dois agentes com lotes sobrepostos nunca entram em deadlock.
+
+        Args:
+            resources: Itens 'recurso' (usa 'mode') ou (recurso, modo)
+            agent: Nome do agente (detectado automaticamente se não fornecido)
+            wait: Tempo máximo de espera em segundos (0 = não bloqueia)
+            timeout: Timeout dos locks em segundos (usa default_timeout se não fornecido)
+            mode: Modo padrão dos itens sem modo explícito
+            **metadata: Metadados adicionais para os locks
+
+        Returns:
+            True se adquiriu todos, False se estourou o tempo de espera
+        """
+        return self._acquire_all(self._lock_requests(resources, mode), agent, wait, timeout, metadata)
+
+    def release_many(self, resources: Iterable, agent: str = None, mode: str = EXCLUSIVE) -> bool:
+        """Libera um lote adquirido com acquire_many() (mesmos argumentos)."""
+        agent = agent or self._get_agent_source()
+        released = [self.release_lock(res, agent, mode=res_mode)
+                    for res, res_mode in reversed(self._lock_requests(resources, mode))]
+        return all(released)
+
+    def _acquire_all(
+        self,
+        requests: List[Tuple[str, str]],
+        agent: str,
+        wait: float,
+        timeout: int,
+        metadata: dict,
+        on_conflict: Optional[Callable[[str, dict], None]] = None,
+    ) -> bool:
+        """
+        Laço de espera comum a todas as formas de aquisição.
+
+        Registra no histórico uma tentativa por recurso pedido, com o tempo
+        total de espera (exceto aquisições aninhadas desta instância, que não
+        geram posse própria). 'on_conflict' é chamado no primeiro conflito que
+        leva a esperar. Com o broker no ar, a espera toda acontece na fila
+        FIFO dele; se ele cair no meio, o restante segue pelos arquivos.
+        """
+        agent = agent or self._get_agent_source()
+        timeout = timeout or self.default_timeout
+        started = time.monotonic()
+        deadline = started + max(wait, 0)
+        backoff = _POLL_INTERVAL
+        attempts = 0
+
+        while True:
+            attempts += 1
+            conflict, final = self._acquire_attempt(
+                requests, agent, timeout, metadata, deadline, on_conflict if attempts == 1 else None
+            )
+            remaining = deadline - time.monotonic()
+            if conflict is None or remaining <= 0 or final:
+                wait_ms = round((time.monotonic() - started) * 1000, 1)
+                for resource, mode in requests:
+                    if conflict is None and self._held.get((resource, mode, agent), 0) > 1:
+                        continue  # Aninhada: só a mais externa tem tentativa (e posse) no histórico
+                    self._record("acquire", resource, mode, agent, ok=conflict is None,
+                                 wait_ms=wait_ms, attempts=attempts)
+                return conflict is None
+
+            res, holder = conflict
+            if on_conflict and attempts == 1:
+                on_conflict(res, holder)
+            nap = min(remaining, self._seconds_until_stale(holder))
+            if not self._sleep_on_gate(res, holder["mode"], nap):
+                # Conflito registrado mas gate livre (dono sem gate ou sem fcntl):
+                # backoff exponencial com jitter para não disputar em sincronia
+                time.sleep(min(remaining, random.uniform(0, backoff)))
+                backoff = min(backoff * 2, _MAX_BACKOFF)
+
+    def _acquire_attempt(
+        self,
+        requests: List[Tuple[str, str]],
+        agent: str,
+        timeout: int,
+        metadata: dict,
+        deadline: float,
+        on_conflict: Optional[Callable[[str, dict], None]],
+        retry: bool = True,
+    ) -> Tuple[Optional[Tuple[str, dict]], bool]:
+        """
+        Uma tentativa de _acquire_all(), pelo broker ou pelos arquivos.
+
+        Returns:
+            (conflito ou None, True se a espera já foi feita pelo broker)
+        """
+        broker = self._broker_client()
+        if broker is not None:
+            try:
+                conflict = broker.acquire(requests, agent, timeout, metadata,
+                                          max(deadline - time.monotonic(), 0), on_conflict)
+            except ConnectionError:
+                pass  # Broker caiu ou está encerrando: tenta pelos arquivos
+            else:
+                if conflict is None:
+                    for resource, mode in requests:
+                        self._hold_gates(resource, mode, agent, gates=False)
+                return conflict, True
+        try:
+            return self._try_acquire(requests, agent, timeout, metadata), False
+        except _BrokerStarted:
+            if retry:
+                return self._acquire_attempt(requests, agent, timeout, metadata, deadline, on_conflict, retry=False)
+        # Broker registrado mas sem responder: não há como coordenar por ele
+        self._files_only = True
+        try:
+            return self._try_acquire(requests, agent, timeout, metadata), False
+        finally:
+            self._files_only = False
 
-    def release_lock(self, resource: str, agent: str = None) -> bool:
+    def renew(self, resource: str, agent: str = None, mode: str = None) -> bool:
         """
-        Libera um lock de um recurso.
+        Renova o lease de um lock detido (heartbeat), e das intenções nos ancestrais.
 
         Args:
             resource: Nome do recurso
             agent: Nome do agente (detectado automaticamente se não fornecido)
+            mode: Renova só este modo (padrão: todos os locks do agente no recurso)
 
         Returns:
-            True se conseguiu liberar, False caso contrário
+            True se renovou, False se o lock não pertence mais ao agente
+            (lease expirado e tomado, ou liberado à força)
         """
-        lock_file = self._get_lock_file(resource)
         agent = agent or self._get_agent_source()
+        modes = sorted({mode} if mode else set(_INTENT_OF))
+        return self._routed("renew", self._renew_file, resource, agent, modes)
+
+    def _renew_file(self, resource: str, agent: str, modes: List[str]) -> bool:
+        now = datetime.now().isoformat()
+        with self._table_lock():
+            holders = self._read_holders(resource)
+            mine = [h for h in holders if h["locked_by"] == agent and h["mode"] in modes]
+            if not mine:
+                return False
+            for holder in mine:
+                holder["locked_at"] = now
+            self._write_holders(resource, holders)
+
+            intents = {_INTENT_OF[h["mode"]] for h in mine}
+            for parent in _parent_resources(resource):
+                parent_holders = self._read_holders(parent)
+                for holder in parent_holders:
+                    if holder["locked_by"] == agent and holder["mode"] in intents:
+                        holder["locked_at"] = now
+                self._write_holders(parent, parent_holders)
+        return True
+
+    @contextmanager
+    def hold(
+        self,
+        resource: str,
+        agent: str = None,
+        wait: float = 30,
+        timeout: int = None,
+        mode: str = EXCLUSIVE,
+        renew_every: float = None,
+        **metadata
+    ):
+        """
+        Context manager: adquire o lock, renova o lease em background e libera na saída.
 
-        if not lock_file.exists():
-            return True  # Já liberado
+        Args:
+            resource: Nome do recurso
+            agent: Nome do agente (detectado automaticamente se não fornecido)
+            wait: Tempo máximo de espera para adquirir, em segundos
+            timeout: Duração do lease em segundos (usa default_timeout se não fornecido)
+            mode: SHARED (leitura) ou EXCLUSIVE (escrita)
+            renew_every: Intervalo de renovação (padrão: um terço do lease)
+            **metadata: Metadados adicionais para o lock
 
-        lock_info = self.get_lock_info(resource)
+        Raises:
+            TimeoutError: Se não conseguiu adquirir dentro de 'wait'
+        """
+        with self.hold_many([(resource, mode)], agent, wait, timeout, renew_every=renew_every, **metadata):
+            yield self
 
-        if not lock_info:
-            return True  # Lock expirado ou inválido
+    @contextmanager
+    def hold_many(
+        self,
+        resources: Iterable,
+        agent: str = None,
+        wait: float = 30,
+        timeout: int = None,
+        mode: str = EXCLUSIVE,
+        renew_every: float = None,
+        **metadata
+    ):
+        """
+        Context manager de acquire_many(): todos os locks ou nenhum, com
+        lease renovado em background e liberação na saída.
 
-        # Verifica se o lock pertence a este agente
-        if lock_info['locked_by'] != agent:
-            return False  # Não pode liberar lock de outro agente
+        Args:
+            resources: Itens 'recurso' (usa 'mode') ou (recurso, modo)
+            agent: Nome do agente (detectado automaticamente se não fornecido)
+            wait: Tempo máximo de espera para adquirir, em segundos
+            timeout: Duração do lease em segundos (usa default_timeout se não fornecido)
+            mode: Modo padrão dos itens sem modo explícito
+            renew_every: Intervalo de renovação (padrão: um terço do lease)
+            **metadata: Metadados adicionais para os locks
+
+        Raises:
+            TimeoutError: Se não conseguiu adquirir dentro de 'wait'
+        """
+        agent = agent or self._get_agent_source()
+        timeout = timeout or self.default_timeout
+        requests = self._lock_requests(resources, mode)
+        if not self._acquire_all(requests, agent, wait, timeout, metadata):
+            names = ", ".join(f"'{res}'" for res, _ in requests)
+            raise TimeoutError(f"Recurso(s) {names} bloqueado(s) por outro agente ({wait}s)")
 
+        renewer = _LeaseRenewer(self, requests, agent, renew_every or timeout / 3)
+        renewer.start()
         try:
-            lock_file.unlink()
-            return True
-        except IOError:
-            return False
+            yield self
+        finally:
+            renewer.stop()
+            for resource in renewer.lost:
+                print(f"⚠️  Lease de '{resource}' expirou durante a operação (lock pode ter sido tomado)")
+            for resource, res_mode in reversed(requests):
+                self.release_lock(resource, agent, mode=res_mode)
 
     def wait_for_lock(
         self,
         resource: str,
         agent: str = None,
         max_wait: int = 30,
-        check_interval: float = 0.5
+        check_interval: float = 0.5,
+        mode: str = EXCLUSIVE
     ) -> bool:
         """
         Aguarda até conseguir adquirir um lock.
@@ -234,27 +1037,88 @@ class LockManager:
             resource: Nome do recurso
             agent: Nome do agente
             max_wait: Tempo máximo de espera em segundos
-            check_interval: Intervalo entre tentativas em segundos
+            check_interval: Mantido por compatibilidade (a espera usa acquire())
+            mode: SHARED (leitura) ou EXCLUSIVE (escrita)
 
         Returns:
             True se conseguiu adquirir, False se timeout
         """
-        agent = agent or self._get_agent_source()
-        start_time = time.time()
-
-        while time.time() - start_time < max_wait:
-            if self.acquire_lock(resource, agent):
-                return True
+        self._check_mode(mode)
 
+        def _notify(res: str, holder: dict) -> None:
             # Mostra mensagem informativa
-            lock_info = self.get_lock_info(resource)
-            if lock_info:
-                locked_by = lock_info['locked_by']
-                print(f"⏳ Recurso '{resource}' bloqueado por '{locked_by}'. Aguardando...")
+            print(f"⏳ Recurso '{res}' bloqueado por '{holder['locked_by']}'. Aguardando...")
 
-            time.sleep(check_interval)
+        return self._acquire_all([(resource, mode)], agent, max_wait, None, {}, on_conflict=_notify)
 
-        return False
+    # -- Histórico de contenção -----------------------------------------------
+
+    def _record(self, event: str, resource: str, mode: str, agent: str, **fields) -> None:
+        """Anexa um evento a stats.jsonl (best-effort: falha de I/O não afeta o lock)."""
+        line = json.dumps({
+            "ts": round(time.time(), 3), "event": event, "resource": resource,
+            "mode": mode, "agent": agent, **fields,
+        }) + "\n"
+        stats_file = self._get_stats_file()
+        try:
+            if stats_file.exists() and stats_file.stat().st_size > _STATS_MAX_BYTES:
+                with self._table_lock(check_broker=False):
+                    if stats_file.exists() and stats_file.stat().st_size > _STATS_MAX_BYTES:
+                        os.replace(stats_file, stats_file.with_name(stats_file.name + ".1"))
+            # O_APPEND: linhas curtas de processos diferentes não se misturam
+            fd = os.open(str(stats_file), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def lock_stats(self, days: Optional[float] = None) -> Dict[str, dict]:
+        """
+        Agrega o histórico de contenção por recurso.
+
+        Args:
+            days: Considera só os últimos N dias (padrão: todo o histórico)
+
+        Returns:
+            {resource: {"attempts", "acquired", "timeouts", "steals",
+                        "wait_ms": [...], "hold_ms": [...]}} com amostras ordenadas
+        """
+        since = time.time() - days * 86400 if days else 0
+        stats: Dict[str, dict] = {}
+        stats_file = self._get_stats_file()
+
+        for path in (stats_file.with_name(stats_file.name + ".1"), stats_file):
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except OSError:
+                continue
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                    if event["ts"] < since:
+                        continue
+                    resource, kind = event["resource"], event["event"]
+                except (ValueError, KeyError, TypeError):
+                    continue  # Linha truncada (processo morto no meio da escrita)
+
+                entry = stats.setdefault(resource, {
+                    "attempts": 0, "acquired": 0, "timeouts": 0, "steals": 0, "wait_ms": [], "hold_ms": [],
+                })
+                if kind == "acquire":
+                    entry["attempts"] += 1
+                    entry["wait_ms"].append(event.get("wait_ms", 0))
+                    entry["acquired" if event.get("ok") else "timeouts"] += 1
+                elif kind == "release":
+                    entry["hold_ms"].append(event.get("hold_ms", 0))
+                elif kind == "steal":
+                    entry["steals"] += 1
+
+        for entry in stats.values():
+            entry["wait_ms"].sort()
+            entry["hold_ms"].sort()
+        return stats
 
     def force_release(self, resource: str) -> bool:
         """
@@ -266,31 +1130,39 @@ class LockManager:
         Returns:
             True se conseguiu liberar
         """
-        lock_file = self._get_lock_file(resource)
-
-        if not lock_file.exists():
-            return True
+        return self._routed("force_release", self._force_release_file, resource)
 
+    def _force_release_file(self, resource: str) -> bool:
         try:
-            lock_file.unlink()
+            with self._table_lock():
+                self._write_holders(resource, [])
+                for parent in _parent_resources(resource):
+                    self._drop_intents(parent, resource, lambda h: True)
             return True
         except IOError:
             return False
 
-    def list_active_locks(self) -> dict:
+    def list_active_locks(self, include_intents: bool = False) -> dict:
         """
         Lista todos os locks ativos.
 
+        Args:
+            include_intents: Inclui recursos com apenas locks de intenção
+
         Returns:
             Dict com resource -> lock_info
         """
+        return self._routed("list", self._list_file, include_intents)
+
+    def _list_file(self, include_intents: bool) -> dict:
         active_locks = {}
 
-        for lock_file in self.locks_dir.glob("*.lock"):
-            resource = lock_file.stem
-            lock_info = self.get_lock_info(resource)
+        for lock_file in sorted(self.locks_dir.rglob("*.lock")):
+            resource = lock_file.relative_to(self.locks_dir).with_suffix("").as_posix()
+            lock_info = self._lock_info_file(resource)
 
-            if lock_info:  # Ignora locks stale
+            # Ignora locks stale (e, por padrão, os só de intenção)
+            if lock_info and (include_intents or lock_info["mode"] in _INTENT_OF):
                 active_locks[resource] = lock_info
 
         return active_locks
@@ -302,21 +1174,62 @@ class LockManager:
         Returns:
             Número de locks removidos
         """
+        return self._routed("cleanup", self._cleanup_file)
+
+    def _cleanup_file(self) -> int:
         count = 0
 
-        for lock_file in self.locks_dir.glob("*.lock"):
-            try:
-                lock_data = json.loads(lock_file.read_text())
-                if self._is_stale(lock_data):
-                    lock_file.unlink()
+        with self._table_lock():
+            for lock_file in self.locks_dir.rglob("*.lock"):
+                resource = lock_file.relative_to(self.locks_dir).with_suffix("").as_posix()
+                holders = self._read_holders(resource, live_only=False)
+                live = [h for h in holders if not self._is_stale(h)]
+                if not holders:
+                    self._write_holders(resource, [])  # Arquivo corrompido
                     count += 1
-            except (json.JSONDecodeError, IOError):
-                lock_file.unlink()
-                count += 1
+                elif len(live) < len(holders):
+                    self._write_holders(resource, live)
+                    count += len(holders) - len(live)
 
         return count
 
 
+def _format_ms(value: float) -> str:
+    return f"{value / 1000:.1f}s" if value >= 1000 else f"{value:.0f}ms"
+
+
+def _histogram_line(values: List[float], width: int = 12) -> str:
+    """Contagem por faixa de duração, com barra proporcional."""
+    counts = [0] * len(_HISTOGRAM_BUCKETS)
+    for value in values:
+        counts[next(i for i, (limit, _) in enumerate(_HISTOGRAM_BUCKETS) if value < limit)] += 1
+    peak = max(counts) or 1
+    return " | ".join(
+        f"{label} {'█' * max(1, round(count / peak * width))} {count}"
+        for (_, label), count in zip(_HISTOGRAM_BUCKETS, counts) if count
+    )
+
+
+def print_lock_stats(stats: Dict[str, dict], days: Optional[float] = None) -> None:
+    """Relatório do comando stats: recursos com mais espera acumulada primeiro."""
+    if not stats:
+        print("📭 Nenhum histórico de locks")
+        return
+
+    period = f"últimos {days:g} dia(s)" if days else "todo o histórico"
+    print(f"📊 Contenção de locks ({period}):\n")
+    for resource, entry in sorted(stats.items(), key=lambda item: -sum(item[1]["wait_ms"])):
+        print(f"  • {resource}")
+        print(f"    Tentativas: {entry['attempts']} ({entry['timeouts']} timeout(s), {entry['steals']} tomado(s) de donos mortos/expirados)")
+        for label, values in (("Espera", entry["wait_ms"]), ("Posse ", entry["hold_ms"])):
+            if not values:
+                continue
+            p50, p95, p99 = (_format_ms(_percentile(values, p)) for p in (50, 95, 99))
+            print(f"    {label}: p50 {p50} | p95 {p95} | p99 {p99} | máx {_format_ms(values[-1])} (n={len(values)})")
+            print(f"            {_histogram_line(values)}")
+        print()
+
+
 def main():
     """CLI para gerenciar locks manualmente."""
     if len(sys.argv) < 2:
@@ -325,6 +1238,7 @@ def main():
         print("  list     - Lista locks ativos")
         print("  cleanup  - Remove locks expirados")
         print("  force-release <resource> - Força liberação de um lock")
+        print("  stats [--days N] - Percentis de espera/posse por recurso")
         sys.exit(0)
 
     cmd = sys.argv[1].lower()
@@ -340,9 +1254,13 @@ def main():
                 locked_at = datetime.fromisoformat(info['locked_at'])
                 elapsed = datetime.now() - locked_at
                 minutes = int(elapsed.total_seconds() / 60)
+                owners = ", ".join(
+                    f"{h['locked_by']} ({_MODE_LABELS[h['mode']]})"
+                    for h in info['holders'] if h['mode'] in _INTENT_OF
+                )
 
                 print(f"  • {resource}")
-                print(f"    Bloqueado por: {info['locked_by']}")
+                print(f"    Bloqueado por: {owners}")
                 print(f"    Há {minutes} minuto(s)")
                 print()
 
@@ -361,6 +1279,14 @@ def main():
         else:
             print(f"❌ Falha ao liberar lock '{resource}'")
 
+    elif cmd == "stats":
+        days = None
+        if "--days" in sys.argv:
+            idx = sys.argv.index("--days")
+            if idx + 1 < len(sys.argv):
+                days = float(sys.argv[idx + 1])
+        print_lock_stats(lock_mgr.lock_stats(days), days)
+
     else:
         print(f"❌ Comando desconhecido: {cmd}")
         sys.exit(1)
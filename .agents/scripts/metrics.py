@@ -16,6 +16,7 @@ Métricas coletadas:
     - Distribuição por agente
 """
 
+import os
 import sys
 import json
 from datetime import datetime, timedelta
@@ -25,7 +26,8 @@ from collections import defaultdict
 import re
 
 sys.path.insert(0, str(Path(__file__).parent))
-from platform_compat import find_backlog, find_logs_dir
+from platform_compat import find_backlog, find_logs_dir, get_agent_root, iter_log_sessions
+from session_store import SessionStore
 
 
 def extract_story_ids(text: str) -> List[str]:
@@ -56,50 +58,21 @@ def parse_session_log(filepath: Path) -> List[dict]:
 
     date = date_match.group(1)
 
-    sessions = []
-
-    # Regex para sessões
-    session_pattern = re.compile(
-        r"^\d+\.\s+(\d{1,2}:\d{2})\s*[—–-]\s*(\d{1,2}:\d{2})\s*\((\d{1,2}:\d{2})\)\s*(?:\[.*?([a-z_]+)\])?",
-        re.MULTILINE | re.IGNORECASE
-    )
-
-    for match in session_pattern.finditer(content):
-        start = match.group(1)
-        end = match.group(2)
-        duration_str = match.group(3)
-        agent = match.group(4) if match.group(4) else "antigravity"
-
-        # Parse duration
-        dur_match = re.match(r"(\d{1,2}):(\d{2})", duration_str)
-        if dur_match:
-            hours, minutes = int(dur_match.group(1)), int(dur_match.group(2))
-            duration_minutes = hours * 60 + minutes
-        else:
-            duration_minutes = 0
-
-        # Extrair atividades
-        start_pos = match.end()
-        next_session = session_pattern.search(content, start_pos)
-        end_pos = next_session.start() if next_session else len(content)
-
-        section = content[start_pos:end_pos]
-        activities = re.findall(r"^\s+-\s+(.+)$", section, re.MULTILINE)
-
-        sessions.append({
+    return [
+        {
             'date': date,
-            'start': start,
-            'end': end,
-            'duration_minutes': duration_minutes,
-            'agent': agent,
-            'activities': activities
-        })
-
-    return sessions
+            'start': rec.start,
+            'end': rec.end,
+            'duration_minutes': rec.duration_minutes,
+            'agent': rec.agent or "antigravity",
+            'activities': rec.activities,
+        }
+        for rec in iter_log_sessions(content)
+    ]
 
 
 def get_sessions_in_range(days_back: int = 7) -> List[dict]:
-    """Obtém todas as sessões dos últimos N dias."""
+    """Obtém todas as sessões dos últimos N dias (via session store)."""
     logs_dir = find_logs_dir()
     if not logs_dir:
         return []
@@ -107,23 +80,20 @@ def get_sessions_in_range(days_back: int = 7) -> List[dict]:
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days_back)
 
-    all_sessions = []
-
-    for year_dir in logs_dir.iterdir():
-        if not year_dir.is_dir():
-            continue
-
-        for log_file in year_dir.glob("*.md"):
-            try:
-                file_date = datetime.strptime(log_file.stem, "%Y-%m-%d")
-            except ValueError:
-                continue
+    records = SessionStore(logs_dir).query_records(start_date.date(), end_date.date())
+    return [_record_to_session(r) for r in records]
 
-            if start_date.date() <= file_date.date() <= end_date.date():
-                sessions = parse_session_log(log_file)
-                all_sessions.extend(sessions)
 
-    return sorted(all_sessions, key=lambda s: (s['date'], s['start']))
+def _record_to_session(record: dict) -> dict:
+    """Converte um registro do session store no formato de sessão deste módulo."""
+    return {
+        'date': record['date'],
+        'start': record['start'],
+        'end': record['end'],
+        'duration_minutes': record['duration_minutes'],
+        'agent': record['agent'] or "antigravity",
+        'activities': record['activities'],
+    }
 
 
 def calculate_time_per_epic(sessions: List[dict]) -> Dict[str, int]:
@@ -161,9 +131,9 @@ def calculate_time_per_epic(sessions: List[dict]) -> Dict[str, int]:
     return dict(epic_time)
 
 
-def calculate_velocity(sessions: List[dict], backlog_path: Optional[Path]) -> Dict[str, float]:
+def calculate_velocity(merged: dict, backlog_path: Optional[Path]) -> Dict[str, float]:
     """
-    Calcula velocidade (stories concluídas por semana).
+    Calcula velocidade (stories concluídas por semana) de um rollup mesclado.
 
     Returns:
         Dict com métricas de velocidade
@@ -171,18 +141,10 @@ def calculate_velocity(sessions: List[dict], backlog_path: Optional[Path]) -> Di
     if not backlog_path:
         return {'stories_per_week': 0.0, 'completion_rate': 0.0}
 
-    # Conta stories concluídas mencionadas nas atividades
-    completed_stories = set()
-
-    for session in sessions:
-        for activity in session['activities']:
-            # Detecta conclusão
-            if re.search(r'\b(?:conclu[íi]d[oa]|done|finished|✅)\b', activity, re.IGNORECASE):
-                story_ids = extract_story_ids(activity)
-                completed_stories.update(story_ids)
+    completed_stories = merged['completed']
 
     # Calcula stories por semana
-    total_days = len(set(s['date'] for s in sessions))
+    total_days = len(merged['dates'])
     weeks = total_days / 7.0 if total_days > 0 else 1
 
     stories_per_week = len(completed_stories) / weeks if weeks > 0 else 0
@@ -194,16 +156,31 @@ def calculate_velocity(sessions: List[dict], backlog_path: Optional[Path]) -> Di
     }
 
 
-def calculate_focus_score(sessions: List[dict], epic_time: Dict[str, int]) -> float:
+def _completed_stories(sessions: List[dict]) -> set:
+    """Stories concluídas mencionadas nas atividades."""
+    completed_stories = set()
+
+    for session in sessions:
+        for activity in session['activities']:
+            # Detecta conclusão
+            if re.search(r'\b(?:conclu[íi]d[oa]|done|finished|✅)\b', activity, re.IGNORECASE):
+                story_ids = extract_story_ids(activity)
+                completed_stories.update(story_ids)
+
+    return completed_stories
+
+
+def calculate_focus_score(merged: dict) -> float:
     """
-    Calcula score de foco (% tempo em Epics prioritários).
+    Calcula score de foco (% tempo em Epics prioritários) de um rollup mesclado.
 
     Assume que Epics com maior tempo são prioritários.
     """
+    epic_time = merged['epic_time']
     if not epic_time:
         return 0.0
 
-    total_time = sum(s['duration_minutes'] for s in sessions)
+    total_time = merged['minutes']
     if total_time == 0:
         return 0.0
 
@@ -215,119 +192,222 @@ def calculate_focus_score(sessions: List[dict], epic_time: Dict[str, int]) -> fl
     return round(focus_score, 2)
 
 
-def analyze_session_patterns(sessions: List[dict]) -> Dict[str, any]:
+def analyze_session_patterns(merged: dict) -> Dict[str, any]:
     """
-    Analisa padrões de sessão (horários produtivos, duração média, etc.).
+    Analisa padrões de sessão (horários produtivos, duração média, etc.)
+    de um rollup mesclado.
 
     Returns:
         Dict com análise de padrões
     """
-    if not sessions:
+    if not merged['sessions']:
         return {}
 
-    # Horários de início
-    start_hours = []
-    session_durations = []
-    hourly_productivity = defaultdict(int)  # hora -> minutos trabalhados
-
-    for session in sessions:
-        # Parse hora de início
-        start_match = re.match(r'(\d{1,2}):\d{2}', session['start'])
-        if start_match:
-            hour = int(start_match.group(1))
-            start_hours.append(hour)
-            hourly_productivity[hour] += session['duration_minutes']
-
-        session_durations.append(session['duration_minutes'])
+    hourly_productivity = merged['hourly']  # hora -> minutos trabalhados
+    start_hours = merged['start_hours']     # hora -> sessões iniciadas
 
-    # Encontra horário mais produtivo
+    # Encontra horário mais produtivo (desempate: primeira ocorrência)
     most_productive_hour = max(hourly_productivity.items(), key=lambda x: x[1])[0] if hourly_productivity else None
 
     # Duração média
-    avg_duration = sum(session_durations) / len(session_durations) if session_durations else 0
+    avg_duration = merged['minutes'] / merged['sessions']
 
     # Horário de início mais comum
-    most_common_start = max(set(start_hours), key=start_hours.count) if start_hours else None
+    most_common_start = max(set(start_hours), key=start_hours.get) if start_hours else None
 
     return {
         'avg_session_duration_minutes': round(avg_duration, 2),
         'most_productive_hour': most_productive_hour,
         'most_common_start_hour': most_common_start,
-        'total_sessions': len(sessions),
+        'total_sessions': merged['sessions'],
         'hourly_distribution': dict(hourly_productivity)
     }
 
 
-def calculate_agent_distribution(sessions: List[dict]) -> Dict[str, any]:
+def calculate_agent_distribution(merged: dict) -> Dict[str, any]:
     """
-    Calcula distribuição de trabalho por agente.
+    Calcula distribuição de trabalho por agente de um rollup mesclado.
 
     Returns:
         Dict com agente -> {sessions, minutes, percentage}
     """
-    agent_stats = defaultdict(lambda: {'sessions': 0, 'minutes': 0})
-    total_minutes = 0
+    total_minutes = merged['minutes']
+    return {
+        agent: {
+            'sessions': count,
+            'minutes': minutes,
+            'percentage': round((minutes / total_minutes * 100), 2) if total_minutes > 0 else 0,
+        }
+        for agent, (count, minutes) in merged['agents'].items()
+    }
 
-    for session in sessions:
-        agent = session['agent']
-        agent_stats[agent]['sessions'] += 1
-        agent_stats[agent]['minutes'] += session['duration_minutes']
-        total_minutes += session['duration_minutes']
 
-    # Calcula percentuais
-    for agent, stats in agent_stats.items():
-        stats['percentage'] = round((stats['minutes'] / total_minutes * 100), 2) if total_minutes > 0 else 0
+# ---------------------------------------------------------------------------
+# Rollups diários (recalculados só para dias cujo log mudou)
+# ---------------------------------------------------------------------------
 
-    return dict(agent_stats)
+ROLLUP_VERSION = 1
 
 
-def collect_metrics(days_back: int = 7) -> Dict[str, any]:
+def _rollup_cache_path() -> Path:
+    return get_agent_root() / "cache" / "metrics" / "rollups.json"
+
+
+def compute_day_rollup(sessions: List[dict]) -> dict:
     """
-    Coleta todas as métricas do período.
+    Agrega as sessões de um dia em contadores mescláveis.
 
-    Args:
-        days_back: Número de dias para analisar
+    Dicts/listas preservam a ordem de primeira ocorrência, para que o merge
+    de vários dias reproduza os desempates de um rollup único do período.
+    """
+    start_hours: Dict[int, int] = {}
+    hourly: Dict[int, int] = {}
+    agents: Dict[str, List[int]] = {}
+    for session in sessions:
+        start_match = re.match(r'(\d{1,2}):\d{2}', session['start'])
+        if start_match:
+            hour = int(start_match.group(1))
+            start_hours[hour] = start_hours.get(hour, 0) + 1
+            hourly[hour] = hourly.get(hour, 0) + session['duration_minutes']
+        totals = agents.setdefault(session['agent'], [0, 0])
+        totals[0] += 1
+        totals[1] += session['duration_minutes']
 
-    Returns:
-        Dict com todas as métricas
+    return {
+        'dates': list(dict.fromkeys(s['date'] for s in sessions)),
+        'sessions': len(sessions),
+        'minutes': sum(s['duration_minutes'] for s in sessions),
+        'epic_time': calculate_time_per_epic(sessions),
+        'completed': sorted(_completed_stories(sessions)),
+        # Pares [hora, valor]: chaves JSON seriam convertidas em string
+        'hourly': [[hour, minutes] for hour, minutes in hourly.items()],
+        'start_hours': [[hour, count] for hour, count in start_hours.items()],
+        'agents': agents,
+    }
+
+
+def merge_rollups(rollups: List[dict]) -> dict:
+    """Mescla rollups diários (em ordem cronológica) em um rollup do período."""
+    merged = {
+        'dates': {}, 'sessions': 0, 'minutes': 0, 'epic_time': {}, 'completed': set(),
+        'hourly': {}, 'start_hours': {}, 'agents': {},
+    }
+    for rollup in rollups:
+        merged['dates'].update(dict.fromkeys(rollup['dates']))
+        merged['sessions'] += rollup['sessions']
+        merged['minutes'] += rollup['minutes']
+        merged['completed'].update(rollup['completed'])
+        for epic, minutes in rollup['epic_time'].items():
+            merged['epic_time'][epic] = merged['epic_time'].get(epic, 0) + minutes
+        for key in ('hourly', 'start_hours'):
+            for hour, value in rollup[key]:
+                merged[key][hour] = merged[key].get(hour, 0) + value
+        for agent, (count, minutes) in rollup['agents'].items():
+            totals = merged['agents'].setdefault(agent, [0, 0])
+            totals[0] += count
+            totals[1] += minutes
+    return merged
+
+
+def load_daily_rollups(start_date: datetime, end_date: datetime) -> List[dict]:
+    """
+    Rollups diários do período, em ordem cronológica.
+
+    Só os dias cujo log mudou desde a última execução (ou gravados há
+    instantes) são recalculados; o resto vem do cache em .agents/cache/metrics/.
     """
-    sessions = get_sessions_in_range(days_back)
+    logs_dir = find_logs_dir()
+    if not logs_dir:
+        return []
+
+    store = SessionStore(logs_dir)
+    stamps = store.sync(start_date.date(), end_date.date())
+
+    cache_path = _rollup_cache_path()
+    try:
+        cache = json.loads(cache_path.read_text(encoding='utf-8'))
+        if cache.get('version') != ROLLUP_VERSION or cache.get('logs_dir') != str(logs_dir.resolve()):
+            cache = None
+    except (OSError, ValueError):
+        cache = None
+    if cache is None:
+        cache = {'version': ROLLUP_VERSION, 'logs_dir': str(logs_dir.resolve()), 'days': {}}
+    days = cache['days']
+
+    changed = [day for day, stamp in stamps.items() if stamp is None or days.get(day, {}).get('stamp') != stamp]
+    for day, records in store.records_by_day(changed).items():
+        days[day] = {
+            'stamp': stamps[day],
+            'rollup': compute_day_rollup([_record_to_session(r) for r in records]),
+        }
 
-    if not sessions:
+    # Dias do período cujo log sumiu
+    lo, hi = start_date.date().isoformat(), end_date.date().isoformat()
+    removed = [day for day in days if lo <= day <= hi and day not in stamps]
+    for day in removed:
+        del days[day]
+
+    if changed or removed:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(cache), encoding='utf-8')
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # Cache é best-effort
+
+    return [days[day]['rollup'] for day in sorted(stamps)]
+
+
+def metrics_from_rollup(merged: dict, days_back: int, backlog_path: Optional[Path]) -> Dict[str, any]:
+    """Monta o mesmo dicionário de collect_metrics() a partir de um rollup mesclado."""
+    if not merged['sessions']:
         return {
             'error': 'Nenhuma sessão encontrada no período',
             'days_back': days_back
         }
 
-    backlog = find_backlog()
-    epic_time = calculate_time_per_epic(sessions)
-    velocity = calculate_velocity(sessions, backlog)
-    focus_score = calculate_focus_score(sessions, epic_time)
-    patterns = analyze_session_patterns(sessions)
-    agent_dist = calculate_agent_distribution(sessions)
-
-    total_minutes = sum(s['duration_minutes'] for s in sessions)
+    epic_time = merged['epic_time']
+    total_minutes = merged['minutes']
 
+    dates = sorted(merged['dates'])
     return {
         'period': {
             'days_back': days_back,
-            'start_date': sessions[0]['date'],
-            'end_date': sessions[-1]['date'],
-            'total_sessions': len(sessions)
+            'start_date': dates[0],
+            'end_date': dates[-1],
+            'total_sessions': merged['sessions']
         },
         'time_metrics': {
             'total_minutes': total_minutes,
             'total_hours': round(total_minutes / 60, 2),
             'time_per_epic': epic_time
         },
-        'velocity': velocity,
-        'focus_score': focus_score,
-        'session_patterns': patterns,
-        'agent_distribution': agent_dist,
+        'velocity': calculate_velocity(merged, backlog_path),
+        'focus_score': calculate_focus_score(merged),
+        'session_patterns': analyze_session_patterns(merged),
+        'agent_distribution': calculate_agent_distribution(merged),
         'generated_at': datetime.now().isoformat()
     }
 
 
+def collect_metrics(days_back: int = 7) -> Dict[str, any]:
+    """
+    Coleta todas as métricas do período (mesclando rollups diários).
+
+    Args:
+        days_back: Número de dias para analisar
+
+    Returns:
+        Dict com todas as métricas
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days_back)
+
+    merged = merge_rollups(load_daily_rollups(start_date, end_date))
+    return metrics_from_rollup(merged, days_back, find_backlog())
+
+
 def generate_weekly_insights(metrics: Dict[str, any]) -> str:
     """Gera insights em texto baseado nas métricas."""
     if 'error' in metrics:
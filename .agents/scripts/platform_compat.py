@@ -264,8 +264,8 @@ def get_scripts_path() -> Path:
 # ---------------------------------------------------------------------------
 
 import re
-from datetime import datetime, timedelta
-from typing import List, Dict, NamedTuple
+from datetime import date as _date, datetime, timedelta
+from typing import List, Dict, Iterator, NamedTuple, Tuple
 
 
 class Session(NamedTuple):
@@ -287,6 +287,52 @@ def _parse_duration(duration_str: str) -> int:
     return 0
 
 
+# One pass over the log: a session header or an indented "- activity" line.
+# Activities belong to the most recent header, so no per-section re-scan.
+# Whitespace inside an activity may span blank lines but never the next header.
+_SESSION_START = r"\d+\.\s+\d{1,2}:\d{2}\s*[—–-]\s*\d{1,2}:\d{2}\s*\(\d{1,2}:\d{2}\)"
+_ACTIVITY_WS = r"(?:[^\S\n]|\n(?!" + _SESSION_START + r"))+"
+_LOG_TOKEN_RE = re.compile(
+    r"^\d+\.\s+(\d{1,2}:\d{2})\s*[—–-]\s*(\d{1,2}:\d{2})\s*\((\d{1,2}:\d{2})\)\s*(?:\[.*?([a-z_]+)\])?"
+    r"|^" + _ACTIVITY_WS + r"-" + _ACTIVITY_WS + r"(.+)$",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+
+class LogSession:
+    """Compact session record yielded by iter_log_sessions()."""
+    __slots__ = ("start", "end", "duration_minutes", "agent", "activities")
+
+    def __init__(self, start: str, end: str, duration_minutes: int, agent: Optional[str]):
+        self.start = start
+        self.end = end
+        self.duration_minutes = duration_minutes
+        self.agent = agent  # None when the header has no [tool] tag
+        self.activities: List[str] = []
+
+
+def iter_log_sessions(content: str):
+    """
+    Tokenizes the sessions of a daily log in a single linear pass.
+
+    Yields:
+        LogSession records in file order, activities attached.
+    """
+    current: Optional[LogSession] = None
+    for match in _LOG_TOKEN_RE.finditer(content):
+        activity = match.group(5)
+        if activity is None:
+            if current is not None:
+                yield current
+            current = LogSession(
+                match.group(1), match.group(2), _parse_duration(match.group(3)), match.group(4),
+            )
+        elif current is not None:
+            current.activities.append(activity)
+    if current is not None:
+        yield current
+
+
 def parse_log_file(filepath: Path) -> List[Session]:
     """Extracts sessions from a daily log markdown file."""
     content = filepath.read_text(encoding="utf-8")
@@ -300,46 +346,81 @@ def parse_log_file(filepath: Path) -> List[Session]:
     date = date_match.group(1)
     project = project_match.group(1).strip() if project_match else "Unknown"
 
-    sessions: List[Session] = []
-    session_pattern = re.compile(
-        r"^\d+\.\s+(\d{1,2}:\d{2})\s*[—–-]\s*(\d{1,2}:\d{2})\s*\((\d{1,2}:\d{2})\)\s*(?:\[.*?([a-z_]+)\])?",
-        re.MULTILINE | re.IGNORECASE,
-    )
-
-    for match in session_pattern.finditer(content):
-        start_pos = match.end()
-        next_match = session_pattern.search(content, start_pos)
-        end_pos = next_match.start() if next_match else len(content)
-        section = content[start_pos:end_pos]
-        activities = re.findall(r"^\s+-\s+(.+)$", section, re.MULTILINE)
-
-        sessions.append(Session(
+    return [
+        Session(
             date=date,
             project=project,
-            start=match.group(1),
-            end=match.group(2),
-            duration_minutes=_parse_duration(match.group(3)),
-            activities=activities,
-            agent_source=match.group(4) or "unknown",
-        ))
+            start=rec.start,
+            end=rec.end,
+            duration_minutes=rec.duration_minutes,
+            activities=rec.activities,
+            agent_source=rec.agent or "unknown",
+        )
+        for rec in iter_log_sessions(content)
+    ]
 
-    return sessions
 
+_DAILY_LOG_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})\.md$")
 
-def get_logs_in_range(logs_dir: Path, start_date: datetime, end_date: datetime) -> List[Session]:
-    """Returns all sessions in a date range."""
-    all_sessions: List[Session] = []
-    for year_dir in logs_dir.iterdir():
-        if not year_dir.is_dir():
+# Up to this many days, probing one path per day beats listing year directories
+_PROBE_MAX_DAYS = 62
+
+
+def iter_daily_logs(
+    logs_dir: Path,
+    start: Optional[_date] = None,
+    end: Optional[_date] = None,
+) -> Iterator[Tuple[_date, Path]]:
+    """
+    Yields (day, path) for the daily logs YYYY/YYYY-MM-DD.md in [start, end], in date order.
+
+    Short ranges stat the expected paths directly; longer or open ranges list
+    only the year directories that overlap the range. Cost follows the range,
+    not the size of the log history.
+    """
+    logs_dir = Path(logs_dir)
+    if start and end:
+        if end < start:
+            return
+        if (end - start).days < _PROBE_MAX_DAYS:
+            day = start
+            while day <= end:
+                path = logs_dir / f"{day.year:04d}" / f"{day.isoformat()}.md"
+                if path.is_file():
+                    yield day, path
+                day += timedelta(days=1)
+            return
+
+    try:
+        with os.scandir(logs_dir) as entries:
+            years = sorted(int(e.name) for e in entries if e.is_dir() and len(e.name) == 4 and e.name.isdigit())
+    except OSError:
+        return
+
+    for year in years:
+        if (start and year < start.year) or (end and year > end.year):
             continue
-        for log_file in year_dir.glob("*.md"):
-            try:
-                file_date = datetime.strptime(log_file.stem, "%Y-%m-%d")
-            except ValueError:
-                continue
-            if start_date.date() <= file_date.date() <= end_date.date():
-                all_sessions.extend(parse_log_file(log_file))
-    return sorted(all_sessions, key=lambda s: (s.date, s.start))
+        year_dir = logs_dir / f"{year:04d}"
+        days = []
+        with os.scandir(year_dir) as entries:
+            for entry in entries:
+                m = _DAILY_LOG_RE.match(entry.name)
+                if not m or int(m.group(1)) != year:
+                    continue
+                try:
+                    day = _date(year, int(m.group(2)), int(m.group(3)))
+                except ValueError:
+                    continue
+                if (start is None or start <= day) and (end is None or day <= end):
+                    days.append(day)
+        for day in sorted(days):
+            yield day, year_dir / f"{day.isoformat()}.md"
+
+
+def get_logs_in_range(logs_dir: Path, start_date: datetime, end_date: datetime) -> List[Session]:
+    """Returns all sessions in a date range (served from the session store)."""
+    from session_store import SessionStore  # session_store imports this module
+    return SessionStore(logs_dir).query(start_date.date(), end_date.date())
 
 
 def get_last_activity_by_agent(logs_dir: Path, days_back: int = 7) -> Dict[str, dict]:
@@ -547,7 +628,8 @@ def find_story_file(story_id: str, root_path: Optional[Path] = None) -> Optional
     """
     Locates a story file by its ID (e.g., '1.1', '0.3').
 
-    Searches docs/stories/ for STORY-{N-N}_*.md pattern.
+    Resolves STORY-{N-N}_*.md in docs/stories/ through the story index
+    (O(1) lookup, no directory listing per call).
 
     Args:
         story_id: Story ID like '1.1' or '0.3'.
@@ -560,11 +642,10 @@ def find_story_file(story_id: str, root_path: Optional[Path] = None) -> Optional
     if not stories_dir.exists():
         return None
 
-    safe_id = story_id.replace(".", "-")
-    prefix = f"STORY-{safe_id}_"
-    for f in stories_dir.glob(f"{prefix}*.md"):
-        return f
-    return None
+    return get_story_index(stories_dir).get(story_id)
+
+
+import functools as _functools
 
 
 def parse_story_frontmatter(story_path: Path) -> dict:
@@ -578,11 +659,53 @@ def parse_story_frontmatter(story_path: Path) -> dict:
         Dict with keys: story, epic, status, agent, tool, depends_on, unlocks, priority.
         Returns empty dict if file not found or no frontmatter.
     """
-    if not story_path.exists():
+    try:
+        st = os.stat(story_path)
+    except OSError:
+        return {}
+
+    # Copy so callers can mutate the result without touching the cache
+    return {
+        k: list(v) if isinstance(v, list) else v
+        for k, v in _cached_frontmatter(str(story_path), st.st_mtime_ns, st.st_size).items()
+    }
+
+
+_FRONTMATTER_CHUNK = 4096
+
+
+def read_frontmatter_block(story_path: Path) -> str:
+    """
+    Reads a story file only up to its closing frontmatter delimiter.
+
+    The Agent Workspace section below the frontmatter grows over time, so
+    the body is never read. Returns the text read so far, which
+    parse_frontmatter_content() accepts as-is ("" if not a frontmatter file).
+    """
+    with open(story_path, "r", encoding="utf-8") as f:
+        buf = f.read(_FRONTMATTER_CHUNK)
+        if not buf.startswith("---"):
+            return ""
+        # Same delimiter rule as parse_frontmatter_content(): next "---" after the opener
+        while buf.find("---", 3) == -1:
+            chunk = f.read(_FRONTMATTER_CHUNK)
+            if not chunk:
+                break
+            buf += chunk
+    return buf
+
+
+@_functools.lru_cache(maxsize=2048)
+def _cached_frontmatter(path: str, mtime_ns: int, size: int) -> dict:
+    # (mtime_ns, size) are part of the key: an edited file is a cache miss
+    try:
+        return parse_frontmatter_content(read_frontmatter_block(Path(path)))
+    except (OSError, UnicodeDecodeError):
         return {}
 
-    content = story_path.read_text(encoding="utf-8")
 
+def parse_frontmatter_content(content: str) -> dict:
+    """Same as parse_story_frontmatter(), for story content already in memory."""
     # Check for frontmatter delimiters
     if not content.startswith("---"):
         return {}
@@ -615,6 +738,215 @@ def parse_story_frontmatter(story_path: Path) -> dict:
     return result
 
 
+# ---------------------------------------------------------------------------
+# Story Index — story ID -> file, invalidated by the directory mtime
+# ---------------------------------------------------------------------------
+
+import hashlib as _hashlib
+import json as _json
+import time as _time
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+_STORY_FILE_RE = re.compile(r"^STORY-(\d+(?:-\d+)*)_.*\.md$")
+
+# Directory mtimes this recent may still change within the same timestamp tick,
+# so maps built from them are never persisted for other processes
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+class StoryIndex:
+    """
+    Maps story IDs to files in a stories directory.
+
+    Adding, removing or renaming a file changes the directory mtime, so the
+    index is rebuilt (one scandir) only when that mtime moves. The map is kept
+    in memory and persisted to .agents/cache/stories/ for the next process.
+    """
+
+    def __init__(self, stories_dir: Path, cache_dir: Optional[Path] = None):
+        self.stories_dir = Path(stories_dir)
+        self.cache_dir = cache_dir or (get_agent_root() / "cache" / "stories")
+        self._files: Dict[str, str] = {}
+        self._mtime_ns: Optional[int] = None
+
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return self.stories_dir.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _is_racy(self, mtime_ns: int) -> bool:
+        return _time.time_ns() - mtime_ns < _RACY_WINDOW_NS
+
+    def _cache_file(self) -> Path:
+        key = _hashlib.md5(str(self.stories_dir.resolve()).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{key}.json"
+
+    def _scan(self) -> Dict[str, str]:
+        files: Dict[str, str] = {}
+        with os.scandir(self.stories_dir) as entries:
+            for name in sorted(e.name for e in entries):
+                m = _STORY_FILE_RE.match(name)
+                if m:
+                    files.setdefault(m.group(1).replace("-", "."), name)
+        return files
+
+    def _read_cache(self, mtime_ns: int) -> Optional[Dict[str, str]]:
+        try:
+            data = _json.loads(self._cache_file().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("mtime_ns") != mtime_ns or not isinstance(data.get("files"), dict):
+            return None
+        return data["files"]
+
+    def _write_cache(self) -> None:
+        if self._mtime_ns is None or self._is_racy(self._mtime_ns):
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            target = self._cache_file()
+            tmp = target.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(_json.dumps({
+                "dir": str(self.stories_dir.resolve()),
+                "mtime_ns": self._mtime_ns,
+                "files": self._files,
+            }), encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError:
+            pass  # Cache is best-effort
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload the map if the directory changed since the last load."""
+        mtime_ns = self._dir_mtime()
+        if mtime_ns is None:
+            self._files, self._mtime_ns = {}, None
+            return
+        if not force and mtime_ns == self._mtime_ns:
+            return
+
+        cached = None if force or self._is_racy(mtime_ns) else self._read_cache(mtime_ns)
+        if cached is not None:
+            self._files = cached
+        else:
+            self._files = self._scan()
+        self._mtime_ns = mtime_ns
+        if cached is None:
+            self._write_cache()
+
+    def get(self, story_id: str) -> Optional[Path]:
+        """Return the story file for an ID, or None."""
+        self.refresh()
+        name = self._files.get(story_id)
+        if name is None:
+            return None
+        path = self.stories_dir / name
+        if path.exists():
+            return path
+        # Removed behind our back without a visible mtime change: rescan once
+        self.refresh(force=True)
+        name = self._files.get(story_id)
+        return self.stories_dir / name if name else None
+
+    def resolve_many(self, story_ids) -> Dict[str, Optional[Path]]:
+        """Bulk lookup: {story_id: Path | None} with a single freshness check."""
+        self.refresh()
+        return {
+            sid: (self.stories_dir / self._files[sid]) if sid in self._files else None
+            for sid in story_ids
+        }
+
+    def all(self) -> Dict[str, Path]:
+        """All indexed stories: {story_id: Path}."""
+        self.refresh()
+        return {sid: self.stories_dir / name for sid, name in self._files.items()}
+
+    def snapshot(self) -> Optional[int]:
+        """Directory mtime to take before writing or removing a story file, for record()/forget()."""
+        return self._dir_mtime()
+
+    def _was_current(self, before_ns: Optional[int]) -> bool:
+        """True if the map matched the directory right before the caller's change."""
+        return self._mtime_ns is not None and before_ns in (None, self._mtime_ns)
+
+    def _adopt_mtime(self, written_ns: Optional[int] = None) -> None:
+        """
+        Take the directory mtime left by the caller's own change. A directory
+        newer than the file just written means someone else changed it too.
+        """
+        after = self._dir_mtime()
+        if after is None or (written_ns is not None and after > written_ns):
+            self.refresh(force=True)
+            return
+        self._mtime_ns = after
+        self._write_cache()
+
+    def record(self, story_id: str, path: Path, before_ns: Optional[int] = None) -> None:
+        """
+        Register a file we just wrote, without rescanning the directory.
+        before_ns: snapshot() taken before the write (default: trust the map).
+        """
+        if not self._was_current(before_ns):
+            self.refresh()  # The write itself is picked up by the rescan
+            return
+        path = Path(path)
+        self._files[story_id] = path.name
+        try:
+            written_ns = path.stat().st_mtime_ns
+        except OSError:
+            written_ns = None
+        self._adopt_mtime(written_ns)
+
+    def forget(self, story_id: str, before_ns: Optional[int] = None) -> None:
+        """Drop a file we just removed, without rescanning the directory (before_ns: see record)."""
+        if not self._was_current(before_ns):
+            self.refresh()
+            return
+        self._files.pop(story_id, None)
+        self._adopt_mtime()
+
+
+_STORY_INDEXES: Dict[str, StoryIndex] = {}
+
+
+def get_story_index(stories_dir: Optional[Path] = None) -> StoryIndex:
+    """Return the shared StoryIndex for a stories directory (default: docs/stories)."""
+    stories_dir = Path(stories_dir) if stories_dir else find_stories_dir()
+    key = str(stories_dir.resolve())
+    index = _STORY_INDEXES.get(key)
+    if index is None:
+        index = _STORY_INDEXES[key] = StoryIndex(stories_dir)
+    return index
+
+
+# Below this many files a thread pool costs more than it saves
+_PARALLEL_FRONTMATTER_MIN = 32
+
+
+def load_story_frontmatters(
+    stories_dir: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Tuple[Path, dict]]:
+    """
+    Frontmatter for every story in a directory: {story_id: (Path, frontmatter)}.
+
+    Files come from the story index and are read header-only through the
+    parse_story_frontmatter() cache; cold reads are spread over a thread pool.
+    """
+    stories_dir = Path(stories_dir) if stories_dir else find_stories_dir()
+    if not stories_dir.exists():
+        return {}
+
+    files = get_story_index(stories_dir).all()
+    if max_workers == 1 or (max_workers is None and len(files) < _PARALLEL_FRONTMATTER_MIN):
+        return {sid: (path, parse_story_frontmatter(path)) for sid, path in files.items()}
+
+    workers = max_workers or min(16, (os.cpu_count() or 1) * 2)
+    with _ThreadPoolExecutor(max_workers=workers) as pool:
+        parsed = pool.map(parse_story_frontmatter, files.values())
+        return {sid: (path, fm) for (sid, path), fm in zip(files.items(), parsed)}
+
+
 def ensure_backlog(create_if_missing: bool = True) -> dict:
     """
     Finds or creates docs/BACKLOG.md.
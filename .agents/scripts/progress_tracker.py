@@ -6,26 +6,30 @@ Generates unified PROJECT_STATUS.md with progress bar, next story routing, and a
 Usage:
     python3 .agents/scripts/progress_tracker.py [backlog_path]
 
+    from progress_tracker import update_project_status   # library use (finish_task.py)
+
 Outputs:
     - docs/PROJECT_STATUS.md (primary — pointer + progress + routing)
     - docs/progress-bar.md (redirect to PROJECT_STATUS.md for backward compat)
 """
 
-import re
 import sys
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import NamedTuple, Optional
+from typing import NamedTuple, Optional, Union
 
 sys.path.insert(0, str(Path(__file__).parent))
 from platform_compat import (
     find_backlog,
     find_stories_dir,
-    find_story_file,
-    parse_story_frontmatter,
+    get_agent_source,
+    get_story_index,
     _PROJECT_STATUS_TEMPLATE,
 )
+from backlog_index import Backlog, load_backlog, parse_backlog as parse_backlog_index
+from lock_manager import LockManager, SHARED
+from story_graph import StoryGraph, story_sort_key
 
 
 class Epic(NamedTuple):
@@ -42,45 +46,31 @@ class Epic(NamedTuple):
         return (self.done / self.total * 100) if self.total > 0 else 0
 
 
-def parse_backlog(content: str) -> list[Epic]:
+def parse_backlog(content: Union[str, Backlog]) -> list[Epic]:
     """
     Parse backlog content and extract Epics with task counts.
 
     Works with both lean and fat backlog formats.
     Only counts top-level story checkboxes (- [x] / - [ ]).
+    Accepts raw content or an already loaded backlog index.
     """
-    epics: list[Epic] = []
-
-    epic_pattern = re.compile(
-        r"^##\s+Epic\s+(\d+):\s+(.+?)\s*(?:\[(?:P\d+)\])?\s*(?:\[OWNER:\s*(.+?)\])?\s*(?:\[MODEL:\s*(.+?)\])?\s*(?:[✅🔴⏳].*)?$",
-        re.MULTILINE,
-    )
-
-    epic_matches = list(epic_pattern.finditer(content))
-
-    for idx, match in enumerate(epic_matches):
-        epic_num = int(match.group(1))
-        epic_name = match.group(2).strip()
-        epic_owner = match.group(3).strip() if match.group(3) else None
-        epic_model = match.group(4).strip() if match.group(4) else None
-
-        start_pos = match.end()
-        end_pos = epic_matches[idx + 1].start() if idx + 1 < len(epic_matches) else len(content)
-        epic_content = content[start_pos:end_pos]
-
-        # Count only top-level story checkboxes (not indented subtasks)
-        done = len(re.findall(r"^-\s*\[(?:x|X)\]", epic_content, re.MULTILINE))
-        pending = len(re.findall(r"^-\s*\[\s\]", epic_content, re.MULTILINE))
-        total = done + pending
+    backlog = _as_backlog(content)
+    return [
+        Epic(
+            num=epic.num, name=epic.name,
+            total=epic.total, done=epic.done,
+            owner=epic.owner, model=epic.model,
+        )
+        for epic in backlog.epics
+        if epic.total > 0
+    ]
 
-        if total > 0:
-            epics.append(Epic(
-                num=epic_num, name=epic_name,
-                total=total, done=done,
-                owner=epic_owner, model=epic_model,
-            ))
 
-    return epics
+def _as_backlog(content: Union[str, Backlog]) -> Backlog:
+    """Accept raw BACKLOG.md content or a parsed index."""
+    if isinstance(content, Backlog):
+        return content
+    return parse_backlog_index(content)
 
 
 def generate_bar(percent: float, width: int = 10) -> str:
@@ -110,101 +100,82 @@ def _get_git_info() -> dict:
     return info
 
 
-def _find_next_pending_story(content: str) -> Optional[dict]:
-    """Find the first unchecked story in the backlog and read its story file metadata."""
-    # Match lean or fat format
-    pattern = re.compile(
-        r"^-\s*\[\s\]\s*(?:\*\*)?Story\s+(\d+\.\d+):?\*?\*?\s*(.+?)$",
-        re.MULTILINE,
-    )
-    match = pattern.search(content)
-    if not match:
+def _find_next_pending_story(content: Union[str, Backlog], graph: Optional[StoryGraph] = None) -> Optional[dict]:
+    """
+    Find the next story to work on: the first unchecked story in the backlog
+    whose dependencies are all done (falls back to the first unchecked one).
+    """
+    # Lean or fat format (checkbox stories only)
+    backlog = _as_backlog(content)
+    pending = [s for s in backlog.stories if s.checked is False]
+    if not pending:
         return None
 
-    story_id = match.group(1)
-    story_title = match.group(2).strip()
+    graph = graph or StoryGraph.load()
+    story = next((s for s in pending if s.id in graph.nodes and not graph.blockers(s.id)), pending[0])
 
     result = {
-        "id": story_id,
-        "title": story_title,
+        "id": story.id,
+        "title": story.title,
         "agent": "unknown",
         "tool": "unknown",
         "depends_on": [],
     }
 
-    # Try to read story file for richer metadata
-    story_file = find_story_file(story_id)
-    if story_file:
-        fm = parse_story_frontmatter(story_file)
-        result["agent"] = fm.get("agent", "unknown")
-        result["tool"] = fm.get("tool", "unknown")
-        result["depends_on"] = fm.get("depends_on", [])
+    # Richer metadata from the story file (already loaded by the graph)
+    node = graph.nodes.get(story.id)
+    if node:
+        result["agent"] = node.agent
+        result["tool"] = node.tool
+        result["depends_on"] = sorted(graph.preds[story.id], key=story_sort_key)
 
     return result
 
 
-def _find_story_after(content: str, current_story_id: str) -> Optional[dict]:
+def _find_story_after(
+    content: Union[str, Backlog], current_story_id: str, graph: Optional[StoryGraph] = None
+) -> Optional[dict]:
     """Find the story immediately after the given story ID in the backlog."""
-    pattern = re.compile(
-        r"^-\s*\[[ xX]\]\s*(?:\*\*)?Story\s+(\d+\.\d+):?\*?\*?\s*(.+?)$",
-        re.MULTILINE,
-    )
-    matches = list(pattern.finditer(content))
+    stories = [s for s in _as_backlog(content).stories if s.checked is not None]
+    graph = graph or StoryGraph.load()
 
     found_current = False
-    for match in matches:
-        sid = match.group(1)
+    for story in stories:
         if found_current:
             # Return the next unchecked story
-            check_line = content[match.start():match.end()]
-            if "[ ]" in check_line:
-                result = {"id": sid, "title": match.group(2).strip()}
-                story_file = find_story_file(sid)
-                if story_file:
-                    fm = parse_story_frontmatter(story_file)
-                    result["agent"] = fm.get("agent", "unknown")
-                    result["tool"] = fm.get("tool", "unknown")
+            if story.checked is False:
+                result = {"id": story.id, "title": story.title}
+                node = graph.nodes.get(story.id)
+                if node:
+                    result["agent"] = node.agent
+                    result["tool"] = node.tool
                 return result
-        if sid == current_story_id:
+        if story.id == current_story_id:
             found_current = True
 
     return None
 
 
-def _check_dependency_status(depends_on: list) -> list[dict]:
+def _check_dependency_status(depends_on: list, graph: Optional[StoryGraph] = None) -> list[dict]:
     """Check completion status of dependency stories."""
+    graph = graph or StoryGraph.load()
     results = []
     for dep_id in depends_on:
-        story_file = find_story_file(dep_id)
-        if story_file:
-            fm = parse_story_frontmatter(story_file)
-            status = fm.get("status", "unknown")
-        else:
-            status = "unknown"
-        done = status == "done"
+        done = graph.is_done(dep_id)
         results.append({"id": dep_id, "done": done, "label": "done" if done else "pending"})
     return results
 
 
-def _validate_coverage(content: str) -> list[str]:
+def _validate_coverage(content: Union[str, Backlog]) -> list[str]:
     """Validate bidirectional coverage: backlog checkboxes <-> story files."""
     warnings = []
 
     # Extract all story IDs from backlog
-    pattern = re.compile(
-        r"^-\s*\[[ xX]\]\s*(?:\*\*)?Story\s+(\d+\.\d+)",
-        re.MULTILINE,
-    )
-    backlog_ids = set(m.group(1) for m in pattern.finditer(content))
+    backlog_ids = set(s.id for s in _as_backlog(content).stories if s.checked is not None)
 
     # Extract all story IDs from files
     stories_dir = find_stories_dir()
-    file_ids = set()
-    if stories_dir.exists():
-        for f in stories_dir.glob("STORY-*.md"):
-            m = re.match(r"STORY-(\d+)-(\d+)_", f.name)
-            if m:
-                file_ids.add(f"{m.group(1)}.{m.group(2)}")
+    file_ids = set(get_story_index(stories_dir).all()) if stories_dir.exists() else set()
 
     missing_files = backlog_ids - file_ids
     orphan_files = file_ids - backlog_ids
@@ -217,8 +188,9 @@ def _validate_coverage(content: str) -> list[str]:
     return warnings
 
 
-def generate_project_status(epics: list[Epic], backlog_content: str) -> str:
+def generate_project_status(epics: list[Epic], backlog_content: Union[str, Backlog]) -> str:
     """Generate unified PROJECT_STATUS.md content."""
+    backlog_content = _as_backlog(backlog_content)
 
     total_tasks = sum(e.total for e in epics)
     done_tasks = sum(e.done for e in epics)
@@ -227,12 +199,15 @@ def generate_project_status(epics: list[Epic], backlog_content: str) -> str:
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
     git_info = _get_git_info()
 
+    # Dependency graph: loaded once from docs/stories/ for all queries below
+    graph = StoryGraph.load()
+
     # Next story
-    next_story = _find_next_pending_story(backlog_content)
+    next_story = _find_next_pending_story(backlog_content, graph)
     if next_story:
         deps_info = ""
         if next_story.get("depends_on"):
-            dep_statuses = _check_dependency_status(next_story["depends_on"])
+            dep_statuses = _check_dependency_status(next_story["depends_on"], graph)
             deps_parts = [f"Story {d['id']} ({'done' if d['done'] else 'pending'})" for d in dep_statuses]
             deps_info = f"\n- **Depende de:** {', '.join(deps_parts)}"
 
@@ -251,7 +226,7 @@ def generate_project_status(epics: list[Epic], backlog_content: str) -> str:
     # Routing alert
     routing_alert = ""
     if next_story:
-        story_after = _find_story_after(backlog_content, next_story["id"])
+        story_after = _find_story_after(backlog_content, next_story["id"], graph)
         if story_after and story_after.get("tool") and next_story.get("tool"):
             if story_after["tool"] != next_story["tool"]:
                 routing_alert = (
@@ -277,6 +252,8 @@ def generate_project_status(epics: list[Epic], backlog_content: str) -> str:
 
     # Coverage validation warnings
     coverage_warnings = _validate_coverage(backlog_content)
+    for cycle in graph.cycles:
+        coverage_warnings.append(f"Ciclo de dependencias: {' -> '.join(cycle + cycle[:1])}")
     if coverage_warnings:
         routing_alert += "\n\n## Avisos de Cobertura\n"
         for w in coverage_warnings:
@@ -296,6 +273,35 @@ def generate_project_status(epics: list[Epic], backlog_content: str) -> str:
     )
 
 
+def update_project_status(backlog_path: Path) -> list[Epic]:
+    """
+    Regenerate docs/PROJECT_STATUS.md (and the progress-bar.md redirect).
+
+    Library entry point used by finish_task.py; reuses the cached backlog index.
+
+    Returns:
+        Parsed epics (empty list when the backlog has none; nothing is written then)
+    """
+    backlog = load_backlog(backlog_path)
+    epics = parse_backlog(backlog) if backlog else []
+    if not epics:
+        return []
+
+    # Generate unified PROJECT_STATUS.md
+    status_content = generate_project_status(epics, backlog)
+    status_path = Path("docs/PROJECT_STATUS.md")
+    status_path.parent.mkdir(parents=True, exist_ok=True)
+    status_path.write_text(status_content, encoding="utf-8")
+
+    # Backward compat: progress-bar.md as redirect
+    progress_path = Path("docs/progress-bar.md")
+    progress_path.write_text(
+        "# Progresso\n\n> Este arquivo foi movido. Ver [PROJECT_STATUS.md](./PROJECT_STATUS.md)\n",
+        encoding="utf-8",
+    )
+    return epics
+
+
 def main():
     # Determine backlog path
     if len(sys.argv) > 1:
@@ -310,26 +316,23 @@ def main():
 
     print(f"Lendo: {backlog_path}")
 
-    content = backlog_path.read_text(encoding="utf-8")
-    epics = parse_backlog(content)
+    # Shared lock: other readers proceed, only writers (finish_task) are waited on
+    lock_mgr = LockManager()
+    agent = get_agent_source()
+    if not lock_mgr.wait_for_lock("backlog", agent, max_wait=30, mode=SHARED):
+        print("BACKLOG bloqueado por outro agente. Tente novamente.")
+        sys.exit(1)
+    try:
+        epics = update_project_status(backlog_path)
+    finally:
+        lock_mgr.release_lock("backlog", agent, mode=SHARED)
 
     if not epics:
         print("Nenhum Epic encontrado no backlog.")
         print("   Verifique se o formato esta correto (## Epic N: Nome)")
         sys.exit(1)
 
-    # Generate unified PROJECT_STATUS.md
-    status_content = generate_project_status(epics, content)
     status_path = Path("docs/PROJECT_STATUS.md")
-    status_path.parent.mkdir(parents=True, exist_ok=True)
-    status_path.write_text(status_content, encoding="utf-8")
-
-    # Backward compat: progress-bar.md as redirect
-    progress_path = Path("docs/progress-bar.md")
-    progress_path.write_text(
-        "# Progresso\n\n> Este arquivo foi movido. Ver [PROJECT_STATUS.md](./PROJECT_STATUS.md)\n",
-        encoding="utf-8",
-    )
 
     # Console output
     total = sum(e.total for e in epics)
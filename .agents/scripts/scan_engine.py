@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Scan Engine - Inove AI Framework
+================================
+
+Walks a project once, reads each file once and dispatches its text to every
+registered rule set that wants it.
+
+The skill audit scripts (security_scan, ux_audit, mobile_audit, ...) are
+rule-set plugins: each keeps its own CLI, which runs the engine with just its
+rule set, while this script runs any combination of them over a single walk.
+
+Usage:
+    python .agents/scripts/scan_engine.py .                       # All rule sets
+    python .agents/scripts/scan_engine.py . --rules security,ux   # Some of them
+    python .agents/scripts/scan_engine.py . --json                # Full reports
+    python .agents/scripts/scan_engine.py . --jobs 8              # 8 worker processes
+    python .agents/scripts/scan_engine.py . --changed-since main  # Files changed since main
+    python .agents/scripts/scan_engine.py . --staged              # Files staged for commit
+    python .agents/scripts/scan_engine.py --list
+
+Writing a rule set:
+    class MyRules(RuleSet):
+        name = "my-rules"
+        extensions = frozenset({".tsx", ".jsx"})
+
+        def scan_file(self, rel_path, content):   # Per-file findings
+            return [...]
+
+        def collect(self, rel_path, result):       # Merged in walk order
+            ...
+
+        def report(self) -> dict:                  # Must include "passed"
+            ...
+
+    run_scan(project_path, [MyRules(project_path)])
+
+With jobs > 1 the files are read and scan_file() runs in a process pool;
+results are still collected in walk order, so reports are identical to a
+serial run.
+
+With a cache_dir (normally <project>/.agents/cache/scan) the per-file results
+of each rule set persist between runs: a file is only read again when its
+size or mtime changed, and only rescanned when its content or the rule set
+(version, source, options) changed.
+
+With only=<paths> (see changed_paths()) just those files are scanned.
+Project-wide rule sets, whose report depends on the whole tree (e.g. i18n
+key completeness), also get the cached results of every other file (read
+again if it changed since), so a scoped run with a cache reports like a
+full one.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Never scanned by any rule set (dependencies, build output, VCS, virtualenvs)
+SKIP_DIRS = frozenset({
+    "node_modules", ".git", "dist", "build", "__pycache__", ".venv", "venv", ".next",
+})
+
+SKILLS_DIR = Path(__file__).resolve().parent.parent / "skills"
+
+# Per-file results cache, relative to the project (never scanned itself)
+SCAN_CACHE_DIR = Path(".agents") / "cache" / "scan"
+# Bump to drop every existing scan cache (entry layout changes)
+SCAN_CACHE_VERSION = 1
+# Files modified this recently keep their results but not their stat stamp:
+# a same-size rewrite within the mtime granularity would otherwise go unseen
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Most files per pool task (small trees get smaller chunks)
+_CHUNK_FILES = 64
+
+# Registered rule sets: name -> (script under .agents/skills, RuleSet class)
+RULE_SETS = {
+    "security": ("vulnerability-scanner/scripts/security_scan.py", "SecurityRules"),
+    "ux": ("frontend-design/scripts/ux_audit.py", "UXRules"),
+    "accessibility": ("frontend-design/scripts/accessibility_checker.py", "AccessibilityRules"),
+    "mobile": ("mobile-design/scripts/mobile_audit.py", "MobileRules"),
+    "react-performance": ("nextjs-react-expert/scripts/react_performance_checker.py", "PerformanceRules"),
+    "seo": ("seo-fundamentals/scripts/seo_checker.py", "SEORules"),
+    "geo": ("geo-fundamentals/scripts/geo_checker.py", "GEORules"),
+    "i18n": ("i18n-localization/scripts/i18n_checker.py", "I18nRules"),
+}
+
+
+# ---------------------------------------------------------------------------
+# Rule sets
+# ---------------------------------------------------------------------------
+
+class RuleSet:
+    """
+    Base class of a rule-set plugin.
+
+    The engine offers every file to wants() as a POSIX path relative to the
+    scan root. Files wanted by at least one rule set are read once and their
+    text goes to scan_file(), which must depend only on its arguments.
+    collect() then merges that per-file result into the rule set's state, in
+    walk order, and report() builds the final result.
+
+    wants() is called once per file, in walk order, so a rule set may use it
+    to cap how many files it reads. plan() first gets every walked path, for
+    a rule set whose cap picks files in another order.
+
+    scan_file() results must be JSON-serializable to be cached. Bump version
+    when they change in a way cache_key() does not capture.
+
+    A project_wide rule set judges files against each other. In a scoped
+    scan it is still offered every file, and collects cached results for
+    the files outside the scope. run_scan() sets scope to the scoped paths
+    (None: whole tree), so per-file findings can stay limited to them.
+    """
+
+    name = "rules"
+    version = 1
+    project_wide = False
+    scope: Optional[frozenset] = None
+    # Lower-case file suffixes this rule set reads (empty: decide in wants())
+    extensions: frozenset = frozenset()
+    # Directory names ignored on top of the shared SKIP_DIRS
+    skip_dirs: frozenset = frozenset()
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def wants(self, rel_path: str) -> bool:
+        path = PurePosixPath(rel_path)
+        if self.skip_dirs and any(part in self.skip_dirs for part in path.parts[:-1]):
+            return False
+        return path.suffix.lower() in self.extensions
+
+    def plan(self, rel_paths: List[str]) -> None:
+        """Called once, before any wants(), with the walked paths in walk order."""
+
+    def cache_key(self) -> str:
+        """Identity of scan_file(): cached results under another key are discarded."""
+        return json.dumps([self.name, self.version, _source_digest(type(self))])
+
+    def scan_file(self, rel_path: str, content: str) -> Any:
+        raise NotImplementedError
+
+    def collect(self, rel_path: str, result: Any) -> None:
+        raise NotImplementedError
+
+    def report(self) -> dict:
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def iter_files(root, skip_dirs: Iterable[str] = SKIP_DIRS,
+               skip_paths: Iterable[str] = ()) -> Iterator[Tuple[str, Path]]:
+    """
+    Yield (relative POSIX path, path) of every file under root, in sorted order.
+
+    Directories named in skip_dirs are skipped anywhere; skip_paths are
+    directories given as relative POSIX paths.
+    """
+    root = Path(root)
+    skip = set(skip_dirs)
+    skip_paths = set(skip_paths)
+    for dirpath, dirs, files in os.walk(root):
+        base = Path(dirpath)
+        rel_dir = base.relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        dirs[:] = sorted(d for d in dirs if d not in skip and prefix + d not in skip_paths)
+        for name in sorted(files):
+            yield prefix + name, base / name
+
+
+def _walk_order(rel_path: str) -> tuple:
+    """Sort key matching iter_files(): a directory's files before its subdirectories."""
+    parts = rel_path.split("/")
+    return parts[:-1], parts[-1]
+
+
+def _scoped_files(root: Path, only: Iterable[str], skip_dirs: Iterable[str],
+                  skip_paths: Iterable[str]) -> Iterator[Tuple[str, Path]]:
+    """The existing files of only, filtered and ordered like iter_files()."""
+    skip = set(skip_dirs)
+    for rel_path in sorted(set(only), key=_walk_order):
+        parts = rel_path.split("/")
+        if any(part in skip for part in parts[:-1]):
+            continue
+        if any("/".join(parts[:n]) in skip_paths for n in range(1, len(parts))):
+            continue
+        path = root / rel_path
+        if path.is_file():
+            yield rel_path, path
+
+
+def run_scan(root, rule_sets: List[RuleSet], skip_dirs: Iterable[str] = SKIP_DIRS,
+             jobs: int = 1, cache_dir=None, only: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Scan root with the given rule sets in a single walk.
+
+    jobs > 1 reads and scans the files in that many worker processes (0: one
+    per CPU). cache_dir reuses the results of unchanged files from earlier
+    runs. only restricts the scan to these relative POSIX paths; project-wide
+    rule sets then collect cached results for the rest of the tree, reading
+    again the cached files whose size or mtime changed. Unreadable
+    files are skipped. Returns stats: files_seen, files_read, files_cached
+    (not read at all) and files per rule set (files_by_rule_set).
+    """
+    root = Path(root)
+    scope = None if only is None else frozenset(only)
+    for rs in rule_sets:
+        rs.scope = scope
+    skip_paths = {SCAN_CACHE_DIR.as_posix()}
+    caches = None
+    if cache_dir is not None:
+        caches = [_ScanCache(cache_dir, rs) for rs in rule_sets]
+        try:
+            skip_paths.add(Path(cache_dir).resolve().relative_to(root.resolve()).as_posix())
+        except ValueError:
+            pass  # Cache outside the scanned tree
+
+    stats = {"files_seen": 0, "files_read": 0, "files_cached": 0,
+             "files_by_rule_set": {rs.name: 0 for rs in rule_sets}}
+    # wants() and the cache lookups run here, in walk order, whatever the jobs
+    files = []  # (rel_path, interested, stat stamp, cached results, read?)
+    work = []   # (rel_path, path, rule sets to scan, their cached digests, digest?)
+    # A scope with project-wide rule sets still walks the tree (never reading
+    # out-of-scope files); otherwise only the scoped files are visited
+    wide = [i for i, rs in enumerate(rule_sets) if rs.project_wide] if scope is not None else []
+    if scope is None or wide:
+        paths = iter_files(root, skip_dirs, skip_paths)
+    else:
+        paths = _scoped_files(root, scope, skip_dirs, skip_paths)
+    paths = list(paths)
+    for rs in rule_sets:
+        rs.plan([rel_path for rel_path, _ in paths])
+    for rel_path, path in paths:
+        if scope is not None and rel_path not in scope:
+            # Out of scope: cached results for the project-wide rule sets only,
+            # read again when the file changed since they were cached
+            stamp = _stamp(path) if caches else None
+            replay, stale, digests = {}, [], {}
+            for i in wide:
+                entry = caches[i].get(rel_path) if stamp and rule_sets[i].wants(rel_path) else None
+                if entry and entry[:2] == stamp:
+                    replay[i] = entry
+                elif entry:
+                    stale.append(i)
+                    digests[i] = entry[2]
+            if stale:
+                work.append((rel_path, str(path), stale, digests, True))
+            if replay or stale:
+                files.append((rel_path, sorted([*replay, *stale]), stamp, replay, bool(stale)))
+            continue
+        stats["files_seen"] += 1
+        interested = [i for i, rs in enumerate(rule_sets) if rs.wants(rel_path)]
+        if not interested:
+            continue
+        stamp, hits, digests = None, {}, {}
+        if caches:
+            stamp = _stamp(path)
+            for i in interested:
+                entry = caches[i].get(rel_path)
+                if entry and stamp and entry[:2] == stamp:
+                    hits[i] = entry
+                elif entry:
+                    digests[i] = entry[2]
+        pending = [i for i in interested if i not in hits]
+        if pending:
+            work.append((rel_path, str(path), pending, digests, caches is not None))
+        files.append((rel_path, interested, stamp, hits, bool(pending)))
+
+    scanned = _scan_work(rule_sets, work, jobs)
+    for rel_path, interested, stamp, hits, read in files:
+        digest, results = None, {}
+        if read:
+            # Results of the same file, in the same (walk) order as files
+            outcome = next(scanned)
+            if outcome is None:
+                continue
+            digest, results = outcome
+            stats["files_read"] += 1
+        else:
+            stats["files_cached"] += 1
+        for i in interested:
+            if i in hits:
+                result = hits[i][3]
+            elif i in results:
+                result = results[i]
+            else:
+                result = caches[i].get(rel_path)[3]  # Content unchanged since cached
+            if caches and i in hits:
+                caches[i].put(rel_path, hits[i][:2], hits[i][2], result)
+            elif caches:
+                caches[i].put(rel_path, stamp, digest, result)
+            rule_sets[i].collect(rel_path, result)
+            stats["files_by_rule_set"][rule_sets[i].name] += 1
+
+    for cache in caches or ():
+        cache.store(partial=scope is not None)
+    return stats
+
+
+def _scan_work(rule_sets: List[RuleSet], work: list, jobs: int) -> Iterator[Optional[tuple]]:
+    """
+    Per work item: (content digest or None, {rule set index: scan_file() result}),
+    or None if unreadable. Rule sets whose cached digest matches are not rescanned.
+    """
+    jobs = min(jobs if jobs > 0 else (os.cpu_count() or 1), len(work))
+    if jobs <= 1:
+        return _scan_files(rule_sets, work)
+    # About four chunks per worker, so one slow chunk does not stall the rest
+    size = max(1, min(_CHUNK_FILES, -(-len(work) // (jobs * 4))))
+    chunks = [work[i:i + size] for i in range(0, len(work), size)]
+    try:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                   initargs=_worker_payload(rule_sets))
+    except (OSError, NotImplementedError):
+        return _scan_files(rule_sets, work)  # No process support: stay serial
+    return _pooled(pool, chunks)
+
+
+def _pooled(pool: ProcessPoolExecutor, chunks: list) -> Iterator[Optional[tuple]]:
+    with pool:
+        # map() yields in submission order: results merge in walk order
+        for results in pool.map(_scan_chunk, chunks):
+            yield from results
+
+
+def _scan_files(rule_sets: List[RuleSet], work: list) -> Iterator[Optional[tuple]]:
+    for rel_path, path, pending, digests, want_digest in work:
+        try:
+            content = Path(path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            yield None
+            continue
+        # Hash of the decoded text: exactly what scan_file() sees
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest() if want_digest else None
+        yield digest, {i: rule_sets[i].scan_file(rel_path, content)
+                       for i in pending if digest is None or digests.get(i) != digest}
+
+
+# Rule sets of a pool worker (set once by _init_worker)
+_worker_rule_sets: List[RuleSet] = []
+
+
+def _worker_payload(rule_sets: List[RuleSet]) -> tuple:
+    """
+    initargs for the pool: the files of the modules defining the rule sets
+    (plugins loaded by path are not importable by name in a fresh worker)
+    and the pickled rule sets.
+    """
+    modules = {}
+    for rs in rule_sets:
+        module = sys.modules.get(type(rs).__module__)
+        if module is not None and module.__name__ != "__main__" and getattr(module, "__file__", None):
+            modules[module.__name__] = module.__file__
+    return modules, pickle.dumps(rule_sets)
+
+
+def _init_worker(modules: Dict[str, str], payload: bytes) -> None:
+    for module_name, path in modules.items():
+        if module_name not in sys.modules:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+    _worker_rule_sets[:] = pickle.loads(payload)
+
+
+def _scan_chunk(chunk: list) -> List[Optional[tuple]]:
+    return list(_scan_files(_worker_rule_sets, chunk))
+
+
+def jobs_from_argv(argv: List[str], default: int = 1) -> int:
+    """--jobs N / --jobs=N / -j N from a hand-parsed command line."""
+    for i, arg in enumerate(argv):
+        if arg in ("--jobs", "-j") and i + 1 < len(argv):
+            return int(argv[i + 1])
+        if arg.startswith("--jobs="):
+            return int(arg.split("=", 1)[1])
+    return default
+
+
+# ---------------------------------------------------------------------------
+# Git scope
+# ---------------------------------------------------------------------------
+
+def _git_paths(root, args: List[str]) -> List[str]:
+    try:
+        proc = subprocess.run(["git", *args], cwd=str(root), capture_output=True,
+                              text=True, encoding="utf-8", errors="replace")
+    except OSError as e:
+        raise RuntimeError(f"git not available: {e}") from e
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"git {' '.join(args)} failed")
+    return [p for p in proc.stdout.split("\0") if p]
+
+
+def changed_paths(root, since: Optional[str] = None, staged: bool = False) -> Optional[List[str]]:
+    """
+    Files under root touched in git, as POSIX paths relative to root.
+
+    since: changed between that ref and the working tree, plus untracked
+    files. staged: staged for commit. None when neither is given (no scope).
+    Deleted files are left out. Raises RuntimeError when git fails (not a
+    repository, unknown ref).
+    """
+    if since is None and not staged:
+        return None
+    diff = ["diff", "--name-only", "-z", "--relative", "--diff-filter=d"]
+    paths = _git_paths(root, diff + (["--cached"] if staged else [since, "--"]))
+    if not staged:
+        paths += _git_paths(root, ["ls-files", "--others", "--exclude-standard", "-z"])
+    return sorted(set(paths))
+
+
+def scope_from_argv(argv: List[str], root) -> Optional[List[str]]:
+    """
+    changed_paths() for --changed-since REF / --staged on a hand-parsed
+    command line (None without either). Exits with the git error if git fails.
+    """
+    since = None
+    for i, arg in enumerate(argv):
+        if arg == "--changed-since" and i + 1 < len(argv):
+            since = argv[i + 1]
+        elif arg.startswith("--changed-since="):
+            since = arg.split("=", 1)[1]
+    try:
+        return changed_paths(root, since, "--staged" in argv)
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(2)
+
+
+# ---------------------------------------------------------------------------
+# Results cache
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _source_digest(cls: type) -> str:
+    """sha256 of the file defining cls ("" if it has none)."""
+    module = sys.modules.get(cls.__module__)
+    try:
+        return hashlib.sha256(Path(module.__file__).read_bytes()).hexdigest()
+    except (AttributeError, TypeError, OSError):
+        return ""
+
+
+def _stamp(path: Path) -> Optional[list]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class _ScanCache:
+    """
+    Per-file results of one rule set: {rel_path: [size, mtime_ns, digest, result]}.
+
+    A full run stores back only the files it saw, so deleted files drop out;
+    a scoped (partial) run keeps the entries of the files it did not see.
+    """
+
+    def __init__(self, cache_dir, rule_set: RuleSet):
+        self.key = rule_set.cache_key()
+        digest = hashlib.sha256(self.key.encode()).hexdigest()[:12]
+        self.path = Path(cache_dir) / f"{rule_set.name}-{digest}.json"
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            valid = data.get("version") == SCAN_CACHE_VERSION and data.get("key") == self.key
+            self.files = data["files"] if valid else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            self.files = {}
+        self.seen: Dict[str, list] = {}
+        self.now_ns = time.time_ns()
+
+    def get(self, rel_path: str) -> Optional[list]:
+        return self.files.get(rel_path)
+
+    def put(self, rel_path: str, stamp: Optional[list], digest: str, result: Any) -> None:
+        if stamp is None or self.now_ns - stamp[1] < _RACY_WINDOW_NS:
+            stamp = [-1, -1]  # Never matches: the next run checks the digest
+        self.seen[rel_path] = stamp + [digest, result]
+
+    def store(self, partial: bool = False) -> None:
+        files = {**self.files, **self.seen} if partial else self.seen
+        if files == self.files:
+            return
+        data = {"version": SCAN_CACHE_VERSION, "key": self.key, "files": files}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # Cache is best-effort
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+def load_rule_set(name: str, root) -> RuleSet:
+    """Instantiate a registered rule set for root (imports its skill script)."""
+    if name not in RULE_SETS:
+        raise KeyError(f"Unknown rule set: {name} (known: {', '.join(RULE_SETS)})")
+    script, class_name = RULE_SETS[name]
+    module_name = f"_rules_{name.replace('-', '_')}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, SKILLS_DIR / script)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return getattr(module, class_name)(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run skill audit rule sets over a single walk")
+    parser.add_argument("project", nargs="?", default=".", help="Project directory to scan")
+    parser.add_argument("--rules", help=f"Comma-separated rule sets (default: all of {', '.join(RULE_SETS)})")
+    parser.add_argument("--json", action="store_true", help="Print the full report of every rule set")
+    parser.add_argument("--list", action="store_true", help="List the registered rule sets")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for reading and scanning files (0: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Rescan every file instead of reusing {SCAN_CACHE_DIR.as_posix()}/")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Only scan files changed since a git ref (plus untracked files)")
+    parser.add_argument("--staged", action="store_true", help="Only scan files staged for commit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (script, _) in RULE_SETS.items():
+            print(f"{name:<18} {script}")
+        return
+
+    project = Path(args.project).resolve()
+    if not project.is_dir():
+        print(f"[ERROR] Directory not found: {project}")
+        sys.exit(1)
+
+    names = [n.strip() for n in args.rules.split(",")] if args.rules else list(RULE_SETS)
+    try:
+        rule_sets = [load_rule_set(name, project) for name in names]
+    except KeyError as e:
+        print(f"[ERROR] {e.args[0]}")
+        sys.exit(1)
+
+    try:
+        scope = changed_paths(project, args.changed_since, args.staged)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    cache_dir = None if args.no_cache else project / SCAN_CACHE_DIR
+    stats = run_scan(project, rule_sets, jobs=args.jobs, cache_dir=cache_dir, only=scope)
+    reports = {rs.name: rs.report() for rs in rule_sets}
+
+    if args.json:
+        print(json.dumps({"project": str(project), "stats": stats, "reports": reports}, indent=2))
+    else:
+        print(f"\n[SCAN] {project}: {stats['files_seen']} files walked, {stats['files_read']} read once, "
+              f"{stats['files_cached']} unchanged")
+        print("-" * 60)
+        for name, report in reports.items():
+            status = "[OK]" if report["passed"] else "[X] "
+            print(f"{status} {name:<18} {stats['files_by_rule_set'][name]} files")
+
+    sys.exit(0 if all(r["passed"] for r in reports.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Session Store - Inove AI Framework
+Structured session records kept next to the markdown daily logs.
+
+The daily logs (docs/08-Logs-Sessoes/YYYY/YYYY-MM-DD.md) remain the source of
+truth. Their sessions are mirrored into one JSONL file per month under
+<logs_dir>/.sessions/, so analytics over long ranges read a few compact files
+instead of regex-parsing a year of markdown.
+
+A per-month manifest records the (mtime_ns, size) of every daily log at the
+time it was ingested. Queries re-ingest only the days whose log changed (hand edits,
+git pull) or disappeared, so the store never serves stale sessions.
+
+Usage:
+    python3 .agents/scripts/session_store.py rebuild        # Backfill from markdown logs
+    python3 .agents/scripts/session_store.py stats [--days N]
+
+    from session_store import SessionStore
+    SessionStore(logs_dir).query(start_date, end_date)
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from platform_compat import Session, find_logs_dir, iter_daily_logs, iter_log_sessions
+
+STORE_DIRNAME = ".sessions"
+STAMPS_SUFFIX = ".stamps.json"
+STORE_VERSION = 1
+
+# Logs modified this recently may change again within the same mtime tick,
+# so they are re-checked on the next query instead of being marked as synced
+_RACY_WINDOW_NS = 2_000_000_000
+
+_DATE_RE = re.compile(r"LOG DI[AÁ]RIO\s*[—–-]\s*(\d{4}-\d{2}-\d{2})")
+_PROJECT_RE = re.compile(r"- Projeto:\s*(.+)")
+
+
+def parse_log_records(content: str, day: str) -> List[dict]:
+    """
+    Session records of one daily log, as stored in the month files.
+
+    'agent' is None when the session header has no [tool] tag, so each
+    consumer keeps applying its own default.
+    """
+    date_match = _DATE_RE.search(content)
+    if not date_match:
+        return []
+    project_match = _PROJECT_RE.search(content)
+    project = project_match.group(1).strip() if project_match else "Unknown"
+
+    return [
+        {
+            "day": day,
+            "date": date_match.group(1),
+            "project": project,
+            "start": rec.start,
+            "end": rec.end,
+            "duration_minutes": rec.duration_minutes,
+            "agent": rec.agent,
+            "activities": rec.activities,
+        }
+        for rec in iter_log_sessions(content)
+    ]
+
+
+def record_to_session(record: dict) -> Session:
+    return Session(
+        date=record["date"],
+        project=record["project"],
+        start=record["start"],
+        end=record["end"],
+        duration_minutes=record["duration_minutes"],
+        activities=record["activities"],
+        agent_source=record["agent"] or "unknown",
+    )
+
+
+class SessionStore:
+    """Month-partitioned JSONL mirror of the daily logs in a logs directory."""
+
+    def __init__(self, logs_dir: Path):
+        self.logs_dir = Path(logs_dir)
+        self.store_dir = self.logs_dir / STORE_DIRNAME
+        # Month records and log stamps loaded or written by this instance
+        self._months: Dict[str, List[dict]] = {}
+        self._stamps: Dict[str, Dict[str, Optional[list]]] = {}
+
+    # -- Files ----------------------------------------------------------------
+
+    def _month_file(self, month: str) -> Path:
+        return self.store_dir / f"{month}.jsonl"
+
+    def _stamps_file(self, month: str) -> Path:
+        return self.store_dir / f"{month}{STAMPS_SUFFIX}"
+
+    def _daily_logs(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, str]:
+        """{YYYY-MM-DD: path} for the daily logs in range, in date order."""
+        return {day.isoformat(): str(path) for day, path in iter_daily_logs(self.logs_dir, start, end)}
+
+    def _load_stamps(self, month: str) -> Dict[str, Optional[list]]:
+        """Manifest of one month: {day: [mtime_ns, size] of the log when ingested}."""
+        if month not in self._stamps:
+            try:
+                data = json.loads(self._stamps_file(month).read_text(encoding="utf-8"))
+                valid = data.get("version") == STORE_VERSION and isinstance(data.get("files"), dict)
+                self._stamps[month] = data["files"] if valid else {}
+            except (OSError, ValueError):
+                self._stamps[month] = {}
+        return self._stamps[month]
+
+    def _save_stamps(self, month: str) -> None:
+        path, stamps = self._stamps_file(month), self._load_stamps(month)
+        if not stamps:
+            path.unlink(missing_ok=True)
+            return
+        self._write_atomic(path, json.dumps({"version": STORE_VERSION, "files": stamps}, sort_keys=True))
+
+    def _read_month(self, month: str) -> List[dict]:
+        if month not in self._months:
+            try:
+                text = self._month_file(month).read_text(encoding="utf-8").strip()
+                # One decode for the whole month: JSONL lines never contain raw newlines
+                self._months[month] = json.loads("[" + text.replace("\n", ",") + "]") if text else []
+            except (OSError, ValueError):
+                self._months[month] = []
+        return self._months[month]
+
+    def _write_month(self, month: str, records: List[dict]) -> None:
+        path = self._month_file(month)
+        if not records:
+            path.unlink(missing_ok=True)
+            return
+        self._write_atomic(path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+    def _write_atomic(self, path: Path, text: str) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    # -- Sync -----------------------------------------------------------------
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[list]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def _ingest(self, days: Dict[str, Optional[str]]) -> None:
+        """Replace the records of the given days (path None = log removed)."""
+        by_month: Dict[str, Dict[str, Optional[str]]] = {}
+        for day, path in days.items():
+            by_month.setdefault(day[:7], {})[day] = path
+
+        now_ns = time.time_ns()
+        for month, month_days in by_month.items():
+            stamps = self._load_stamps(month)
+            records = [r for r in self._read_month(month) if r["day"] not in month_days]
+            for day, path in month_days.items():
+                stamp = self._stamp(path) if path else None
+                if stamp is None:
+                    stamps.pop(day, None)
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    records.extend(parse_log_records(f.read(), day))
+                # A racy log is kept as None: known to the store, re-checked next time
+                stamps[day] = None if now_ns - stamp[0] < _RACY_WINDOW_NS else stamp
+            records.sort(key=lambda r: (r["day"], r["start"]))
+            self._months[month] = records
+            try:
+                self._write_month(month, records)
+                self._save_stamps(month)
+            except OSError:
+                # Read-only store: answer from memory, re-check these days next time
+                stamps.update((day, None) for day in month_days if day in stamps)
+
+    def sync(self, start: date, end: date) -> Dict[str, Optional[list]]:
+        """
+        Bring the store up to date for a date range.
+
+        Only the daily logs and manifests of the range are touched, so the
+        cost follows the range, not the size of the log history.
+
+        Returns:
+            {YYYY-MM-DD: (mtime_ns, size) of its daily log} for the range;
+            None marks a log written too recently to be trusted as unchanged.
+        """
+        logs = self._daily_logs(start, end)
+        lo, hi = start.isoformat(), end.isoformat()
+
+        known: Dict[str, Optional[list]] = {}
+        for month in _months_between(start, end):
+            known.update(self._load_stamps(month))
+
+        stale: Dict[str, Optional[str]] = {
+            day: path for day, path in logs.items() if known.get(day) != self._stamp(path)
+        }
+        # Days still in the manifest whose log is gone (deleted or renamed)
+        for day in known:
+            if day not in logs and lo <= day <= hi:
+                stale[day] = None
+
+        if stale:
+            self._ingest(stale)
+        return {day: self._load_stamps(day[:7])[day] for day in logs if day in self._load_stamps(day[:7])}
+
+    def sync_day(self, day: str) -> None:
+        """Re-ingest a single daily log right after it was written (auto_session end)."""
+        logs = self._daily_logs(date.fromisoformat(day), date.fromisoformat(day))
+        self._ingest({day: logs.get(day)})
+
+    def rebuild(self) -> int:
+        """Drop the store and backfill it from every daily log. Returns the session count."""
+        if self.store_dir.exists():
+            for f in self.store_dir.iterdir():
+                f.unlink()
+        self._months, self._stamps = {}, {}
+        self._ingest(self._daily_logs())
+        return sum(len(records) for records in self._months.values())
+
+    # -- Queries --------------------------------------------------------------
+
+    def query_records(self, start: date, end: date) -> List[dict]:
+        """Session records whose daily log falls in [start, end], sorted by (date, start)."""
+        self.sync(start, end)
+        lo, hi = start.isoformat(), end.isoformat()
+        records = []
+        for month in _months_between(start, end):
+            records.extend(r for r in self._read_month(month) if lo <= r["day"] <= hi)
+        return sorted(records, key=lambda r: (r["date"], r["start"]))
+
+    def records_by_day(self, days: Iterable[str]) -> Dict[str, List[dict]]:
+        """Stored records of the given days, {day: records} in log order (call sync() first)."""
+        wanted = set(days)
+        grouped: Dict[str, List[dict]] = {day: [] for day in sorted(wanted)}
+        for month in sorted({day[:7] for day in wanted}):
+            for record in self._read_month(month):
+                if record["day"] in wanted:
+                    grouped[record["day"]].append(record)
+        return grouped
+
+    def query(self, start: date, end: date) -> List[Session]:
+        """Same as query_records(), as platform_compat.Session tuples."""
+        return [record_to_session(r) for r in self.query_records(start, end)]
+
+
+def _months_between(start: date, end: date) -> Iterable[str]:
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    logs_dir = find_logs_dir()
+    if not logs_dir:
+        print("Diretorio de logs nao encontrado.")
+        sys.exit(1)
+    store = SessionStore(logs_dir)
+
+    if command == "rebuild":
+        t0 = time.perf_counter()
+        count = store.rebuild()
+        print(f"Session store reconstruido: {count} sessoes em {store.store_dir}")
+        print(f"   Tempo: {(time.perf_counter() - t0) * 1000:.0f}ms")
+    elif command == "stats":
+        days = 30
+        if "--days" in sys.argv:
+            idx = sys.argv.index("--days")
+            if idx + 1 < len(sys.argv):
+                days = int(sys.argv[idx + 1])
+        end = date.today()
+        start = date.fromordinal(end.toordinal() - days)
+        t0 = time.perf_counter()
+        records = store.query_records(start, end)
+        elapsed = (time.perf_counter() - t0) * 1000
+        minutes = sum(r["duration_minutes"] for r in records)
+        print(f"Ultimos {days} dias: {len(records)} sessoes, {minutes // 60}h{minutes % 60:02d}m")
+        print(f"   Consulta: {elapsed:.0f}ms")
+    else:
+        print(f"Comando desconhecido: {command}")
+        print("Uso: session_store.py [rebuild|stats [--days N]]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
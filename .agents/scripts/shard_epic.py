@@ -19,8 +19,14 @@ Options:
     --dry-run         Show what would be done without writing
     --backlog PATH    Override backlog path
     --output DIR      Override stories directory (default: docs/stories/)
+
+Incremental generate:
+    docs/stories/.manifest.json records story_id -> (spec_hash, file, workspace_hash).
+    Unchanged stories are skipped without opening their files; only added,
+    changed or removed stories are touched.
 """
 
+import os
 import re
 import sys
 import argparse
@@ -35,10 +41,12 @@ from platform_compat import (
     get_agent_source,
     get_tool_for_agent,
     find_story_file,
-    parse_story_frontmatter,
+    get_story_index,
+    load_story_frontmatters,
     STORY_TEMPLATE,
 )
-from lock_manager import LockManager
+from backlog_index import load_backlog, parse_backlog as parse_backlog_index
+from lock_manager import LockManager, SHARED
 from recovery import git_checkpoint, git_rollback
 
 
@@ -55,73 +63,40 @@ def parse_backlog(content: str) -> list[dict]:
     Returns:
         List of dicts: [{epic_num, epic_name, owner, model, stories: [{id, title, status, description}]}]
     """
-    epics = []
-
-    epic_pattern = re.compile(
-        r"^##\s+Epic\s+(\d+):\s+(.+?)\s*(?:\[(?:P\d+)\])?\s*(?:\[OWNER:\s*(.+?)\])?\s*(?:\[MODEL:\s*(.+?)\])?\s*(?:[✅🔴⏳].*)?$",
-        re.MULTILINE,
-    )
-
-    epic_matches = list(epic_pattern.finditer(content))
+    return _epics_to_dicts(parse_backlog_index(content))
 
-    for idx, match in enumerate(epic_matches):
-        epic_num = int(match.group(1))
-        epic_name = match.group(2).strip()
-        epic_owner = match.group(3).strip() if match.group(3) else None
-        epic_model = match.group(4).strip() if match.group(4) else None
-
-        start_pos = match.end()
-        end_pos = epic_matches[idx + 1].start() if idx + 1 < len(epic_matches) else len(content)
-        epic_content = content[start_pos:end_pos]
-
-        stories = _extract_stories(epic_content, epic_num)
-
-        epics.append({
-            "epic_num": epic_num,
-            "epic_name": epic_name,
-            "owner": epic_owner,
-            "model": epic_model,
-            "stories": stories,
-        })
 
-    return epics
+def load_backlog_epics(backlog_path: Path) -> list[dict]:
+    """Same as parse_backlog(), but reuses the cached backlog index."""
+    return _epics_to_dicts(load_backlog(backlog_path))
 
 
-def _extract_stories(epic_content: str, epic_num: int) -> list[dict]:
-    """Extract stories from an epic's content block.
+def _epics_to_dicts(backlog) -> list[dict]:
+    """Convert the shared backlog tree to the dict shape used by the commands.
 
-    Supports both formats:
+    Only checkbox stories are sharded:
       - Lean: - [ ] Story 1.1: Title
       - Fat:  - [ ] **Story 1.1:** Title (with description below)
     """
-    stories = []
-
-    # Match both lean and fat formats
-    story_pattern = re.compile(
-        r"^-\s*\[([ xX])\]\s*(?:\*\*)?Story\s+(\d+\.\d+):?\*?\*?\s*(.+?)$",
-        re.MULTILINE,
-    )
-
-    story_matches = list(story_pattern.finditer(epic_content))
-
-    for idx, match in enumerate(story_matches):
-        checked = match.group(1).lower() == "x"
-        story_id = match.group(2)
-        story_title = match.group(3).strip()
-
-        # Extract description (indented lines until next story or end)
-        desc_start = match.end()
-        desc_end = story_matches[idx + 1].start() if idx + 1 < len(story_matches) else len(epic_content)
-        description = epic_content[desc_start:desc_end].strip()
-
-        stories.append({
-            "id": story_id,
-            "title": story_title,
-            "status": "done" if checked else "pending",
-            "description": description,
+    epics = []
+    for epic in backlog.epics:
+        epics.append({
+            "epic_num": epic.num,
+            "epic_name": epic.name,
+            "owner": epic.owner,
+            "model": epic.model,
+            "stories": [
+                {
+                    "id": story.id,
+                    "title": story.title,
+                    "status": story.status,
+                    "description": story.description,
+                }
+                for story in epic.stories
+                if story.checked is not None
+            ],
         })
-
-    return stories
+    return epics
 
 
 # ---------------------------------------------------------------------------
@@ -259,8 +234,11 @@ def extract_agent_workspace(filepath: Path) -> str:
     if not filepath.exists():
         return ""
 
-    content = filepath.read_text(encoding="utf-8")
+    return workspace_from_content(filepath.read_text(encoding="utf-8"))
 
+
+def workspace_from_content(content: str) -> str:
+    """Same as extract_agent_workspace(), for content already in memory."""
     for header in ("## Agent Workspace", "## Area Pessoal do Agente"):
         idx = content.find(header)
         if idx != -1:
@@ -276,6 +254,59 @@ def extract_agent_workspace(filepath: Path) -> str:
 # Story Update Functions (used by finish_task.py)
 # ---------------------------------------------------------------------------
 
+def set_story_status(content: str, new_status: str) -> str:
+    """Return story content with the frontmatter status replaced."""
+    return re.sub(
+        r'^status:\s*\S+',
+        f'status: {new_status}',
+        content,
+        count=1,
+        flags=re.MULTILINE,
+    )
+
+
+def add_dependency_context(content: str, context_line: str) -> str | None:
+    """
+    Return story content with a line appended to '## Contexto de Dependencias'.
+
+    Returns None when the section is missing or the line is already there.
+    """
+    # Find the dependency context section
+    dep_header = "## Contexto de Dependencias"
+    dep_idx = content.find(dep_header)
+    if dep_idx == -1:
+        return None
+
+    # Find the next section header
+    next_section = re.search(r'^## ', content[dep_idx + len(dep_header):], re.MULTILINE)
+    if next_section:
+        insert_pos = dep_idx + len(dep_header) + next_section.start()
+    else:
+        insert_pos = len(content)
+
+    # Extract current dependency section
+    dep_section = content[dep_idx + len(dep_header):insert_pos].strip()
+
+    # Remove placeholder text if present
+    cleaned = dep_section
+    for placeholder in [
+        "> Sem dependencias anteriores",
+        "> (contexto sera injetado ao completar stories anteriores)",
+    ]:
+        cleaned = cleaned.replace(placeholder, "").strip()
+
+    # Add new context line
+    if context_line.strip() in cleaned:
+        return None  # Already exists
+
+    new_section = f"{cleaned}\n{context_line}" if cleaned else context_line
+
+    # Rebuild file
+    before = content[:dep_idx + len(dep_header)]
+    after = content[insert_pos:]
+    return f"{before}\n{new_section}\n\n{after}"
+
+
 def update_story_status(story_id: str, new_status: str, output_dir: Path = None) -> bool:
     """
     Update the status field in a story file's YAML frontmatter.
@@ -289,23 +320,13 @@ def update_story_status(story_id: str, new_status: str, output_dir: Path = None)
         True if updated, False if file not found.
     """
     story_file = find_story_file(story_id)
-    if not story_file:
-        if output_dir:
-            safe_id = story_id.replace(".", "-")
-            for f in output_dir.glob(f"STORY-{safe_id}_*.md"):
-                story_file = f
-                break
+    if not story_file and output_dir and output_dir.exists():
+        story_file = get_story_index(output_dir).get(story_id)
     if not story_file or not story_file.exists():
         return False
 
     content = story_file.read_text(encoding="utf-8")
-    updated = re.sub(
-        r'^status:\s*\S+',
-        f'status: {new_status}',
-        content,
-        count=1,
-        flags=re.MULTILINE,
-    )
+    updated = set_story_status(content, new_status)
 
     if updated != content:
         story_file.write_text(updated, encoding="utf-8")
@@ -328,52 +349,15 @@ def inject_dependency_context(story_id: str, context_line: str, output_dir: Path
         True if injected, False if file not found.
     """
     story_file = find_story_file(story_id)
-    if not story_file:
-        if output_dir:
-            safe_id = story_id.replace(".", "-")
-            for f in output_dir.glob(f"STORY-{safe_id}_*.md"):
-                story_file = f
-                break
+    if not story_file and output_dir and output_dir.exists():
+        story_file = get_story_index(output_dir).get(story_id)
     if not story_file or not story_file.exists():
         return False
 
-    content = story_file.read_text(encoding="utf-8")
-
-    # Find the dependency context section
-    dep_header = "## Contexto de Dependencias"
-    dep_idx = content.find(dep_header)
-    if dep_idx == -1:
+    new_content = add_dependency_context(story_file.read_text(encoding="utf-8"), context_line)
+    if new_content is None:
         return False
 
-    # Find the next section header
-    next_section = re.search(r'^## ', content[dep_idx + len(dep_header):], re.MULTILINE)
-    if next_section:
-        insert_pos = dep_idx + len(dep_header) + next_section.start()
-    else:
-        insert_pos = len(content)
-
-    # Extract current dependency section
-    dep_section = content[dep_idx + len(dep_header):insert_pos].strip()
-
-    # Remove placeholder text if present
-    cleaned = dep_section
-    for placeholder in [
-        "> Sem dependencias anteriores",
-        "> (contexto sera injetado ao completar stories anteriores)",
-    ]:
-        cleaned = cleaned.replace(placeholder, "").strip()
-
-    # Add new context line
-    if context_line.strip() in cleaned:
-        return False  # Already exists
-
-    new_section = f"{cleaned}\n{context_line}" if cleaned else context_line
-
-    # Rebuild file
-    before = content[:dep_idx + len(dep_header)]
-    after = content[insert_pos:]
-    new_content = f"{before}\n{new_section}\n\n{after}"
-
     story_file.write_text(new_content, encoding="utf-8")
     return True
 
@@ -384,11 +368,65 @@ def inject_dependency_context(story_id: str, context_line: str, output_dir: Path
 
 def _find_existing_shard(output_dir: Path, story_id: str) -> Path | None:
     """Find an existing shard file for a given story ID, regardless of title slug."""
-    safe_id = story_id.replace(".", "-")
-    prefix = f"STORY-{safe_id}_"
-    for f in output_dir.glob(f"{prefix}*.md"):
-        return f
-    return None
+    if not output_dir.exists():
+        return None
+    return get_story_index(output_dir).get(story_id)
+
+
+# ---------------------------------------------------------------------------
+# Manifest (docs/stories/.manifest.json)
+# ---------------------------------------------------------------------------
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def load_manifest(output_dir: Path) -> dict:
+    """
+    Load the generate manifest: story_id -> {spec_hash, file, workspace_hash}.
+
+    Returns an empty dict when the manifest is missing, corrupt or from
+    another version (generate then falls back to reading the story files).
+    """
+    try:
+        data = json.loads((output_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    stories = data.get("stories")
+    return stories if isinstance(stories, dict) else {}
+
+
+def save_manifest(output_dir: Path, entries: dict) -> None:
+    """Atomically write the manifest, ordered by story ID for stable diffs."""
+    def sort_key(story_id: str):
+        return [int(p) if p.isdigit() else p for p in story_id.split(".")]
+
+    payload = {
+        "version": MANIFEST_VERSION,
+        "stories": {sid: entries[sid] for sid in sorted(entries, key=sort_key)},
+    }
+    path = output_dir / MANIFEST_NAME
+    tmp = path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _manifest_entry(story_hash: str, filename: str, workspace: str) -> dict:
+    return {
+        "spec_hash": story_hash,
+        "file": filename,
+        "workspace_hash": compute_spec_hash(workspace) if workspace else None,
+    }
+
+
+def _manifest_file(output_dir: Path, entry: dict | None) -> Path | None:
+    """Story file recorded in the manifest, if it still exists."""
+    if not entry or not entry.get("file"):
+        return None
+    path = output_dir / Path(entry["file"]).name
+    return path if path.exists() else None
 
 
 # ---------------------------------------------------------------------------
@@ -408,8 +446,10 @@ def generate_command(args: argparse.Namespace) -> int:
 
     output_dir = Path(args.output)
 
-    if not lock_mgr.wait_for_lock("stories", agent, max_wait=30):
-        print("Recurso 'stories' bloqueado por outro agente. Tente novamente.")
+    # Reads BACKLOG.md, writes the story files: both locked together (all or none)
+    batch = [("backlog", SHARED), "stories"]
+    if not lock_mgr.acquire_many(batch, agent, wait=30):
+        print("Recursos 'backlog'/'stories' bloqueados por outro agente. Tente novamente.")
         return 1
 
     checkpoint_label = "shard-epic"
@@ -418,8 +458,7 @@ def generate_command(args: argparse.Namespace) -> int:
         had_checkpoint = git_checkpoint(checkpoint_label)
 
     try:
-        content = backlog_path.read_text(encoding="utf-8")
-        epics = parse_backlog(content)
+        epics = load_backlog_epics(backlog_path)
 
         if not epics:
             print("Nenhum Epic encontrado no backlog.")
@@ -433,22 +472,42 @@ def generate_command(args: argparse.Namespace) -> int:
         created = 0
         updated = 0
         skipped = 0
+        force = getattr(args, 'force', False)
+        manifest = load_manifest(output_dir)
+        manifest_dirty = not (output_dir / MANIFEST_NAME).exists()
+        seen_ids = set()
 
         for epic in epics:
             for story in epic["stories"]:
                 story = dict(story)
+                seen_ids.add(story["id"])
                 filename = _safe_filename(story["id"], story["title"])
                 target = output_dir / filename
-                existing = _find_existing_shard(output_dir, story["id"])
+                story_hash = story.get("spec_hash") or compute_story_spec_hash(story)
+                story["spec_hash"] = story_hash
+                entry = manifest.get(story["id"])
+
+                # Fast path: unchanged since last generate, no need to open the file
+                if (
+                    not force
+                    and entry
+                    and entry.get("spec_hash") == story_hash
+                    and entry.get("file") == filename
+                    and target.exists()
+                ):
+                    if args.dry_run:
+                        print(f"  [DRY-RUN] SKIP: {filename}")
+                    skipped += 1
+                    continue
+
+                existing = _manifest_file(output_dir, entry) or _find_existing_shard(output_dir, story["id"])
 
                 # Preserve Agent Workspace from existing file
                 workspace = ""
                 source_file = existing or target
-                if source_file.exists() and not getattr(args, 'force', False):
+                if source_file.exists() and not force:
                     workspace = extract_agent_workspace(source_file)
 
-                story_hash = story.get("spec_hash") or compute_story_spec_hash(story)
-                story["spec_hash"] = story_hash
                 new_content = generate_story_content(story, epic, workspace)
 
                 current_file = None
@@ -466,7 +525,7 @@ def generate_command(args: argparse.Namespace) -> int:
                     else:
                         old = current_file.read_text(encoding="utf-8")
                         old_hash = _extract_frontmatter_field(old, "spec_hash")
-                        if old_hash == story_hash and not getattr(args, 'force', False):
+                        if old_hash == story_hash and not force:
                             action = "skip"
                         else:
                             action = "update"
@@ -481,10 +540,15 @@ def generate_command(args: argparse.Namespace) -> int:
                         skipped += 1
                     continue
 
+                manifest[story["id"]] = _manifest_entry(story_hash, filename, workspace)
+                manifest_dirty = True
+
                 if action == "skip":
                     skipped += 1
                     continue
 
+                index = get_story_index(output_dir)
+                before_ns = index.snapshot()
                 if existing and existing.exists() and existing.name != filename:
                     existing.unlink()
 
@@ -494,12 +558,26 @@ def generate_command(args: argparse.Namespace) -> int:
                     created += 1
 
                 target.write_text(new_content, encoding="utf-8")
+                index.record(story["id"], target, before_ns)
+
+        # Stories removed from the backlog (only meaningful without filters)
+        removed = []
+        if not getattr(args, 'epic', None) and not getattr(args, 'story', None):
+            removed = sorted(sid for sid in manifest if sid not in seen_ids)
+
+        if not args.dry_run:
+            for sid in removed:
+                del manifest[sid]
+            if removed or manifest_dirty:
+                save_manifest(output_dir, manifest)
 
         total = created + updated + skipped
         print(f"\n📦 Generate {'(dry-run) ' if args.dry_run else ''}concluido!")
         print(f"   Criados:     {created}")
         print(f"   Atualizados: {updated}")
         print(f"   Inalterados: {skipped}")
+        if removed:
+            print(f"   Removidos:   {len(removed)} (fora do backlog; use 'clean' para apagar os arquivos)")
         print(f"   Total:       {total}")
         print(f"   Diretorio:   {output_dir}/")
         return 0
@@ -512,7 +590,7 @@ def generate_command(args: argparse.Namespace) -> int:
         return 1
 
     finally:
-        lock_mgr.release_lock("stories", agent)
+        lock_mgr.release_many(batch, agent)
 
 
 def migrate_command(args: argparse.Namespace) -> int:
@@ -562,6 +640,13 @@ def migrate_command(args: argparse.Namespace) -> int:
                 print(f"  Story file: {output_dir / filename}")
         return 0
 
+    # Rewrites BACKLOG.md and the story files: both locked together (all or none)
+    lock_mgr = LockManager()
+    agent = get_agent_source()
+    if not lock_mgr.acquire_many(["backlog", "stories"], agent, wait=30):
+        print("Recursos 'backlog'/'stories' bloqueados por outro agente. Tente novamente.")
+        return 1
+
     # Git checkpoint
     had_checkpoint = git_checkpoint("migrate-backlog")
 
@@ -573,6 +658,7 @@ def migrate_command(args: argparse.Namespace) -> int:
 
         # 2. Generate story files
         output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = load_manifest(output_dir)
         story_count = 0
         for epic in epics:
             for story in epic["stories"]:
@@ -582,6 +668,8 @@ def migrate_command(args: argparse.Namespace) -> int:
 
                 # Preserve workspace from existing file
                 existing = _find_existing_shard(output_dir, story["id"])
+                index = get_story_index(output_dir)
+                before_ns = index.snapshot()
                 workspace = ""
                 if existing and existing.exists():
                     workspace = extract_agent_workspace(existing)
@@ -591,9 +679,13 @@ def migrate_command(args: argparse.Namespace) -> int:
                 story["spec_hash"] = story.get("spec_hash") or compute_story_spec_hash(story)
                 new_content = generate_story_content(story, epic, workspace)
                 target.write_text(new_content, encoding="utf-8")
+                index.record(story["id"], target, before_ns)
+                manifest[story["id"]] = _manifest_entry(story["spec_hash"], filename, workspace)
                 story_count += 1
                 print(f"  Story: {filename}")
 
+        save_manifest(output_dir, manifest)
+
         # 3. Generate lean backlog
         lean_content = _generate_lean_backlog(epics, fat_content)
         backlog_path.write_text(lean_content, encoding="utf-8")
@@ -612,6 +704,9 @@ def migrate_command(args: argparse.Namespace) -> int:
             git_rollback("migrate-backlog")
         return 1
 
+    finally:
+        lock_mgr.release_many(["backlog", "stories"], agent)
+
 
 def _generate_lean_backlog(epics: list[dict], original_content: str = "") -> str:
     """Generate a lean backlog from parsed epics."""
@@ -648,8 +743,7 @@ def status_command(args: argparse.Namespace) -> int:
         print("BACKLOG.md nao encontrado.")
         return 1
 
-    content = backlog_path.read_text(encoding="utf-8")
-    epics = parse_backlog(content)
+    epics = load_backlog_epics(backlog_path)
     epics = _filter_epics(epics, args)
 
     # Collect all story IDs from backlog
@@ -659,15 +753,8 @@ def status_command(args: argparse.Namespace) -> int:
             backlog_ids.add(story["id"])
 
     # Collect all story IDs from files
-    shard_ids = set()
-    shard_files = {}
-    if output_dir.exists():
-        for f in output_dir.glob("STORY-*.md"):
-            m = re.match(r"STORY-(\d+)-(\d+)_", f.name)
-            if m:
-                sid = f"{m.group(1)}.{m.group(2)}"
-                shard_ids.add(sid)
-                shard_files[sid] = f
+    shard_files = get_story_index(output_dir).all() if output_dir.exists() else {}
+    shard_ids = set(shard_files)
 
     covered = backlog_ids & shard_ids
     missing = backlog_ids - shard_ids
@@ -697,8 +784,7 @@ def status_command(args: argparse.Namespace) -> int:
 
     # Check new format (agent/tool fields)
     missing_fields = []
-    for sid, f in shard_files.items():
-        fm = parse_story_frontmatter(f)
+    for sid, (_, fm) in load_story_frontmatters(output_dir).items():
         if not fm.get("agent") or not fm.get("tool"):
             missing_fields.append(sid)
 
@@ -728,14 +814,14 @@ def clean_command(args: argparse.Namespace) -> int:
         print("docs/stories/ nao existe. Nada a limpar.")
         return 0
 
-    content = backlog_path.read_text(encoding="utf-8")
-    epics = parse_backlog(content)
+    epics = load_backlog_epics(backlog_path)
 
     backlog_ids = set()
     for epic in epics:
         for story in epic["stories"]:
             backlog_ids.add(story["id"])
 
+    manifest = load_manifest(output_dir)
     removed = 0
     for f in output_dir.glob("STORY-*.md"):
         m = re.match(r"STORY-(\d+)-(\d+)_", f.name)
@@ -746,9 +832,17 @@ def clean_command(args: argparse.Namespace) -> int:
                     print(f"  [DRY-RUN] REMOVE: {f.name}")
                 else:
                     f.unlink()
+                    manifest.pop(sid, None)
                     print(f"  Removido: {f.name}")
                 removed += 1
 
+    if not args.dry_run and (output_dir / MANIFEST_NAME).exists():
+        stale = [sid for sid in manifest if sid not in backlog_ids]
+        for sid in stale:
+            del manifest[sid]
+        if removed or stale:
+            save_manifest(output_dir, manifest)
+
     if removed == 0:
         print("Nenhum story file orfao encontrado.")
     else:
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Story Graph - Inove AI Framework
+Dependency graph (DAG) built from story frontmatter (depends_on / unlocks).
+
+Loads every story's edges in one pass over docs/stories/ and answers
+scheduling queries in linear time:
+    - ready set: pending stories whose dependencies are all done
+    - topological order (with cycle detection)
+    - critical path per epic (longest chain of pending stories)
+
+Usage:
+    python3 .agents/scripts/story_graph.py ready       # Stories prontas para iniciar
+    python3 .agents/scripts/story_graph.py order       # Ordem topologica
+    python3 .agents/scripts/story_graph.py critical    # Caminho critico por Epic
+    python3 .agents/scripts/story_graph.py cycles      # Ciclos de dependencia
+
+    from story_graph import StoryGraph
+    graph = StoryGraph.load()
+    graph.ready()
+"""
+
+import re
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from platform_compat import load_story_frontmatters
+
+
+def story_sort_key(story_id: str) -> tuple:
+    """Numeric sort key: '1.10' after '1.9'."""
+    return tuple(int(p) if p.isdigit() else 0 for p in story_id.split("."))
+
+
+@dataclass
+class StoryNode:
+    """A story file and its dependency metadata."""
+    id: str
+    epic: Optional[int] = None
+    status: str = "unknown"
+    agent: str = "unknown"
+    tool: str = "unknown"
+    path: Optional[Path] = None
+    depends_on: List[str] = field(default_factory=list)
+    unlocks: List[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status == "done"
+
+
+class StoryGraph:
+    """DAG of stories: edge A -> B means B depends on A (A unlocks B)."""
+
+    def __init__(self, nodes: Dict[str, StoryNode]):
+        self.nodes = nodes
+        self.preds: Dict[str, set] = {sid: set() for sid in nodes}
+        self.succs: Dict[str, set] = {sid: set() for sid in nodes}
+
+        for sid, node in nodes.items():
+            for dep in node.depends_on:
+                self._add_edge(dep, sid)
+            for unlocked in node.unlocks:
+                self._add_edge(sid, unlocked)
+
+        self._order, self.cycles = self._toposort()
+
+    def _add_edge(self, src: str, dst: str) -> None:
+        # Unknown endpoints stay as predecessors (they block) but are not nodes
+        if dst in self.preds:
+            self.preds[dst].add(src)
+        if src in self.succs and dst in self.nodes:
+            self.succs[src].add(dst)
+
+    # -- Loading --------------------------------------------------------------
+
+    @classmethod
+    def load(cls, stories_dir: Optional[Path] = None) -> "StoryGraph":
+        """Read every story's frontmatter once and build the graph."""
+        return cls.from_frontmatter(load_story_frontmatters(stories_dir))
+
+    @classmethod
+    def from_frontmatter(cls, frontmatters: Dict[str, tuple]) -> "StoryGraph":
+        """Build from {story_id: (path, frontmatter_dict)}."""
+        nodes = {}
+        for sid, (path, fm) in frontmatters.items():
+            epic = re.search(r"\d+", str(fm.get("epic", "")))
+            nodes[sid] = StoryNode(
+                id=sid,
+                epic=int(epic.group()) if epic else None,
+                status=fm.get("status", "unknown") or "unknown",
+                agent=fm.get("agent", "unknown") or "unknown",
+                tool=fm.get("tool", "unknown") or "unknown",
+                path=path,
+                depends_on=[d for d in _as_list(fm.get("depends_on")) if d != sid],
+                unlocks=[u for u in _as_list(fm.get("unlocks")) if u != sid],
+            )
+        return cls(nodes)
+
+    # -- Queries --------------------------------------------------------------
+
+    def _toposort(self) -> tuple[List[str], List[List[str]]]:
+        """Kahn's algorithm; nodes left over belong to (or hang off) cycles."""
+        indegree = {sid: len(self.preds[sid] & self.nodes.keys()) for sid in self.nodes}
+        queue = deque(sorted((sid for sid, d in indegree.items() if d == 0), key=story_sort_key))
+        order = []
+        while queue:
+            sid = queue.popleft()
+            order.append(sid)
+            for nxt in sorted(self.succs[sid], key=story_sort_key):
+                indegree[nxt] -= 1
+                if indegree[nxt] == 0:
+                    queue.append(nxt)
+
+        remaining = {sid for sid, d in indegree.items() if d > 0}
+        return order, self._find_cycles(remaining) if remaining else []
+
+    def _find_cycles(self, remaining: set) -> List[List[str]]:
+        """Extract one representative cycle per strongly-connected leftover group."""
+        cycles, visited = [], set()
+        for start in sorted(remaining, key=story_sort_key):
+            if start in visited:
+                continue
+            # Walk predecessors inside 'remaining' until a node repeats
+            path, pos, sid = [], {}, start
+            while sid not in pos and sid not in visited:
+                pos[sid] = len(path)
+                path.append(sid)
+                sid = min((p for p in self.preds[sid] if p in remaining), key=story_sort_key)
+            visited.update(path)
+            if sid in pos:
+                cycle = list(reversed(path[pos[sid]:]))
+                cycles.append(cycle)
+        return cycles
+
+    def topological_order(self) -> List[str]:
+        """Stories in dependency order (stories in cycles are omitted; see .cycles)."""
+        return list(self._order)
+
+    def is_done(self, story_id: str) -> bool:
+        node = self.nodes.get(story_id)
+        return bool(node and node.done)
+
+    def status_of(self, story_id: str) -> str:
+        node = self.nodes.get(story_id)
+        return node.status if node else "unknown"
+
+    def blockers(self, story_id: str) -> List[str]:
+        """Dependencies of a story that are not done yet (unknown stories count)."""
+        return sorted((p for p in self.preds.get(story_id, ()) if not self.is_done(p)), key=story_sort_key)
+
+    def is_ready(self, story_id: str) -> bool:
+        return story_id in self.nodes and not self.is_done(story_id) and not self.blockers(story_id)
+
+    def ready(self) -> List[str]:
+        """Pending stories whose dependencies are all done, in topological order."""
+        return [sid for sid in self._order if not self.nodes[sid].done and not self.blockers(sid)]
+
+    def critical_paths(self) -> Dict[Optional[int], List[str]]:
+        """
+        Longest chain of pending stories ending in each epic.
+
+        Returns:
+            {epic: [story ids along the path]} - len(path) is the critical path length
+        """
+        dist: Dict[str, int] = {}
+        best_pred: Dict[str, Optional[str]] = {}
+        for sid in self._order:
+            weight = 0 if self.nodes[sid].done else 1
+            pred = max(
+                (p for p in self.preds[sid] if p in dist),
+                key=lambda p: (dist[p], tuple(-k for k in story_sort_key(p))),
+                default=None,
+            )
+            dist[sid] = weight + (dist[pred] if pred else 0)
+            best_pred[sid] = pred
+
+        ends: Dict[Optional[int], str] = {}
+        for sid in self._order:
+            epic = self.nodes[sid].epic
+            if dist[sid] > 0 and (epic not in ends or dist[sid] > dist[ends[epic]]):
+                ends[epic] = sid
+
+        paths = {}
+        for epic, end in ends.items():
+            path, sid = [], end
+            while sid is not None:
+                if not self.nodes[sid].done:
+                    path.append(sid)
+                sid = best_pred[sid]
+            paths[epic] = list(reversed(path))
+        return paths
+
+
+def _as_list(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "ready"
+    graph = StoryGraph.load()
+
+    if not graph.nodes:
+        print("Nenhum story file encontrado em docs/stories/.")
+        print("   Execute: python3 .agents/scripts/shard_epic.py generate")
+        sys.exit(1)
+
+    if graph.cycles:
+        print("⚠️  Ciclos de dependencia detectados:")
+        for cycle in graph.cycles:
+            print(f"   {' -> '.join(cycle + cycle[:1])}")
+        print()
+
+    if command == "ready":
+        ready = graph.ready()
+        print(f"Stories prontas ({len(ready)}):")
+        for sid in ready:
+            node = graph.nodes[sid]
+            print(f"   - Story {sid} (agent: {node.agent}, tool: {node.tool})")
+    elif command == "order":
+        for pos, sid in enumerate(graph.topological_order(), 1):
+            print(f"   {pos:>3}. Story {sid} [{graph.status_of(sid)}]")
+    elif command == "critical":
+        paths = graph.critical_paths()
+        if not paths:
+            print("Nenhuma story pendente.")
+        for epic in sorted(paths, key=lambda e: (e is None, e or 0)):
+            label = f"Epic {epic}" if epic is not None else "Sem epic"
+            path = paths[epic]
+            print(f"   {label}: {len(path)} stories — {' -> '.join(path)}")
+    elif command == "cycles":
+        if not graph.cycles:
+            print("Nenhum ciclo de dependencia.")
+    else:
+        print(f"Comando desconhecido: {command}")
+        print("Uso: story_graph.py [ready|order|critical|cycles]")
+        sys.exit(1)
+
+    sys.exit(1 if graph.cycles and command == "cycles" else 0)
+
+
+if __name__ == "__main__":
+    main()
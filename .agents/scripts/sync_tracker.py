@@ -326,6 +326,7 @@ def cmd_locks():
 
     if not locks:
         print("📭 Nenhum lock ativo.")
+        print("   Histórico de contenção: python3 .agents/scripts/lock_manager.py stats")
         return
 
     print("🔒 Locks ativos:\n")
@@ -341,6 +342,8 @@ def cmd_locks():
         print(f"    Há {minutes_ago} minuto(s)")
         print()
 
+    print("Histórico de contenção: python3 .agents/scripts/lock_manager.py stats")
+
 
 def main():
     if len(sys.argv) > 1 and sys.argv[1] in ["-h", "--help"]:
@@ -121,10 +121,12 @@ CORE_SCRIPTS = {
     "auto_finish.py",
     "auto_preview.py",
     "auto_session.py",
+    "backlog_index.py",
     "checklist.py",
     "dashboard.py",
     "finish_task.py",
     "generate_web_data.py",
+    "lock_broker.py",
     "lock_manager.py",
     "metrics.py",
     "notifier.py",
@@ -133,8 +135,11 @@ CORE_SCRIPTS = {
     "project_analyzer.py",
     "recovery.py",
     "reminder_system.py",
+    "scan_engine.py",
+    "session_store.py",
     "shard_epic.py",
     "squad_manager.py",
+    "story_graph.py",
     "sync_tracker.py",
     "validate_installation.py",
     "validate_traceability.py",
@@ -547,7 +552,7 @@ def validate_installation(verbose: bool = False, mode: str = "warn"):
     print("=" * 64)
 
     # Counts
-    print(f"  Core expected: {21} agents | {42} skills | {22} workflows | {22} scripts")
+    print(f"  Core expected: {21} agents | {42} skills | {22} workflows | {27} scripts")
     print()
 
     has_issues = False
@@ -12,13 +12,20 @@ Uso:
 
 import os
 import re
+import sys
 import json
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass, asdict
 
+sys.path.insert(0, str(Path(__file__).parent))
+from backlog_index import Backlog, load_backlog, parse_backlog
+
+# "**Story 1.1**: Nome" em qualquer lugar do texto (parágrafos, tabelas)
+_BOLD_STORY_RE = re.compile(r'\*\*Story\s+(\d+\.\d+)\*\*[:\s]+([^\n]+)', re.IGNORECASE)
+
 # Paths
 DOCS_DIR = Path("docs")
 PLANNING_DIR = DOCS_DIR / "planning"
@@ -97,50 +104,49 @@ def extract_requirements(prd_content: str) -> List[Dict]:
     return requirements
 
 
-def extract_stories(backlog_content: str) -> List[Dict]:
-    """Extrai stories do backlog"""
-    stories = []
-
-    # Padrões para encontrar stories
-    patterns = [
-        r'###?\s*Story\s+(\d+\.\d+)[:\s]+([^\n]+)',  # ### Story 1.1: Nome
-        r'\*\*Story\s+(\d+\.\d+)\*\*[:\s]+([^\n]+)',  # **Story 1.1:** Nome
-        r'-\s*\[[ x]\]\s*\*\*Story\s+(\d+\.\d+)[:\*]*\s*([^\n]+)',  # - [ ] **Story 1.1:** Nome
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, backlog_content, re.IGNORECASE)
-        for match in matches:
-            story_id = f"Story-{match[0]}"
-            description = match[1].strip().replace('**', '')[:100]
+def extract_stories(backlog_content: Union[str, Backlog], raw_content: Optional[str] = None) -> List[Dict]:
+    """
+    Extrai stories do backlog (### Story, lean ou fat).
 
-            # Evita duplicatas
-            if not any(s['id'] == story_id for s in stories):
-                stories.append({
-                    'id': story_id,
-                    'description': description,
-                    'has_acceptance_criteria': False,
-                    'requirements': []
-                })
+    Com o texto bruto (raw_content, ou backlog_content quando é str), menções
+    "**Story X.Y**" fora de checkbox/heading (parágrafos, tabelas) também contam.
+    """
+    backlog = _as_backlog(backlog_content)
+    if raw_content is None and isinstance(backlog_content, str):
+        raw_content = backlog_content
+    stories = []
+    seen = set()
+
+    found = [(item.id, item.title) for item in backlog.stories]
+    if raw_content:
+        found += _BOLD_STORY_RE.findall(raw_content)
+
+    for item_id, title in found:
+        story_id = f"Story-{item_id}"
+
+        # Evita duplicatas
+        if story_id in seen:
+            continue
+        seen.add(story_id)
+        stories.append({
+            'id': story_id,
+            'description': title.strip().replace('**', '')[:100],
+            'has_acceptance_criteria': False,
+            'requirements': []
+        })
 
     return stories
 
 
-def check_story_has_ac(backlog_content: str, story_id: str) -> bool:
+def check_story_has_ac(backlog_content: Union[str, Backlog], story_id: str) -> bool:
     """Verifica se uma story tem Acceptance Criteria"""
-    # Encontra a seção da story
-    story_pattern = rf'Story\s+{story_id.replace("Story-", "")}[:\s]+'
-    match = re.search(story_pattern, backlog_content, re.IGNORECASE)
+    item = _as_backlog(backlog_content).get(story_id.replace("Story-", ""))
 
-    if not match:
+    if not item:
         return False
 
-    # Pega conteúdo após a story até a próxima story ou epic
-    start_pos = match.end()
-    next_section = re.search(r'(###?\s*Story|##\s*Epic)', backlog_content[start_pos:])
-    end_pos = start_pos + next_section.start() if next_section else len(backlog_content)
-
-    section_content = backlog_content[start_pos:end_pos]
+    # Título + bloco da story até a próxima story ou epic
+    section_content = f"{item.title}\n{item.description}"
 
     # Verifica presença de AC
     ac_patterns = [
@@ -158,6 +164,13 @@ def check_story_has_ac(backlog_content: str, story_id: str) -> bool:
     return False
 
 
+def _as_backlog(backlog_content: Union[str, Backlog]) -> Backlog:
+    """Aceita o conteúdo bruto do BACKLOG.md ou o índice já carregado"""
+    if isinstance(backlog_content, Backlog):
+        return backlog_content
+    return parse_backlog(backlog_content)
+
+
 def map_requirements_to_stories(requirements: List[Dict], backlog_content: str) -> None:
     """Mapeia quais stories cobrem quais requisitos"""
     for req in requirements:
@@ -476,17 +489,18 @@ def main():
     # Lê conteúdo dos arquivos (tolerante a ausência)
     prd_content = read_file(PRD_PATH) or ""
     backlog_content = read_file(BACKLOG_PATH) or ""
+    backlog = load_backlog(BACKLOG_PATH) if backlog_content else None
 
     # Extrai dados
     requirements = extract_requirements(prd_content) if prd_content else []
-    stories = extract_stories(backlog_content) if backlog_content else []
+    stories = extract_stories(backlog, backlog_content) if backlog else []
 
     # Mapeia cobertura
     map_requirements_to_stories(requirements, backlog_content)
 
     # Verifica AC em cada story
     for story in stories:
-        story['has_acceptance_criteria'] = check_story_has_ac(backlog_content, story['id'])
+        story['has_acceptance_criteria'] = check_story_has_ac(backlog, story['id'])
 
     # Encontra órfãs
     orphan_stories = find_orphan_stories(stories, requirements)
@@ -9,54 +9,164 @@ Use this before deployment or major releases.
 Usage:
     python scripts/verify_all.py .
     python scripts/verify_all.py . --stop-on-fail
+    python scripts/verify_all.py . --jobs 1          # One check at a time
+    python scripts/verify_all.py . --no-cache        # Ignore cached results
 
 Includes ALL checks:
     P0: Framework Integrity (Installation Validation)
     P1: Code Quality (TypeScript, Lint)
     P2: Build
     P3: Traceability
+
+Checks run concurrently on a bounded worker pool. A suite starts only after
+the suites in its "depends_on" have finished; checks inside a suite and
+suites without a dependency between them overlap. Checks whose inputs are
+unchanged since their last run reuse that result (.agents/cache/checks/).
+Check output streams to the console and to .agents/logs/checks/<check>.log.
 """
 
+import os
 import sys
 import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
+from typing import List, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent))
 from _check_runner import (
     print_header, print_error, print_warning,
-    run_script_check, run_check, print_summary, Colors
+    run_script_check, run_check, print_summary, Colors,
+    CHECK_CACHE_DIR, CHECK_LOG_DIR, FRAMEWORK_INPUTS, TRACEABILITY_INPUTS,
+    WEB_BUILD_INPUTS, WEB_LINT_INPUTS, WEB_TYPECHECK_INPUTS,
 )
 
-# Complete verification suite organized by priority category
+# Complete verification suite organized by priority category.
+# "depends_on" lists the categories that must finish before this one starts.
+# Each check: (name, script or command, required, input globs for the cache).
 VERIFICATION_SUITE = [
     {
         "category": "Framework Integrity",
         "checks": [
-            ("Installation Validation", ".agents/scripts/validate_installation.py", True),
+            ("Installation Validation", ".agents/scripts/validate_installation.py", True, FRAMEWORK_INPUTS),
         ]
     },
     {
         "category": "Code Quality",
+        "depends_on": ["Framework Integrity"],
         "web_checks": [
-            ("TypeScript Check", ["npx", "tsc", "--noEmit"], True),
-            ("Lint Check", ["npm", "run", "lint"], False),
+            ("TypeScript Check", ["npx", "tsc", "--noEmit"], True, WEB_TYPECHECK_INPUTS),
+            ("Lint Check", ["npm", "run", "lint"], False, WEB_LINT_INPUTS),
         ]
     },
     {
         "category": "Build",
+        "depends_on": ["Framework Integrity"],
         "web_checks": [
-            ("Build Check", ["npm", "run", "build"], True),
+            ("Build Check", ["npm", "run", "build"], True, WEB_BUILD_INPUTS),
         ]
     },
     {
         "category": "Traceability",
+        "depends_on": ["Framework Integrity"],
         "checks": [
-            ("Traceability Validation", ".agents/scripts/validate_traceability.py", False),
+            ("Traceability Validation", ".agents/scripts/validate_traceability.py", False, TRACEABILITY_INPUTS),
         ]
     },
 ]
 
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
+
+
+def build_plan(suites: List[dict], project_path: Path, has_web: bool, use_cache: bool = True) -> List[dict]:
+    """
+    Flatten the suites into check jobs, in declaration order.
+
+    Each job: name, category, required, after (names of the checks it waits
+    for), inputs + cache_dir, log_dir, and either script (Python check) or
+    cmd + cwd (web check).
+    """
+    cache_dir = project_path / CHECK_CACHE_DIR if use_cache else None
+    log_dir = project_path / CHECK_LOG_DIR
+    by_category = {}
+    plan = []
+    for suite in suites:
+        category = suite["category"]
+        after = [name for dep in suite.get("depends_on", []) for name in by_category.get(dep, [])]
+        jobs = [
+            {"name": name, "category": category, "required": required, "after": after,
+             "script": project_path / script_rel, "cwd": str(project_path), "timeout": 600,
+             "inputs": inputs, "cache_dir": cache_dir, "log_dir": log_dir}
+            for name, script_rel, required, inputs in suite.get("checks", [])
+        ]
+        if has_web:
+            jobs += [
+                {"name": name, "category": category, "required": required, "after": after,
+                 "cmd": cmd, "cwd": str(project_path / "web"), "timeout": 300,
+                 "inputs": inputs, "cache_dir": cache_dir, "log_dir": log_dir}
+                for name, cmd, required, inputs in suite.get("web_checks", [])
+            ]
+        by_category[category] = [job["name"] for job in jobs]
+        plan.extend(jobs)
+    return plan
+
+
+def _run_job(job: dict, cancel: threading.Event) -> dict:
+    cache = {"inputs": job.get("inputs"), "cache_dir": job.get("cache_dir"), "log_dir": job.get("log_dir")}
+    if "script" in job:
+        result = run_script_check(job["name"], job["script"], job["cwd"], timeout=job["timeout"], cancel=cancel, **cache)
+    else:
+        result = run_check(job["name"], job["cmd"], job["cwd"], timeout=job["timeout"], cancel=cancel, **cache)
+    result["category"] = job["category"]
+    return result
+
+
+def run_plan(plan: List[dict], jobs: int = DEFAULT_JOBS, stop_on_fail: bool = False) -> Tuple[List[dict], bool]:
+    """
+    Run the checks of a plan as a DAG on a pool of 'jobs' workers.
+
+    Ready checks start in plan order. With stop_on_fail, the first failed
+    required check cancels the checks still running and nothing new starts.
+
+    Returns:
+        (results in plan order, True if stopped by a required failure)
+    """
+    cancel = threading.Event()
+    done = {}
+    pending = list(plan)
+    running = {}
+    stopped = False
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        try:
+            while pending or running:
+                if not cancel.is_set():
+                    for job in [j for j in pending if all(dep in done for dep in j["after"])]:
+                        if len(running) >= max(1, jobs):
+                            break
+                        pending.remove(job)
+                        running[pool.submit(_run_job, job, cancel)] = job
+                if not running:
+                    break  # Stopped: the remaining checks never start
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running.pop(future)
+                    result = done[job["name"]] = future.result()
+                    failed = not result["passed"] and not result.get("skipped")
+                    if stop_on_fail and job["required"] and failed and not stopped:
+                        stopped = True
+                        print_error(f"CRITICAL: {job['name']} failed. Stopping verification.")
+                        cancel.set()
+        except BaseException:
+            # Ctrl-C: kill the running checks (in their own sessions, they do
+            # not get it) instead of waiting for them when the pool shuts down
+            cancel.set()
+            raise
+
+    return [done[job["name"]] for job in plan if job["name"] in done], stopped
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -66,12 +176,17 @@ def main():
 Examples:
   python scripts/verify_all.py .
   python scripts/verify_all.py . --stop-on-fail
+  python scripts/verify_all.py . --jobs 1
+  python scripts/verify_all.py . --no-cache
         """
     )
     parser.add_argument("project", help="Project path to validate")
     parser.add_argument("--url", help="URL for performance & E2E checks (optional)")
     parser.add_argument("--no-e2e", action="store_true", help="Skip E2E tests")
     parser.add_argument("--stop-on-fail", action="store_true", help="Stop on first failure")
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS,
+                        help=f"Checks to run at the same time (default: {DEFAULT_JOBS})")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every check, ignoring cached results")
 
     args = parser.parse_args()
 
@@ -85,43 +200,19 @@ Examples:
     print(f"Project: {project_path}")
     print(f"URL: {args.url}")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Jobs: {max(1, args.jobs)}")
 
     start_time = datetime.now()
-    results = []
 
     web_dir = project_path / "web"
     has_web = web_dir.exists() and (web_dir / "package.json").exists()
 
-    for suite in VERIFICATION_SUITE:
-        category = suite["category"]
-        print_header(f"{category.upper()}", width=70)
-
-        # Python script checks
-        for name, script_rel, required in suite.get("checks", []):
-            script = project_path / script_rel
-            result = run_script_check(name, script, str(project_path), timeout=600)
-            result["category"] = category
-            results.append(result)
-
-            if args.stop_on_fail and required and not result["passed"] and not result.get("skipped"):
-                print_error(f"CRITICAL: {name} failed. Stopping verification.")
-                _print_final_report(results, start_time)
-                sys.exit(1)
-
-        # Web checks (npm/npx commands in web/ dir)
-        if has_web:
-            for name, cmd, required in suite.get("web_checks", []):
-                result = run_check(name, cmd, str(web_dir), timeout=300)
-                result["category"] = category
-                results.append(result)
-
-                if args.stop_on_fail and required and not result["passed"] and not result.get("skipped"):
-                    print_error(f"CRITICAL: {name} failed. Stopping verification.")
-                    _print_final_report(results, start_time)
-                    sys.exit(1)
+    plan = build_plan(VERIFICATION_SUITE, project_path, has_web, use_cache=not args.no_cache)
+    print_header("RUNNING CHECKS", width=70)
+    results, stopped = run_plan(plan, args.jobs, args.stop_on_fail)
 
     all_passed = _print_final_report(results, start_time)
-    sys.exit(0 if all_passed else 1)
+    sys.exit(0 if all_passed and not stopped else 1)
 
 
 def _print_final_report(results, start_time) -> bool:
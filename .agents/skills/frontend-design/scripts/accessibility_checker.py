@@ -4,7 +4,7 @@ Accessibility Checker - WCAG compliance audit
 Checks HTML files for accessibility issues.
 
 Usage:
-    python accessibility_checker.py <project_path>
+    python accessibility_checker.py <project_path> [--changed-since REF | --staged]
 
 Checks:
     - Form labels
@@ -12,14 +12,21 @@ Checks:
     - Color contrast hints
     - Keyboard navigation
     - Semantic HTML
+
+Files are found and read by the shared scan engine
+(.agents/scripts/scan_engine.py), as the "accessibility" rule set.
 """
 
 import sys
 import json
 import re
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from datetime import datetime
 
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import RuleSet, run_scan, scope_from_argv  # noqa: E402
+
 # Fix Windows console encoding
 try:
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -27,83 +34,111 @@ except:
     pass
 
 
-def find_html_files(project_path: Path) -> list:
-    """Find all HTML/JSX/TSX files."""
-    patterns = ['**/*.html', '**/*.jsx', '**/*.tsx']
-    skip_dirs = {'node_modules', '.next', 'dist', 'build', '.git'}
-    
-    files = []
-    for pattern in patterns:
-        for f in project_path.glob(pattern):
-            if not any(skip in f.parts for skip in skip_dirs):
-                files.append(f)
-    
-    return files[:50]
+MAX_FILES = 50
+
+
+class AccessibilityRules(RuleSet):
+    """Accessibility checks as a scan-engine rule set (first MAX_FILES files in walk order)."""
+
+    name = "accessibility"
+    extensions = frozenset({'.html', '.jsx', '.tsx'})
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.wanted = 0
+        self.results = []
+
+    def wants(self, rel_path: str) -> bool:
+        if self.wanted >= MAX_FILES or not super().wants(rel_path):
+            return False
+        self.wanted += 1
+        return True
+
+    def scan_file(self, rel_path: str, content: str) -> list:
+        return check_accessibility_content(content)
+
+    def collect(self, rel_path: str, result: list) -> None:
+        self.results.append({"file": PurePosixPath(rel_path).name, "issues": result})
+
+    def report(self) -> dict:
+        with_issues = [r for r in self.results if r["issues"]]
+        total_issues = sum(len(r["issues"]) for r in with_issues)
+        return {
+            "files_checked": len(self.results),
+            "files_with_issues": len(with_issues),
+            "issues_found": total_issues,
+            "files": with_issues,
+            # Accessibility issues are important but not blocking
+            "passed": total_issues < 5
+        }
 
 
 def check_accessibility(file_path: Path) -> list:
     """Check a single file for accessibility issues."""
-    issues = []
-    
     try:
         content = file_path.read_text(encoding='utf-8', errors='ignore')
-        
-        # Check for form inputs without labels
-        inputs = re.findall(r'<input[^>]*>', content, re.IGNORECASE)
-        for inp in inputs:
-            if 'type="hidden"' not in inp.lower():
-                if 'aria-label' not in inp.lower() and 'id=' not in inp.lower():
-                    issues.append("Input without label or aria-label")
-                    break
-        
-        # Check for buttons without accessible text
-        buttons = re.findall(r'<button[^>]*>[^<]*</button>', content, re.IGNORECASE)
-        for btn in buttons:
-            # Check if button has text content or aria-label
-            if 'aria-label' not in btn.lower():
-                text = re.sub(r'<[^>]+>', '', btn)
-                if not text.strip():
-                    issues.append("Button without accessible text")
-                    break
-        
-        # Check for missing lang attribute
-        if '<html' in content.lower() and 'lang=' not in content.lower():
-            issues.append("Missing lang attribute on <html>")
-        
-        # Check for missing skip link
-        if '<main' in content.lower() or '<body' in content.lower():
-            if 'skip' not in content.lower() and '#main' not in content.lower():
-                issues.append("Consider adding skip-to-main-content link")
-        
-        # Check for click handlers without keyboard support
-        onclick_count = content.lower().count('onclick=')
-        onkeydown_count = content.lower().count('onkeydown=') + content.lower().count('onkeyup=')
-        if onclick_count > 0 and onkeydown_count == 0:
-            issues.append("onClick without keyboard handler (onKeyDown)")
-        
-        # Check for tabIndex misuse
-        if 'tabindex=' in content.lower():
-            if 'tabindex="-1"' not in content.lower() and 'tabindex="0"' not in content.lower():
-                positive_tabindex = re.findall(r'tabindex="([1-9]\d*)"', content, re.IGNORECASE)
-                if positive_tabindex:
-                    issues.append("Avoid positive tabIndex values")
-        
-        # Check for autoplay media
-        if 'autoplay' in content.lower():
-            if 'muted' not in content.lower():
-                issues.append("Autoplay media should be muted")
-        
-        # Check for role usage
-        if 'role="button"' in content.lower():
-            # Divs with role button should have tabindex
-            div_buttons = re.findall(r'<div[^>]*role="button"[^>]*>', content, re.IGNORECASE)
-            for div in div_buttons:
-                if 'tabindex' not in div.lower():
-                    issues.append("role='button' without tabindex")
-                    break
-        
     except Exception as e:
-        issues.append(f"Error reading file: {str(e)[:50]}")
+        return [f"Error reading file: {str(e)[:50]}"]
+    return check_accessibility_content(content)
+
+
+def check_accessibility_content(content: str) -> list:
+    """Check the text of a file for accessibility issues."""
+    issues = []
+    
+    # Check for form inputs without labels
+    inputs = re.findall(r'<input[^>]*>', content, re.IGNORECASE)
+    for inp in inputs:
+        if 'type="hidden"' not in inp.lower():
+            if 'aria-label' not in inp.lower() and 'id=' not in inp.lower():
+                issues.append("Input without label or aria-label")
+                break
+    
+    # Check for buttons without accessible text
+    buttons = re.findall(r'<button[^>]*>[^<]*</button>', content, re.IGNORECASE)
+    for btn in buttons:
+        # Check if button has text content or aria-label
+        if 'aria-label' not in btn.lower():
+            text = re.sub(r'<[^>]+>', '', btn)
+            if not text.strip():
+                issues.append("Button without accessible text")
+                break
+    
+    # Check for missing lang attribute
+    if '<html' in content.lower() and 'lang=' not in content.lower():
+        issues.append("Missing lang attribute on <html>")
+    
+    # Check for missing skip link
+    if '<main' in content.lower() or '<body' in content.lower():
+        if 'skip' not in content.lower() and '#main' not in content.lower():
+            issues.append("Consider adding skip-to-main-content link")
+    
+    # Check for click handlers without keyboard support
+    onclick_count = content.lower().count('onclick=')
+    onkeydown_count = content.lower().count('onkeydown=') + content.lower().count('onkeyup=')
+    if onclick_count > 0 and onkeydown_count == 0:
+        issues.append("onClick without keyboard handler (onKeyDown)")
+    
+    # Check for tabIndex misuse
+    if 'tabindex=' in content.lower():
+        if 'tabindex="-1"' not in content.lower() and 'tabindex="0"' not in content.lower():
+            positive_tabindex = re.findall(r'tabindex="([1-9]\d*)"', content, re.IGNORECASE)
+            if positive_tabindex:
+                issues.append("Avoid positive tabIndex values")
+    
+    # Check for autoplay media
+    if 'autoplay' in content.lower():
+        if 'muted' not in content.lower():
+            issues.append("Autoplay media should be muted")
+    
+    # Check for role usage
+    if 'role="button"' in content.lower():
+        # Divs with role button should have tabindex
+        div_buttons = re.findall(r'<div[^>]*role="button"[^>]*>', content, re.IGNORECASE)
+        for div in div_buttons:
+            if 'tabindex' not in div.lower():
+                issues.append("role='button' without tabindex")
+                break
     
     return issues
 
@@ -118,8 +153,10 @@ def main():
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-"*60)
     
-    # Find HTML files
-    files = find_html_files(project_path)
+    # Find and check HTML files in one walk
+    rules = AccessibilityRules(project_path)
+    run_scan(project_path, [rules], only=scope_from_argv(sys.argv, project_path))
+    files = rules.results
     print(f"Found {len(files)} HTML/JSX/TSX files")
     
     if not files:
@@ -134,16 +171,7 @@ def main():
         print(json.dumps(output, indent=2))
         sys.exit(0)
     
-    # Check each file
-    all_issues = []
-    
-    for f in files:
-        issues = check_accessibility(f)
-        if issues:
-            all_issues.append({
-                "file": str(f.name),
-                "issues": issues
-            })
+    all_issues = [item for item in files if item["issues"]]
     
     # Summary
     print("\n" + "="*60)
@@ -93,7 +93,11 @@ import sys
 import os
 import re
 import json
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import SCAN_CACHE_DIR, RuleSet, jobs_from_argv, run_scan, scope_from_argv  # noqa: E402
 
 class UXAuditor:
     def __init__(self):
@@ -107,9 +111,11 @@ class UXAuditor:
             with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
                 content = f.read()
         except: return
-        
+        self.audit_content(os.path.basename(filepath), content)
+
+    def audit_content(self, filename: str, content: str) -> None:
+        """Audit the text of one file (filename is used in the messages)."""
         self.files_checked += 1
-        filename = os.path.basename(filepath)
 
         # Pre-calculate common flags
         has_long_text = bool(re.search(r'<p|<div.*class=.*text|article|<span.*text', content, re.IGNORECASE))
@@ -387,7 +393,7 @@ class UXAuditor:
         if re.search(r'@keyframes|transition:', content):
             expensive_props = re.findall(r'width|height|top|left|right|bottom|margin|padding', content)
             if expensive_props:
-                self.warnings.append(f"[Performance] {filename}: Animating expensive properties ({', '.join(set(expensive_props))}). Use transform/opacity where possible.")
+                self.warnings.append(f"[Performance] {filename}: Animating expensive properties ({', '.join(dict.fromkeys(expensive_props))}). Use transform/opacity where possible.")
             
             # Reduced Motion
             if not re.search(r'prefers-reduced-motion', content):
@@ -671,13 +677,13 @@ class UXAuditor:
         if re.search(r'<img(?![^>]*alt=)[^>]*>', content):
             self.issues.append(f"[Accessibility] {filename}: Missing img alt text")
 
-    def audit_directory(self, directory: str) -> None:
-        extensions = {'.tsx', '.jsx', '.html', '.vue', '.svelte', '.css'}
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if d not in {'node_modules', '.git', 'dist', 'build', '.next'}]
-            for file in files:
-                if Path(file).suffix in extensions:
-                    self.audit_file(os.path.join(root, file))
+    def audit_directory(self, directory: str, jobs: int = 1, cache: bool = True, only: list = None) -> None:
+        """
+        Audit every file under directory (only: just these relative paths).
+        cache: reuse unchanged files' findings from .agents/cache/scan/.
+        """
+        cache_dir = Path(directory) / SCAN_CACHE_DIR if cache else None
+        run_scan(directory, [UXRules(directory, self)], jobs=jobs, cache_dir=cache_dir, only=only)
 
     def get_report(self):
         return {
@@ -688,6 +694,35 @@ class UXAuditor:
             "compliant": len(self.issues) == 0
         }
 
+
+class UXRules(RuleSet):
+    """UXAuditor as a scan-engine rule set (one fresh auditor per file, merged in walk order)."""
+
+    name = "ux"
+    extensions = frozenset({'.tsx', '.jsx', '.html', '.vue', '.svelte', '.css'})
+
+    def __init__(self, root, auditor: "UXAuditor" = None):
+        super().__init__(root)
+        self.auditor = auditor if auditor is not None else UXAuditor()
+
+    def scan_file(self, rel_path: str, content: str) -> list:
+        auditor = UXAuditor()
+        auditor.audit_content(PurePosixPath(rel_path).name, content)
+        return [auditor.files_checked, auditor.issues, auditor.warnings, auditor.passed_count]
+
+    def collect(self, rel_path: str, result: list) -> None:
+        files_checked, issues, warnings, passed_count = result
+        self.auditor.files_checked += files_checked
+        self.auditor.issues.extend(issues)
+        self.auditor.warnings.extend(warnings)
+        self.auditor.passed_count += passed_count
+
+    def report(self) -> dict:
+        report = self.auditor.get_report()
+        report["passed"] = report["compliant"]
+        return report
+
+
 def main():
     if len(sys.argv) < 2: sys.exit(1)
     
@@ -696,7 +731,8 @@ def main():
     
     auditor = UXAuditor()
     if os.path.isfile(path): auditor.audit_file(path)
-    else: auditor.audit_directory(path)
+    else: auditor.audit_directory(path, jobs_from_argv(sys.argv), "--no-cache" not in sys.argv,
+                                  scope_from_argv(sys.argv, path))
     
     report = auditor.get_report()
     
@@ -13,13 +13,20 @@ WHAT IT CHECKS:
     - JSX/TSX files (React page components)
     - NOT markdown files (those are developer docs, not public content)
 
+Pages are found and read by the shared scan engine
+(.agents/scripts/scan_engine.py), as the "geo" rule set.
+
 Usage:
-    python geo_checker.py <project_path>
+    python geo_checker.py <project_path> [--changed-since REF | --staged]
 """
 import sys
 import re
 import json
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import RuleSet, run_scan, scope_from_argv  # noqa: E402
 
 # Fix Windows console encoding
 try:
@@ -43,6 +50,8 @@ SKIP_FILES = {
     'tailwind.config', 'postcss.config', 'next.config'
 }
 
+MAX_PAGES = 30
+
 
 def is_page_file(file_path: Path) -> bool:
     """Check if this file is likely a public-facing page."""
@@ -78,22 +87,40 @@ def is_page_file(file_path: Path) -> bool:
     return False
 
 
-def find_web_pages(project_path: Path) -> list:
-    """Find public-facing web pages only."""
-    patterns = ['**/*.html', '**/*.htm', '**/*.jsx', '**/*.tsx']
-    
-    files = []
-    for pattern in patterns:
-        for f in project_path.glob(pattern):
-            # Skip excluded directories
-            if any(skip in f.parts for skip in SKIP_DIRS):
-                continue
-            
-            # Check if it's likely a page
-            if is_page_file(f):
-                files.append(f)
-    
-    return files[:30]  # Limit to 30 pages
+class GEORules(RuleSet):
+    """GEO page checks as a scan-engine rule set (first MAX_PAGES pages in walk order)."""
+
+    name = "geo"
+    extensions = frozenset({'.html', '.htm', '.jsx', '.tsx'})
+    skip_dirs = frozenset(SKIP_DIRS)
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.wanted = 0
+        self.results = []
+
+    def wants(self, rel_path: str) -> bool:
+        if self.wanted >= MAX_PAGES or not super().wants(rel_path):
+            return False
+        if not is_page_file(PurePosixPath(rel_path)):
+            return False
+        self.wanted += 1
+        return True
+
+    def scan_file(self, rel_path: str, content: str) -> dict:
+        return check_page_content(PurePosixPath(rel_path).name, content)
+
+    def collect(self, rel_path: str, result: dict) -> None:
+        self.results.append(result)
+
+    def report(self) -> dict:
+        avg_score = sum(r['score'] for r in self.results) / len(self.results) if self.results else 0
+        return {
+            "pages_checked": len(self.results),
+            "average_score": round(avg_score),
+            "pages": self.results,
+            "passed": not self.results or avg_score >= 60
+        }
 
 
 def check_page(file_path: Path) -> dict:
@@ -102,7 +129,11 @@ def check_page(file_path: Path) -> dict:
         content = file_path.read_text(encoding='utf-8', errors='ignore')
     except Exception as e:
         return {'file': str(file_path.name), 'passed': [], 'issues': [f"Error: {e}"], 'score': 0}
-    
+    return check_page_content(file_path.name, content)
+
+
+def check_page_content(name: str, content: str) -> dict:
+    """Check the text of a web page for GEO elements."""
     issues = []
     passed = []
     
@@ -212,7 +243,7 @@ def check_page(file_path: Path) -> dict:
     score = (len(passed) / total * 100) if total > 0 else 0
     
     return {
-        'file': str(file_path.name),
+        'file': name,
         'passed': passed,
         'issues': issues,
         'score': round(score)
@@ -229,8 +260,10 @@ def main():
     print(f"Project: {target_path}")
     print("-" * 60)
     
-    # Find web pages only
-    pages = find_web_pages(target_path)
+    # Find and check web pages in one walk
+    rules = GEORules(target_path)
+    run_scan(target_path, [rules], only=scope_from_argv(sys.argv, target_path))
+    pages = rules.results
     
     if not pages:
         print("\n[!] No public web pages found.")
@@ -242,11 +275,7 @@ def main():
     
     print(f"Found {len(pages)} public pages to analyze\n")
     
-    # Check each page
-    results = []
-    for page in pages:
-        result = check_page(page)
-        results.append(result)
+    results = pages
     
     # Print results
     for result in results:
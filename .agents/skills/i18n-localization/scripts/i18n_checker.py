@@ -2,11 +2,23 @@
 """
 i18n Checker - Detects hardcoded strings and missing translations.
 Scans for untranslated text in React, Vue, and Python files.
+
+Locale and code files are found and read by the shared scan engine
+(.agents/scripts/scan_engine.py), as the "i18n" rule set, with per-file
+results cached in .agents/cache/scan/.
+
+Usage: python i18n_checker.py <project_path> [--no-cache] [--changed-since REF | --staged]
+With --changed-since/--staged only touched code files are analyzed; locale
+completeness still compares every locale file, unchanged ones from the cache.
 """
 import sys
 import re
 import json
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import SCAN_CACHE_DIR, RuleSet, run_scan, scope_from_argv  # noqa: E402
 
 # Fix Windows console encoding for Unicode output
 try:
@@ -50,46 +62,51 @@ I18N_PATTERNS = [
     r'i18n\.',             # Generic i18n
 ]
 
-def find_locale_files(project_path: Path) -> list:
-    """Find translation/locale files."""
-    patterns = [
-        "**/locales/**/*.json",
-        "**/translations/**/*.json",
-        "**/lang/**/*.json",
-        "**/i18n/**/*.json",
-        "**/messages/*.json",
-        "**/*.po",  # gettext
-    ]
-    
-    files = []
-    for pattern in patterns:
-        files.extend(project_path.glob(pattern))
-    
-    return [f for f in files if 'node_modules' not in str(f)]
+# Directories whose JSON files are translations (plus .po files anywhere)
+LOCALE_DIRS = {'locales', 'translations', 'lang', 'i18n'}
+
+# Code files: extension -> pattern family in HARDCODED_PATTERNS
+CODE_EXTENSIONS = {
+    '.tsx': 'jsx', '.jsx': 'jsx', '.ts': 'jsx', '.js': 'jsx',
+    '.vue': 'vue',
+    '.py': 'python'
+}
+CODE_SKIP = ['node_modules', '.git', 'dist', 'build', '__pycache__', 'venv', 'test', 'spec']
+MAX_CODE_FILES = 50
+
+
+def is_locale_file(rel_path: str) -> bool:
+    """Translation/locale file (locales/, translations/, lang/, i18n/, messages/, *.po)."""
+    path = PurePosixPath(rel_path)
+    if path.suffix == '.po':
+        return True
+    if path.suffix != '.json':
+        return False
+    return bool(LOCALE_DIRS & set(path.parts[:-1])) or path.parent.name == 'messages'
 
-def check_locale_completeness(locale_files: list) -> dict:
-    """Check if all locales have the same keys."""
+
+def is_code_file(rel_path: str) -> bool:
+    return (PurePosixPath(rel_path).suffix in CODE_EXTENSIONS
+            and not any(x in rel_path for x in CODE_SKIP))
+
+
+def check_locale_completeness(locale_count: int, locale_keys: list) -> dict:
+    """Check if all locales have the same keys ((language, namespace, keys) per JSON file)."""
     issues = []
     passed = []
     
-    if not locale_files:
+    if not locale_count:
         return {'passed': [], 'issues': ["[!] No locale files found"]}
     
     # Group by parent folder (language)
     locales = {}
-    for f in locale_files:
-        if f.suffix == '.json':
-            try:
-                lang = f.parent.name
-                content = json.loads(f.read_text(encoding='utf-8'))
-                if lang not in locales:
-                    locales[lang] = {}
-                locales[lang][f.stem] = set(flatten_keys(content))
-            except:
-                continue
+    for lang, namespace, keys in locale_keys:
+        if lang not in locales:
+            locales[lang] = {}
+        locales[lang][namespace] = set(keys)
     
     if len(locales) < 2:
-        passed.append(f"[OK] Found {len(locale_files)} locale file(s)")
+        passed.append(f"[OK] Found {locale_count} locale file(s)")
         return {'passed': passed, 'issues': issues}
     
     passed.append(f"[OK] Found {len(locales)} language(s): {', '.join(locales.keys())}")
@@ -128,61 +145,34 @@ def flatten_keys(d, prefix=''):
             keys.add(new_key)
     return keys
 
-def check_hardcoded_strings(project_path: Path) -> dict:
-    """Check for hardcoded strings in code files."""
-    issues = []
-    passed = []
-    
-    # Find code files
-    extensions = {
-        '.tsx': 'jsx', '.jsx': 'jsx', '.ts': 'jsx', '.js': 'jsx',
-        '.vue': 'vue',
-        '.py': 'python'
-    }
+def find_hardcoded(filename: str, file_type: str, content: str) -> dict:
+    """i18n usage and hardcoded-string examples of one code file."""
+    # Check for i18n usage
+    has_i18n = any(re.search(p, content) for p in I18N_PATTERNS)
     
-    code_files = []
-    for ext in extensions:
-        code_files.extend(project_path.rglob(f"*{ext}"))
+    # Check for hardcoded strings
+    examples = []
+    if not has_i18n:
+        for pattern in HARDCODED_PATTERNS.get(file_type, []):
+            matches = re.findall(pattern, content)
+            if matches:
+                examples.append(f"{filename}: {str(matches[0])[:40]}...")
     
-    code_files = [f for f in code_files if not any(x in str(f) for x in 
-                  ['node_modules', '.git', 'dist', 'build', '__pycache__', 'venv', 'test', 'spec'])]
+    return {'i18n': has_i18n, 'hardcoded': examples}
+
+def check_hardcoded_strings(code_file_count: int, analyzed: list) -> dict:
+    """Summarize hardcoded strings from find_hardcoded() results of the analyzed files."""
+    issues = []
+    passed = []
     
-    if not code_files:
+    if not code_file_count:
         return {'passed': ["[!] No code files found"], 'issues': []}
     
-    files_with_i18n = 0
-    files_with_hardcoded = 0
-    hardcoded_examples = []
+    files_with_i18n = sum(1 for r in analyzed if r['i18n'])
+    files_with_hardcoded = sum(1 for r in analyzed if r['hardcoded'])
+    hardcoded_examples = [ex for r in analyzed for ex in r['hardcoded']][:5]
     
-    for file_path in code_files[:50]:  # Limit
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            ext = file_path.suffix
-            file_type = extensions.get(ext, 'jsx')
-            
-            # Check for i18n usage
-            has_i18n = any(re.search(p, content) for p in I18N_PATTERNS)
-            if has_i18n:
-                files_with_i18n += 1
-            
-            # Check for hardcoded strings
-            patterns = HARDCODED_PATTERNS.get(file_type, [])
-            hardcoded_found = False
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                if matches and not has_i18n:
-                    hardcoded_found = True
-                    if len(hardcoded_examples) < 5:
-                        hardcoded_examples.append(f"{file_path.name}: {str(matches[0])[:40]}...")
-            
-            if hardcoded_found:
-                files_with_hardcoded += 1
-                
-        except:
-            continue
-    
-    passed.append(f"[OK] Analyzed {len(code_files)} code files")
+    passed.append(f"[OK] Analyzed {code_file_count} code files")
     
     if files_with_i18n > 0:
         passed.append(f"[OK] {files_with_i18n} files use i18n")
@@ -196,6 +186,70 @@ def check_hardcoded_strings(project_path: Path) -> dict:
     
     return {'passed': passed, 'issues': issues}
 
+
+class I18nRules(RuleSet):
+    """
+    Locale completeness and hardcoded-string checks as a scan-engine rule set.
+    Every code file is counted; MAX_CODE_FILES are analyzed, picked in
+    CODE_EXTENSIONS order (.tsx first, .py last) so that the app code comes
+    before the .py scripts of tooling such as .agents/.
+    """
+
+    name = "i18n"
+    project_wide = True
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.locale_count = 0
+        self.locale_keys = []
+        self.code_file_count = 0
+        self.analyzed = []
+        self.selected = set()
+
+    def plan(self, rel_paths: list) -> None:
+        code_files = [p for p in rel_paths if is_code_file(p)
+                      and (self.scope is None or p in self.scope)]
+        order = list(CODE_EXTENSIONS)
+        code_files.sort(key=lambda p: order.index(PurePosixPath(p).suffix))
+        self.selected = set(code_files[:MAX_CODE_FILES])
+
+    def wants(self, rel_path: str) -> bool:
+        if is_locale_file(rel_path):
+            self.locale_count += 1
+            return PurePosixPath(rel_path).suffix == '.json'
+        if is_code_file(rel_path):
+            self.code_file_count += 1
+            return rel_path in self.selected
+        return False
+
+    def scan_file(self, rel_path: str, content: str) -> dict:
+        path = PurePosixPath(rel_path)
+        if path.suffix == '.json':
+            try:
+                return {'locale': sorted(flatten_keys(json.loads(content)))}
+            except Exception:
+                return {'locale': None}
+        return {'code': find_hardcoded(path.name, CODE_EXTENSIONS[path.suffix], content)}
+
+    def collect(self, rel_path: str, result: dict) -> None:
+        if 'code' in result:
+            if self.scope is None or rel_path in self.scope:
+                self.analyzed.append(result['code'])
+        elif result['locale'] is not None:
+            path = PurePosixPath(rel_path)
+            self.locale_keys.append((path.parent.name, path.stem, result['locale']))
+
+    def results(self) -> tuple:
+        """(locale result, code result) as printed by the CLI."""
+        return (check_locale_completeness(self.locale_count, self.locale_keys),
+                check_hardcoded_strings(self.code_file_count, self.analyzed))
+
+    def report(self) -> dict:
+        locale_result, code_result = self.results()
+        issues = locale_result['issues'] + code_result['issues']
+        return {'locales': locale_result, 'code': code_result,
+                'passed': not any(i.startswith("[X]") for i in issues)}
+
 def main():
     target = sys.argv[1] if len(sys.argv) > 1 else "."
     project_path = Path(target)
@@ -204,12 +258,11 @@ def main():
     print("  i18n CHECKER - Internationalization Audit")
     print("=" * 60 + "\n")
     
-    # Check locale files
-    locale_files = find_locale_files(project_path)
-    locale_result = check_locale_completeness(locale_files)
-    
-    # Check hardcoded strings
-    code_result = check_hardcoded_strings(project_path)
+    # Check locale files and hardcoded strings in one walk
+    rules = I18nRules(project_path)
+    cache_dir = None if "--no-cache" in sys.argv else project_path / SCAN_CACHE_DIR
+    run_scan(project_path, [rules], cache_dir=cache_dir, only=scope_from_argv(sys.argv, project_path))
+    locale_result, code_result = rules.results()
     
     # Print results
     print("[LOCALE FILES]")
@@ -5,10 +5,17 @@ Runs appropriate linters based on project type.
 
 Usage:
     python lint_runner.py <project_path>
+    python lint_runner.py <project_path> --changed-since main   # Files changed since main
+    python lint_runner.py <project_path> --staged               # Files staged for commit
 
 Supports:
     - Node.js: npm run lint, npx tsc --noEmit
     - Python: ruff check, mypy
+
+With --changed-since/--staged, eslint, ruff and mypy only get the touched
+files, and linters with no touched file of their language are skipped. tsc
+and the project's own lint script (its flags and config are kept) still
+check the whole project, and the output says so.
 """
 
 import subprocess
@@ -16,6 +23,15 @@ import sys
 import json
 from pathlib import Path
 from datetime import datetime
+from typing import List, Optional
+
+# Shared git scope helpers (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import scope_from_argv  # noqa: E402
+
+JS_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs')
+TS_EXTENSIONS = ('.ts', '.tsx')
+PY_EXTENSIONS = ('.py', '.pyi')
 
 # Fix Windows console encoding
 try:
@@ -24,8 +40,15 @@ except:
     pass
 
 
-def detect_project_type(project_path: Path) -> dict:
-    """Detect project type and available linters."""
+def _targets(changed: Optional[List[str]], extensions: tuple) -> List[str]:
+    """Linter arguments: the whole project, or the changed files with these extensions."""
+    if changed is None:
+        return ["."]
+    return [path for path in changed if path.endswith(extensions)]
+
+
+def detect_project_type(project_path: Path, changed: Optional[List[str]] = None) -> dict:
+    """Detect project type and available linters (changed: limit them to these files)."""
     result = {
         "type": "unknown",
         "linters": []
@@ -40,15 +63,24 @@ def detect_project_type(project_path: Path) -> dict:
             scripts = pkg.get("scripts", {})
             deps = {**pkg.get("dependencies", {}), **pkg.get("devDependencies", {})}
             
-            # Check for lint script
+            # Check for lint script (its own flags: always the whole project)
+            js_files = _targets(changed, JS_EXTENSIONS)
             if "lint" in scripts:
-                result["linters"].append({"name": "npm lint", "cmd": ["npm", "run", "lint"]})
-            elif "eslint" in deps:
-                result["linters"].append({"name": "eslint", "cmd": ["npx", "eslint", "."]})
+                if js_files:
+                    linter = {"name": "npm lint", "cmd": ["npm", "run", "lint"]}
+                    if changed is not None:
+                        linter["note"] = "lint script checks the whole project"
+                    result["linters"].append(linter)
+            elif "eslint" in deps and js_files:
+                result["linters"].append({"name": "eslint", "cmd": ["npx", "eslint", *js_files]})
             
-            # Check for TypeScript
+            # Check for TypeScript (whole program: type errors cross files)
             if "typescript" in deps or (project_path / "tsconfig.json").exists():
-                result["linters"].append({"name": "tsc", "cmd": ["npx", "tsc", "--noEmit"]})
+                if _targets(changed, TS_EXTENSIONS):
+                    linter = {"name": "tsc", "cmd": ["npx", "tsc", "--noEmit"]}
+                    if changed is not None:
+                        linter["note"] = "type check covers the whole project"
+                    result["linters"].append(linter)
                 
         except:
             pass
@@ -56,13 +88,15 @@ def detect_project_type(project_path: Path) -> dict:
     # Python project
     if (project_path / "pyproject.toml").exists() or (project_path / "requirements.txt").exists():
         result["type"] = "python"
+        py_files = _targets(changed, PY_EXTENSIONS)
         
         # Check for ruff
-        result["linters"].append({"name": "ruff", "cmd": ["ruff", "check", "."]})
+        if py_files:
+            result["linters"].append({"name": "ruff", "cmd": ["ruff", "check", *py_files]})
         
         # Check for mypy
-        if (project_path / "mypy.ini").exists() or (project_path / "pyproject.toml").exists():
-            result["linters"].append({"name": "mypy", "cmd": ["mypy", "."]})
+        if py_files and ((project_path / "mypy.ini").exists() or (project_path / "pyproject.toml").exists()):
+            result["linters"].append({"name": "mypy", "cmd": ["mypy", *py_files]})
     
     return result
 
@@ -75,6 +109,8 @@ def run_linter(linter: dict, cwd: Path) -> dict:
         "output": "",
         "error": ""
     }
+    if linter.get("note"):
+        result["note"] = linter["note"]
     
     try:
         proc = subprocess.run(
@@ -103,6 +139,7 @@ def run_linter(linter: dict, cwd: Path) -> dict:
 
 def main():
     project_path = Path(sys.argv[1] if len(sys.argv) > 1 else ".").resolve()
+    changed = scope_from_argv(sys.argv, project_path)
     
     print(f"\n{'='*60}")
     print(f"[LINT RUNNER] Unified Linting")
@@ -111,20 +148,23 @@ def main():
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Detect project type
-    project_info = detect_project_type(project_path)
+    project_info = detect_project_type(project_path, changed)
     print(f"Type: {project_info['type']}")
+    if changed is not None:
+        print(f"Scope: {len(changed)} changed files")
     print(f"Linters: {len(project_info['linters'])}")
     print("-"*60)
     
     if not project_info["linters"]:
-        print("No linters found for this project type.")
+        message = "No linters configured" if changed is None else "No changed files to lint"
+        print(message)
         output = {
             "script": "lint_runner",
             "project": str(project_path),
             "type": project_info["type"],
             "checks": [],
             "passed": True,
-            "message": "No linters configured"
+            "message": message
         }
         print(json.dumps(output, indent=2))
         sys.exit(0)
@@ -135,6 +175,8 @@ def main():
     
     for linter in project_info["linters"]:
         print(f"\nRunning: {linter['name']}...")
+        if linter.get("note"):
+            print(f"  Note: {linter['note']}")
         result = run_linter(linter, project_path)
         results.append(result)
         
@@ -69,7 +69,11 @@ import sys
 import os
 import re
 import json
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import SCAN_CACHE_DIR, RuleSet, jobs_from_argv, run_scan, scope_from_argv  # noqa: E402
 
 class MobileAuditor:
     def __init__(self):
@@ -84,9 +88,11 @@ class MobileAuditor:
                 content = f.read()
         except:
             return
+        self.audit_content(os.path.basename(filepath), content)
 
+    def audit_content(self, filename: str, content: str) -> None:
+        """Audit the text of one file (filename is used in the messages)."""
         self.files_checked += 1
-        filename = os.path.basename(filepath)
 
         # Detect framework
         is_react_native = bool(re.search(r'react-native|@react-navigation|React\.Native', content))
@@ -610,13 +616,13 @@ class MobileAuditor:
             # This is more of a configuration check, not code pattern
             self.passed_count += 1  # Hermes is default in RN 0.70+
 
-    def audit_directory(self, directory: str) -> None:
-        extensions = {'.tsx', '.ts', '.jsx', '.js', '.dart'}
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if d not in {'node_modules', '.git', 'dist', 'build', '.next', 'ios', 'android', 'build', '.idea'}]
-            for file in files:
-                if Path(file).suffix in extensions:
-                    self.audit_file(os.path.join(root, file))
+    def audit_directory(self, directory: str, jobs: int = 1, cache: bool = True, only: list = None) -> None:
+        """
+        Audit every file under directory (only: just these relative paths).
+        cache: reuse unchanged files' findings from .agents/cache/scan/.
+        """
+        cache_dir = Path(directory) / SCAN_CACHE_DIR if cache else None
+        run_scan(directory, [MobileRules(directory, self)], jobs=jobs, cache_dir=cache_dir, only=only)
 
     def get_report(self):
         return {
@@ -628,9 +634,38 @@ class MobileAuditor:
         }
 
 
+class MobileRules(RuleSet):
+    """MobileAuditor as a scan-engine rule set (one fresh auditor per file, merged in walk order)."""
+
+    name = "mobile"
+    extensions = frozenset({'.tsx', '.ts', '.jsx', '.js', '.dart'})
+    skip_dirs = frozenset({'ios', 'android', '.idea'})
+
+    def __init__(self, root, auditor: "MobileAuditor" = None):
+        super().__init__(root)
+        self.auditor = auditor if auditor is not None else MobileAuditor()
+
+    def scan_file(self, rel_path: str, content: str) -> list:
+        auditor = MobileAuditor()
+        auditor.audit_content(PurePosixPath(rel_path).name, content)
+        return [auditor.files_checked, auditor.issues, auditor.warnings, auditor.passed_count]
+
+    def collect(self, rel_path: str, result: list) -> None:
+        files_checked, issues, warnings, passed_count = result
+        self.auditor.files_checked += files_checked
+        self.auditor.issues.extend(issues)
+        self.auditor.warnings.extend(warnings)
+        self.auditor.passed_count += passed_count
+
+    def report(self) -> dict:
+        report = self.auditor.get_report()
+        report["passed"] = report["compliant"]
+        return report
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python mobile_audit.py <directory>")
+        print("Usage: python mobile_audit.py <directory> [--json] [--jobs N] [--no-cache] [--changed-since REF | --staged]")
         sys.exit(1)
 
     path = sys.argv[1]
@@ -640,7 +675,8 @@ def main():
     if os.path.isfile(path):
         auditor.audit_file(path)
     else:
-        auditor.audit_directory(path)
+        auditor.audit_directory(path, jobs_from_argv(sys.argv), "--no-cache" not in sys.argv,
+                                scope_from_argv(sys.argv, path))
 
     report = auditor.get_report()
 
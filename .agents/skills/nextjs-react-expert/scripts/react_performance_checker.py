@@ -3,178 +3,155 @@
 React Performance Checker
 Automated performance audit for React/Next.js projects
 Based on Vercel Engineering best practices
+
+All checks run as one rule set of the shared scan engine
+(.agents/scripts/scan_engine.py), which reads each source file once and
+caches the per-file facts in .agents/cache/scan/.
+
+Usage: python react_performance_checker.py <project_path> [--jobs N] [--no-cache]
+                                           [--changed-since REF | --staged]
+With --changed-since/--staged only the touched files are reported; the rest
+of the project (from the cache) still counts for the cross-file checks.
 """
 
 import os
 import re
+import sys
 import json
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import List, Dict, Tuple
 
-class PerformanceChecker:
-    SOURCE_EXTENSIONS = ('*.ts', '*.tsx', '*.js', '*.jsx')
-    TSX_EXTENSIONS = ('*.ts', '*.tsx')
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import SCAN_CACHE_DIR, RuleSet, jobs_from_argv, run_scan, scope_from_argv  # noqa: E402
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+TSX_EXTENSIONS = ('.ts', '.tsx')
+
+
+class PerformanceRules(RuleSet):
+    """
+    The checks of PerformanceChecker as a scan-engine rule set.
+
+    scan_file() records per-file facts; the large-component check, which
+    compares files with each other, is resolved in report().
+    """
+
+    name = "react-performance"
+    extensions = frozenset(SOURCE_EXTENSIONS)
+    project_wide = True
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.files = []
+
+    def wants(self, rel_path: str) -> bool:
+        return PurePosixPath(rel_path).suffix in SOURCE_EXTENSIONS
+
+    def scan_file(self, rel_path: str, content: str) -> dict:
+        ext = PurePosixPath(rel_path).suffix
+        facts = {
+            # Section 1: multiple awaits in sequence without Promise.all
+            "waterfall": bool(re.search(r'await\s+\w+.*?\n\s*await\s+\w+', content)),
+            # Section 2: import from index files or barrel exports
+            "barrel": bool(re.search(r"import.*from\s+['\"](@/.*?)/index['\"]", content)
+                           or re.search(r"import.*from\s+['\"]\.\.?/.*?['\"](?!.*?\.tsx?)", content)),
+            # Section 6: <img> tags instead of next/image
+            "img": '<img' in content and 'next/image' not in content,
+        }
+        if ext in TSX_EXTENSIONS:
+            # Section 2: large components (> 10KB) should be loaded with dynamic()
+            facts["large"] = len(content) > 10000
+            facts["imports"] = sorted(set(re.findall(r'import (?:\{ )?(\S+)', content)))
+            facts["dynamic"] = 'dynamic(' in content
+            # Section 4: fetch in useEffect
+            facts["effect_fetch"] = 'useEffect' in content and bool(
+                re.search(r'useEffect.*?fetch\(', content, re.DOTALL))
+        if ext == '.tsx':
+            # Section 5: component definitions with props but without memo
+            components = re.findall(r'(?:export\s+)?(?:const|function)\s+([A-Z]\w+)', content)
+            facts["unmemoized"] = bool(
+                components and 'React.memo' not in content and 'memo(' not in content
+                and ('props:' in content or 'Props>' in content))
+        return facts
+
+    def collect(self, rel_path: str, result: dict) -> None:
+        self.files.append((rel_path, result))
+
+    def findings(self) -> Tuple[List[Dict], List[Dict]]:
+        """(issues, warnings) in check order, each check in walk order."""
+        issues = [self._finding(rel, 'CRITICAL', 'Sequential awaits detected (waterfall)',
+                                'Use Promise.all() for parallel fetching',
+                                '1-async-eliminating-waterfalls.md')
+                  for rel, facts in self.files if facts["waterfall"]]
+        warnings = [self._finding(rel, 'CRITICAL', 'Potential barrel imports detected',
+                                  'Import directly from specific files',
+                                  '2-bundle-bundle-size-optimization.md')
+                    for rel, facts in self.files if facts["barrel"]]
+
+        tsx = [(rel, facts) for rel, facts in self.files if "large" in facts]
+        for rel, facts in tsx:
+            if not facts["large"]:
+                continue
+            component = PurePosixPath(rel).stem
+            for check_rel, check in tsx:
+                if check_rel == rel or not any(n.startswith(component) for n in check["imports"]):
+                    continue
+                if not check["dynamic"]:
+                    warnings.append(self._finding(check_rel, 'CRITICAL',
+                                                  f'Large component {component} imported statically',
+                                                  'Use dynamic() for code splitting',
+                                                  '2-bundle-bundle-size-optimization.md'))
+                    break
+
+        warnings += [self._finding(rel, 'MEDIUM-HIGH', 'Data fetching in useEffect',
+                                   'Consider using SWR or React Query for deduplication',
+                                   '4-client-client-side-data-fetching.md')
+                     for rel, facts in tsx if facts["effect_fetch"]]
+        warnings += [self._finding(rel, 'MEDIUM', 'Component with props not memoized',
+                                   'Consider using React.memo if props are stable',
+                                   '5-rerender-re-render-optimization.md')
+                     for rel, facts in self.files if facts.get("unmemoized")]
+        warnings += [self._finding(rel, 'MEDIUM', 'Using <img> instead of next/image',
+                                   'Use next/image for automatic optimization',
+                                   '6-rendering-rendering-performance.md')
+                     for rel, facts in self.files if facts["img"]]
+        if self.scope is not None:
+            # Scoped scan: the other files were only context
+            issues = [f for f in issues if f['file'] in self.scope]
+            warnings = [f for f in warnings if f['file'] in self.scope]
+        return issues, warnings
+
+    @staticmethod
+    def _finding(rel_path, kind, issue, fix, section) -> Dict:
+        return {'file': rel_path, 'type': kind, 'issue': issue, 'fix': fix, 'section': section}
+
+    def report(self) -> dict:
+        issues, warnings = self.findings()
+        return {"files_checked": len(self.files), "issues": issues, "warnings": warnings,
+                "passed": not any(i['type'] == 'CRITICAL' for i in issues)}
+
 
-    def __init__(self, project_path: str):
+class PerformanceChecker:
+    def __init__(self, project_path: str, jobs: int = 1, cache: bool = True, only: List[str] = None):
         self.project_path = Path(project_path)
+        self.jobs = jobs
+        self.cache_dir = self.project_path / SCAN_CACHE_DIR if cache else None
+        self.only = only
         self.issues = []
         self.warnings = []
         self.passed = []
 
-    def _find_files(self, extensions=None):
-        """Find source files matching extensions, skipping node_modules."""
-        exts = extensions or self.SOURCE_EXTENSIONS
-        for ext in exts:
-            for filepath in self.project_path.rglob(ext):
-                if 'node_modules' not in str(filepath):
-                    yield filepath
+    def check_all(self):
+        """Run every check (Sections 1, 2, 4, 5 and 6) over a single walk."""
+        print("\n[*] Checking waterfalls, barrel and dynamic imports, useEffect fetching,")
+        print("    memoization and image optimization (single pass)...")
 
-    def check_waterfalls(self):
-        """Check for sequential await patterns (Section 1)"""
-        print("\n[*] Checking for waterfalls (sequential awaits)...")
-
-        for filepath in self._find_files():
-            if 'node_modules' in str(filepath):
-                continue
-
-            try:
-                content = filepath.read_text(encoding='utf-8')
-
-                # Pattern: multiple awaits in sequence without Promise.all
-                sequential_awaits = re.findall(r'await\s+\w+.*?\n\s*await\s+\w+', content)
-
-                if sequential_awaits:
-                    self.issues.append({
-                        'file': str(filepath.relative_to(self.project_path)),
-                        'type': 'CRITICAL',
-                        'issue': 'Sequential awaits detected (waterfall)',
-                        'fix': 'Use Promise.all() for parallel fetching',
-                        'section': '1-async-eliminating-waterfalls.md'
-                    })
-            except Exception as e:
-                continue
-
-    def check_barrel_imports(self):
-        """Check for barrel imports (Section 2)"""
-        print("[*] Checking for barrel imports...")
-
-        for filepath in self._find_files():
-            try:
-                content = filepath.read_text(encoding='utf-8')
-
-                # Pattern: import from index files or barrel exports
-                barrel_imports = re.findall(r"import.*from\s+['\"](@/.*?)/index['\"]", content)
-                barrel_imports += re.findall(r"import.*from\s+['\"]\.\.?/.*?['\"](?!.*?\.tsx?)", content)
-
-                if barrel_imports:
-                    self.warnings.append({
-                        'file': str(filepath.relative_to(self.project_path)),
-                        'type': 'CRITICAL',
-                        'issue': 'Potential barrel imports detected',
-                        'fix': 'Import directly from specific files',
-                        'section': '2-bundle-bundle-size-optimization.md'
-                    })
-            except Exception as e:
-                continue
-
-    def check_dynamic_imports(self):
-        """Check if large components use dynamic imports (Section 2)"""
-        print("[*] Checking for missing dynamic imports...")
-
-        for filepath in self._find_files(self.TSX_EXTENSIONS):
-            try:
-                content = filepath.read_text(encoding='utf-8')
-
-                # Check file size - if > 10KB, should probably use dynamic import
-                if len(content) > 10000:
-                    # Check if it's imported statically somewhere
-                    filename = filepath.stem
-
-                    # Search for static imports of this component
-                    for check_file in self._find_files(self.TSX_EXTENSIONS):
-                        if check_file == filepath or 'node_modules' in str(check_file):
-                            continue
-
-                        check_content = check_file.read_text(encoding='utf-8')
-                        if f"import {filename}" in check_content or f"import {{ {filename}" in check_content:
-                            if 'dynamic(' not in check_content:
-                                self.warnings.append({
-                                    'file': str(check_file.relative_to(self.project_path)),
-                                    'type': 'CRITICAL',
-                                    'issue': f'Large component {filename} imported statically',
-                                    'fix': 'Use dynamic() for code splitting',
-                                    'section': '2-bundle-bundle-size-optimization.md'
-                                })
-                                break
-            except Exception as e:
-                continue
-
-    def check_useEffect_fetching(self):
-        """Check for data fetching in useEffect (Section 4)"""
-        print("[*] Checking for useEffect data fetching...")
-
-        for filepath in self._find_files(self.TSX_EXTENSIONS):
-            try:
-                content = filepath.read_text(encoding='utf-8')
-
-                # Pattern: fetch or axios in useEffect
-                if 'useEffect' in content:
-                    if re.search(r'useEffect.*?fetch\(', content, re.DOTALL):
-                        self.warnings.append({
-                            'file': str(filepath.relative_to(self.project_path)),
-                            'type': 'MEDIUM-HIGH',
-                            'issue': 'Data fetching in useEffect',
-                            'fix': 'Consider using SWR or React Query for deduplication',
-                            'section': '4-client-client-side-data-fetching.md'
-                        })
-            except Exception as e:
-                continue
-
-    def check_missing_memoization(self):
-        """Check for missing React.memo, useMemo, useCallback (Section 5)"""
-        print("[*] Checking for missing memoization...")
-
-        for filepath in self._find_files(('*.tsx',)):
-
-            try:
-                content = filepath.read_text(encoding='utf-8')
-
-                # Check for component definitions without memo
-                components = re.findall(r'(?:export\s+)?(?:const|function)\s+([A-Z]\w+)', content)
-
-                if components and 'React.memo' not in content and 'memo(' not in content:
-                    # Check if component receives props
-                    if 'props:' in content or 'Props>' in content:
-                        self.warnings.append({
-                            'file': str(filepath.relative_to(self.project_path)),
-                            'type': 'MEDIUM',
-                            'issue': 'Component with props not memoized',
-                            'fix': 'Consider using React.memo if props are stable',
-                            'section': '5-rerender-re-render-optimization.md'
-                        })
-            except Exception as e:
-                continue
-
-    def check_image_optimization(self):
-        """Check for unoptimized images (Section 6)"""
-        print("[*] Checking for image optimization...")
-
-        for filepath in self._find_files():
-
-            try:
-                content = filepath.read_text(encoding='utf-8')
-
-                # Check for <img> tags instead of next/image
-                if '<img' in content and 'next/image' not in content:
-                    self.warnings.append({
-                        'file': str(filepath.relative_to(self.project_path)),
-                        'type': 'MEDIUM',
-                        'issue': 'Using <img> instead of next/image',
-                        'fix': 'Use next/image for automatic optimization',
-                        'section': '6-rendering-rendering-performance.md'
-                    })
-            except Exception as e:
-                continue
+        rules = PerformanceRules(self.project_path)
+        run_scan(self.project_path, [rules], jobs=self.jobs, cache_dir=self.cache_dir, only=self.only)
+        issues, warnings = rules.findings()
+        self.issues.extend(issues)
+        self.warnings.extend(warnings)
 
     def generate_report(self):
         """Generate final report"""
@@ -219,21 +196,15 @@ class PerformanceChecker:
         print("="*60)
         print(f"Scanning: {self.project_path}")
 
-        self.check_waterfalls()
-        self.check_barrel_imports()
-        self.check_dynamic_imports()
-        self.check_useEffect_fetching()
-        self.check_missing_memoization()
-        self.check_image_optimization()
+        self.check_all()
 
         self.generate_report()
 
 
 def main():
-    import sys
-
     if len(sys.argv) < 2:
-        print("Usage: python react_performance_checker.py <project_path>")
+        print("Usage: python react_performance_checker.py <project_path> [--jobs N] [--no-cache] "
+              "[--changed-since REF | --staged]")
         sys.exit(1)
 
     project_path = sys.argv[1]
@@ -242,7 +213,8 @@ def main():
         print(f"[ERROR] Path not found: {project_path}")
         sys.exit(1)
 
-    checker = PerformanceChecker(project_path)
+    checker = PerformanceChecker(project_path, jobs_from_argv(sys.argv), "--no-cache" not in sys.argv,
+                                 scope_from_argv(sys.argv, project_path))
     checker.run()
 
 
@@ -14,15 +14,22 @@ WHAT IT CHECKS:
     - JSX/TSX files (React page components)
     - Only files that are likely PUBLIC pages
 
+Pages are found and read by the shared scan engine
+(.agents/scripts/scan_engine.py), as the "seo" rule set.
+
 Usage:
-    python seo_checker.py <project_path>
+    python seo_checker.py <project_path> [--changed-since REF | --staged]
 """
 import sys
 import json
 import re
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from datetime import datetime
 
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import RuleSet, run_scan, scope_from_argv  # noqa: E402
+
 # Fix Windows console encoding
 try:
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -44,6 +51,8 @@ SKIP_PATTERNS = [
     '.test.', '.spec.', '_test.', '_spec.'
 ]
 
+MAX_PAGES = 50
+
 
 def is_page_file(file_path: Path) -> bool:
     """Check if this file is likely a public-facing page."""
@@ -75,32 +84,56 @@ def is_page_file(file_path: Path) -> bool:
     return False
 
 
-def find_pages(project_path: Path) -> list:
-    """Find page files to check."""
-    patterns = ['**/*.html', '**/*.htm', '**/*.jsx', '**/*.tsx']
-    
-    files = []
-    for pattern in patterns:
-        for f in project_path.glob(pattern):
-            # Skip excluded directories
-            if any(skip in f.parts for skip in SKIP_DIRS):
-                continue
-            
-            # Check if it's likely a page
-            if is_page_file(f):
-                files.append(f)
-    
-    return files[:50]  # Limit to 50 files
+class SEORules(RuleSet):
+    """SEO page checks as a scan-engine rule set (first MAX_PAGES pages in walk order)."""
+
+    name = "seo"
+    extensions = frozenset({'.html', '.htm', '.jsx', '.tsx'})
+    skip_dirs = frozenset(SKIP_DIRS)
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.wanted = 0
+        self.results = []
+
+    def wants(self, rel_path: str) -> bool:
+        if self.wanted >= MAX_PAGES or not super().wants(rel_path):
+            return False
+        if not is_page_file(PurePosixPath(rel_path)):
+            return False
+        self.wanted += 1
+        return True
+
+    def scan_file(self, rel_path: str, content: str) -> dict:
+        return check_page_content(PurePosixPath(rel_path).name, content)
+
+    def collect(self, rel_path: str, result: dict) -> None:
+        self.results.append(result)
+
+    def report(self) -> dict:
+        with_issues = [r for r in self.results if r["issues"]]
+        total_issues = sum(len(r["issues"]) for r in with_issues)
+        return {
+            "files_checked": len(self.results),
+            "files_with_issues": len(with_issues),
+            "issues_found": total_issues,
+            "pages": self.results,
+            "passed": total_issues == 0
+        }
 
 
 def check_page(file_path: Path) -> dict:
     """Check a single page for SEO issues."""
-    issues = []
-    
     try:
         content = file_path.read_text(encoding='utf-8', errors='ignore')
     except Exception as e:
         return {"file": str(file_path.name), "issues": [f"Error: {e}"]}
+    return check_page_content(file_path.name, content)
+
+
+def check_page_content(name: str, content: str) -> dict:
+    """Check the text of a page for SEO issues."""
+    issues = []
     
     # Detect if this is a layout/template file (has Head component)
     is_layout = 'Head>' in content or '<head' in content.lower()
@@ -140,7 +173,7 @@ def check_page(file_path: Path) -> dict:
     # has_canonical = 'rel="canonical"' in content.lower()
     
     return {
-        "file": str(file_path.name),
+        "file": name,
         "issues": issues
     }
 
@@ -155,8 +188,10 @@ def main():
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-"*60)
     
-    # Find pages
-    pages = find_pages(project_path)
+    # Find and check pages in one walk
+    rules = SEORules(project_path)
+    run_scan(project_path, [rules], only=scope_from_argv(sys.argv, project_path))
+    pages = rules.results
     
     if not pages:
         print("\n[!] No page files found.")
@@ -167,12 +202,7 @@ def main():
     
     print(f"Found {len(pages)} page files to analyze\n")
     
-    # Check each page
-    all_issues = []
-    for f in pages:
-        result = check_page(f)
-        if result["issues"]:
-            all_issues.append(result)
+    all_issues = [result for result in pages if result["issues"]]
     
     # Summary
     print("=" * 60)
@@ -3,7 +3,8 @@
 Skill: vulnerability-scanner
 Script: security_scan.py
 Purpose: Validate that security principles from SKILL.md are applied correctly
-Usage: python security_scan.py <project_path> [--scan-type all|deps|secrets|patterns|config]
+Usage: python security_scan.py <project_path> [--scan-type all|deps|secrets|patterns|config] [--jobs N] [--no-cache]
+                        [--changed-since REF | --staged]
 Output: JSON with validation findings
 
 This script verifies:
@@ -11,6 +12,17 @@ This script verifies:
 2. Secrets - No hardcoded credentials (OWASP A04)
 3. Code Patterns - Dangerous patterns identified (OWASP A05)
 4. Configuration - Security settings validated (OWASP A02)
+
+Secrets, code patterns and configuration are one rule set (SecurityRules) of
+the shared scan engine (.agents/scripts/scan_engine.py): the tree is walked
+and each file read once for all three. run_full_scan() keeps the per-file
+findings in .agents/cache/scan/, so unchanged files are not rescanned.
+--changed-since/--staged restrict the scan to the files touched in git; the
+dependency scan then only runs when a manifest or lock file changed.
+
+Secret and dangerous-code patterns are prefiltered: one combined regex finds
+the literal keywords the patterns require, and a pattern only runs on the
+files (secrets) or lines (code patterns) that contain one of its keywords.
 """
 import subprocess
 import json
@@ -18,10 +30,15 @@ import os
 import sys
 import re
 import argparse
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+# Shared single-walk scanner (.agents/scripts/scan_engine.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+from scan_engine import SCAN_CACHE_DIR, RuleSet, changed_paths, run_scan  # noqa: E402
+
 # Fix Windows console encoding for Unicode output
 try:
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -85,9 +102,61 @@ DANGEROUS_PATTERNS = [
     (r'yaml\.load\s*\([^)]*\)(?!\s*,\s*Loader)', "Unsafe YAML load", "high", "Deserialization risk"),
 ]
 
-SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '__pycache__', '.venv', 'venv', '.next'}
+CONFIG_ISSUES = [
+    (r'"DEBUG"\s*:\s*true', "Debug mode enabled", "high"),
+    (r'debug\s*=\s*True', "Debug mode enabled", "high"),
+    (r'NODE_ENV.*development', "Development mode in config", "medium"),
+    (r'"CORS_ALLOW_ALL".*true', "CORS allow all origins", "high"),
+    (r'"Access-Control-Allow-Origin".*\*', "CORS wildcard", "high"),
+    (r'allowCredentials.*true.*origin.*\*', "Dangerous CORS combo", "critical"),
+]
+
 CODE_EXTENSIONS = {'.js', '.ts', '.jsx', '.tsx', '.py', '.go', '.java', '.rb', '.php'}
 CONFIG_EXTENSIONS = {'.json', '.yaml', '.yml', '.toml', '.env', '.env.local', '.env.development'}
+CONFIG_FILES = {'next.config.js', 'webpack.config.js', '.eslintrc.js'}
+
+WALK_SCANS = ("secrets", "patterns", "config")
+# Root files read by scan_dependencies (a scoped scan skips it unless one changed)
+DEPENDENCY_FILES = {'package.json', 'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock',
+                    'pnpm-lock.yaml', 'setup.py', 'requirements.txt', 'Pipfile.lock', 'poetry.lock'}
+
+# Prefilter: lower-case literals that every match of a pattern contains.
+# A pattern can only match where one of its keywords occurs, so it is skipped
+# elsewhere. No keyword may be a prefix of another (see _TRIGGER_RE).
+SECRET_TRIGGERS = {
+    "API Key": ("api",),
+    "Token": ("token",),
+    "Bearer Token": ("bearer",),
+    "AWS Access Key": ("akia",),
+    "AWS Secret": ("aws",),
+    "Azure Credential": ("azure",),
+    "GCP Credential": ("google",),
+    "Password": ("password",),
+    "Database Connection String": ("://",),
+    "Private Key": ("-----begin",),
+    "SSH Key": ("ssh-rsa",),
+    "JWT Token": ("eyj",),
+}
+
+SQL_KEYWORDS = ("select", "insert", "update", "delete")
+
+DANGEROUS_TRIGGERS = {
+    "eval() usage": ("eval",),
+    "exec() usage": ("exec",),
+    "Function constructor": ("function",),
+    "child_process.exec": ("child_process",),
+    "subprocess with shell=True": ("subprocess",),
+    "dangerouslySetInnerHTML": ("dangerouslysetinnerhtml",),
+    "innerHTML assignment": (".innerhtml",),
+    "document.write": ("document.write",),
+    "SQL String Concat": SQL_KEYWORDS,
+    "SQL f-string": SQL_KEYWORDS,
+    "SSL Verify Disabled": ("verify",),
+    "Insecure flag": ("--insecure",),
+    "SSL Disabled": ("disable",),
+    "pickle usage": ("pickle",),
+    "Unsafe YAML load": ("yaml",),
+}
 
 
 # ============================================================================
@@ -178,48 +247,220 @@ def scan_dependencies(project_path: str) -> Dict[str, Any]:
     return results
 
 
-def scan_secrets(project_path: str) -> Dict[str, Any]:
+def _keyword_index(triggers: Dict[str, tuple], names: List[str]) -> Dict[str, List[int]]:
+    """keyword -> indexes of the patterns (in table order) that require it."""
+    index = {}
+    for i, name in enumerate(names):
+        for keyword in triggers[name]:
+            index.setdefault(keyword, []).append(i)
+    return index
+
+
+_SECRET_RES = [re.compile(p, re.IGNORECASE) for p, _, _ in SECRET_PATTERNS]
+_DANGEROUS_RES = [re.compile(p, re.IGNORECASE) for p, _, _, _ in DANGEROUS_PATTERNS]
+_SECRET_KEYWORDS = _keyword_index(SECRET_TRIGGERS, [name for _, name, _ in SECRET_PATTERNS])
+_DANGEROUS_KEYWORDS = _keyword_index(DANGEROUS_TRIGGERS, [name for _, name, _, _ in DANGEROUS_PATTERNS])
+
+
+def _trie_regex(words) -> str:
+    """Alternation of words factored as a trie (a(?:pi|ws)|...), so each
+    position is tested against one branch per first character instead of
+    against every word."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(trie)
+
+
+# All keywords in one regex. The lookahead reports every position a keyword
+# starts at, so keywords that overlap in the text are all found in a single
+# pass. ASCII text is lower-cased and scanned case-sensitively (much faster);
+# other text keeps IGNORECASE, whose case folding lower() does not match.
+_KEYWORDS = set(_SECRET_KEYWORDS) | set(_DANGEROUS_KEYWORDS)
+_KEYWORDS_PATTERN = "(?=(" + _trie_regex(_KEYWORDS) + "))"
+_TRIGGER_RE = re.compile(_KEYWORDS_PATTERN)
+_TRIGGER_RE_FOLDED = re.compile(_KEYWORDS_PATTERN, re.IGNORECASE)
+
+
+def _keyword_of(text: str) -> str:
+    """Keyword matched by text under IGNORECASE (e.g. the long s in "paſsword")."""
+    keyword = text.lower()
+    if keyword in _KEYWORDS:
+        return keyword
+    return next(k for k in _KEYWORDS if re.fullmatch(re.escape(k), text, re.IGNORECASE))
+
+
+def _keyword_hits(content: str) -> List[tuple]:
+    """(position, lower-case keyword) of every prefilter keyword in the text."""
+    if content.isascii():
+        return [(m.start(), m.group(1)) for m in _TRIGGER_RE.finditer(content.lower())]
+    return [(m.start(), _keyword_of(m.group(1))) for m in _TRIGGER_RE_FOLDED.finditer(content)]
+
+
+def _secrets_in(content: str, hits: List[tuple] = None) -> List[list]:
+    """[type, severity, count] of each secret pattern found in a file."""
+    if hits is None:
+        hits = _keyword_hits(content)
+    candidates = sorted({i for _, k in hits for i in _SECRET_KEYWORDS.get(k, ())})
+    found = []
+    for i in candidates:
+        matches = _SECRET_RES[i].findall(content)
+        if matches:
+            _, secret_type, severity = SECRET_PATTERNS[i]
+            found.append([secret_type, severity, len(matches)])
+    return found
+
+
+def _patterns_in(content: str, hits: List[tuple] = None) -> List[list]:
+    """[line, pattern, severity, category, snippet] of each dangerous pattern hit."""
+    if hits is None:
+        hits = _keyword_hits(content)
+    hits = [(pos, k) for pos, k in hits if k in _DANGEROUS_KEYWORDS]
+    if not hits:
+        return []
+
+    # Newline offset table: a position's line is 1 + the newlines before it
+    newlines = [m.start() for m in re.finditer("\n", content)]
+    by_line = {}
+    for pos, keyword in hits:
+        by_line.setdefault(bisect_right(newlines, pos) + 1, set()).update(_DANGEROUS_KEYWORDS[keyword])
+
+    lines = content.split("\n")
+    found = []
+    for line_num in sorted(by_line):
+        line = lines[line_num - 1]
+        for i in sorted(by_line[line_num]):
+            if _DANGEROUS_RES[i].search(line):
+                _, name, severity, category = DANGEROUS_PATTERNS[i]
+                found.append([line_num, name, severity, category, line.strip()[:80]])
+    return found
+
+
+def _config_issues_in(content: str) -> List[list]:
+    """[issue, severity] of each configuration issue found in a file."""
+    return [[issue, severity] for pattern, issue, severity in CONFIG_ISSUES
+            if re.search(pattern, content, re.IGNORECASE)]
+
+
+class SecurityRules(RuleSet):
     """
-    Validate no hardcoded secrets (OWASP A04).
-    Checks: API keys, tokens, passwords, cloud credentials.
+    Secrets (OWASP A04), dangerous code patterns (OWASP A05) and configuration
+    (OWASP A02) checks as one scan-engine rule set.
     """
-    results = {
-        "tool": "secret_scanner",
-        "findings": [],
-        "status": "[OK] No secrets detected",
-        "scanned_files": 0,
-        "by_severity": {"critical": 0, "high": 0, "medium": 0}
-    }
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CODE_EXTENSIONS and ext not in CONFIG_EXTENSIONS:
-                continue
-                
-            filepath = Path(root) / file
-            results["scanned_files"] += 1
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                    for pattern, secret_type, severity in SECRET_PATTERNS:
-                        matches = re.findall(pattern, content, re.IGNORECASE)
-                        if matches:
-                            results["findings"].append({
-                                "file": str(filepath.relative_to(project_path)),
-                                "type": secret_type,
-                                "severity": severity,
-                                "count": len(matches)
-                            })
-                            results["by_severity"][severity] += len(matches)
-                            
-            except Exception:
-                pass
-    
+
+    name = "security"
+
+    def __init__(self, root, scans=WALK_SCANS):
+        super().__init__(root)
+        self.scans = set(scans)
+        self.secrets = {
+            "tool": "secret_scanner",
+            "findings": [],
+            "status": "[OK] No secrets detected",
+            "scanned_files": 0,
+            "by_severity": {"critical": 0, "high": 0, "medium": 0}
+        }
+        self.patterns = {
+            "tool": "pattern_scanner",
+            "findings": [],
+            "status": "[OK] No dangerous patterns",
+            "scanned_files": 0,
+            "by_category": {}
+        }
+        self.config = {
+            "tool": "config_scanner",
+            "findings": [],
+            "status": "[OK] Configuration secure",
+            "checks": {}
+        }
+
+    def _applies(self, rel_path: str) -> set:
+        name = Path(rel_path).name
+        ext = Path(name).suffix.lower()
+        applies = set()
+        if ext in CODE_EXTENSIONS or ext in CONFIG_EXTENSIONS:
+            applies.add("secrets")
+        if ext in CODE_EXTENSIONS:
+            applies.add("patterns")
+        if ext in CONFIG_EXTENSIONS or name in CONFIG_FILES:
+            applies.add("config")
+        return applies & self.scans
+
+    def cache_key(self) -> str:
+        return f"{super().cache_key()}:{','.join(sorted(self.scans))}"
+
+    def wants(self, rel_path: str) -> bool:
+        return bool(self._applies(rel_path))
+
+    def scan_file(self, rel_path: str, content: str) -> dict:
+        applies = self._applies(rel_path)
+        hits = _keyword_hits(content) if applies & {"secrets", "patterns"} else []
+        found = {}
+        if "secrets" in applies:
+            found["secrets"] = _secrets_in(content, hits)
+        if "patterns" in applies:
+            found["patterns"] = _patterns_in(content, hits)
+        if "config" in applies:
+            found["config"] = _config_issues_in(content)
+        return found
+
+    def collect(self, rel_path: str, result: dict) -> None:
+        if "secrets" in result:
+            self.secrets["scanned_files"] += 1
+            for secret_type, severity, count in result["secrets"]:
+                self.secrets["findings"].append({
+                    "file": rel_path,
+                    "type": secret_type,
+                    "severity": severity,
+                    "count": count
+                })
+                self.secrets["by_severity"][severity] += count
+        if "patterns" in result:
+            self.patterns["scanned_files"] += 1
+            for line_num, name, severity, category, snippet in result["patterns"]:
+                self.patterns["findings"].append({
+                    "file": rel_path,
+                    "line": line_num,
+                    "pattern": name,
+                    "severity": severity,
+                    "category": category,
+                    "snippet": snippet
+                })
+                self.patterns["by_category"][category] = self.patterns["by_category"].get(category, 0) + 1
+        for issue, severity in result.get("config", []):
+            self.config["findings"].append({
+                "file": rel_path,
+                "issue": issue,
+                "severity": severity
+            })
+
+    def report(self) -> dict:
+        reports = {}
+        if "secrets" in self.scans:
+            reports["secrets"] = _finish_secrets(self.secrets)
+        if "patterns" in self.scans:
+            reports["patterns"] = _finish_patterns(self.patterns)
+        if "config" in self.scans:
+            reports["config"] = _finish_configuration(self.config, self.root)
+        reports["passed"] = not any(
+            f.get("severity") in ("critical", "high")
+            for key in self.scans for f in reports[key]["findings"]
+        )
+        return reports
+
+
+def _finish_secrets(results: Dict[str, Any]) -> Dict[str, Any]:
     if results["by_severity"]["critical"] > 0:
         results["status"] = "[!!] CRITICAL: Secrets exposed!"
     elif results["by_severity"]["high"] > 0:
@@ -233,50 +474,7 @@ def scan_secrets(project_path: str) -> Dict[str, Any]:
     return results
 
 
-def scan_code_patterns(project_path: str) -> Dict[str, Any]:
-    """
-    Validate dangerous code patterns (OWASP A05).
-    Checks: Injection risks, XSS, unsafe deserialization.
-    """
-    results = {
-        "tool": "pattern_scanner",
-        "findings": [],
-        "status": "[OK] No dangerous patterns",
-        "scanned_files": 0,
-        "by_category": {}
-    }
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CODE_EXTENSIONS:
-                continue
-                
-            filepath = Path(root) / file
-            results["scanned_files"] += 1
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    
-                    for line_num, line in enumerate(lines, 1):
-                        for pattern, name, severity, category in DANGEROUS_PATTERNS:
-                            if re.search(pattern, line, re.IGNORECASE):
-                                results["findings"].append({
-                                    "file": str(filepath.relative_to(project_path)),
-                                    "line": line_num,
-                                    "pattern": name,
-                                    "severity": severity,
-                                    "category": category,
-                                    "snippet": line.strip()[:80]
-                                })
-                                results["by_category"][category] = results["by_category"].get(category, 0) + 1
-                                
-            except Exception:
-                pass
-    
+def _finish_patterns(results: Dict[str, Any]) -> Dict[str, Any]:
     critical_count = sum(1 for f in results["findings"] if f["severity"] == "critical")
     high_count = sum(1 for f in results["findings"] if f["severity"] == "high")
     
@@ -293,53 +491,7 @@ def scan_code_patterns(project_path: str) -> Dict[str, Any]:
     return results
 
 
-def scan_configuration(project_path: str) -> Dict[str, Any]:
-    """
-    Validate security configuration (OWASP A02).
-    Checks: Security headers, CORS, debug modes.
-    """
-    results = {
-        "tool": "config_scanner",
-        "findings": [],
-        "status": "[OK] Configuration secure",
-        "checks": {}
-    }
-    
-    # Check common config files for issues
-    config_issues = [
-        (r'"DEBUG"\s*:\s*true', "Debug mode enabled", "high"),
-        (r'debug\s*=\s*True', "Debug mode enabled", "high"),
-        (r'NODE_ENV.*development', "Development mode in config", "medium"),
-        (r'"CORS_ALLOW_ALL".*true', "CORS allow all origins", "high"),
-        (r'"Access-Control-Allow-Origin".*\*', "CORS wildcard", "high"),
-        (r'allowCredentials.*true.*origin.*\*', "Dangerous CORS combo", "critical"),
-    ]
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CONFIG_EXTENSIONS and file not in ['next.config.js', 'webpack.config.js', '.eslintrc.js']:
-                continue
-                
-            filepath = Path(root) / file
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                    for pattern, issue, severity in config_issues:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            results["findings"].append({
-                                "file": str(filepath.relative_to(project_path)),
-                                "issue": issue,
-                                "severity": severity
-                            })
-                            
-            except Exception:
-                pass
-    
+def _finish_configuration(results: Dict[str, Any], project_path: Path) -> Dict[str, Any]:
     # Check for security header configurations
     header_files = ["next.config.js", "next.config.mjs", "middleware.ts", "nginx.conf"]
     for hf in header_files:
@@ -365,12 +517,50 @@ def scan_configuration(project_path: str) -> Dict[str, Any]:
     return results
 
 
+def scan_walk(project_path: str, scans=WALK_SCANS, jobs: int = 1, cache: bool = False,
+              only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the file-walking scans (secrets, patterns, config) in one pass (only: these files)."""
+    rules = SecurityRules(project_path, scans)
+    cache_dir = Path(project_path) / SCAN_CACHE_DIR if cache else None
+    run_scan(project_path, [rules], jobs=jobs, cache_dir=cache_dir, only=only)
+    return rules.report()
+
+
+def scan_secrets(project_path: str) -> Dict[str, Any]:
+    """
+    Validate no hardcoded secrets (OWASP A04).
+    Checks: API keys, tokens, passwords, cloud credentials.
+    """
+    return scan_walk(project_path, ("secrets",))["secrets"]
+
+
+def scan_code_patterns(project_path: str) -> Dict[str, Any]:
+    """
+    Validate dangerous code patterns (OWASP A05).
+    Checks: Injection risks, XSS, unsafe deserialization.
+    """
+    return scan_walk(project_path, ("patterns",))["patterns"]
+
+
+def scan_configuration(project_path: str) -> Dict[str, Any]:
+    """
+    Validate security configuration (OWASP A02).
+    Checks: Security headers, CORS, debug modes.
+    """
+    return scan_walk(project_path, ("config",))["config"]
+
+
 # ============================================================================
 #  MAIN
 # ============================================================================
 
-def run_full_scan(project_path: str, scan_type: str = "all") -> Dict[str, Any]:
-    """Execute security validation scans."""
+def run_full_scan(project_path: str, scan_type: str = "all", jobs: int = 1,
+                  cache: bool = True, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Execute security validation scans.
+    jobs: worker processes for the file walk; cache: reuse unchanged files' findings;
+    only: scan just these files (relative paths, see scan_engine.changed_paths).
+    """
     
     report = {
         "project": project_path,
@@ -392,9 +582,18 @@ def run_full_scan(project_path: str, scan_type: str = "all") -> Dict[str, Any]:
         "config": ("configuration", scan_configuration),
     }
     
+    if only is not None:
+        report["changed_files"] = len(only)
+        if not DEPENDENCY_FILES.intersection(only):
+            scanners.pop("deps")  # Dependencies untouched
+    
+    # secrets, patterns and config share a single walk of the tree
+    walked = [key for key in WALK_SCANS if scan_type in ("all", key)]
+    walk_results = scan_walk(project_path, walked, jobs, cache, only) if walked else {}
+    
     for key, (name, scanner) in scanners.items():
         if scan_type == "all" or scan_type == key:
-            result = scanner(project_path)
+            result = walk_results[key] if key in walk_results else scanner(project_path)
             report["scans"][name] = result
             
             findings_count = len(result.get("findings", []))
@@ -427,6 +626,13 @@ def main():
                         default="all", help="Type of scan to run")
     parser.add_argument("--output", choices=["json", "summary"], default="json",
                         help="Output format")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for the file scans (0: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rescan every file instead of reusing .agents/cache/scan/")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Only scan files changed since a git ref (plus untracked files)")
+    parser.add_argument("--staged", action="store_true", help="Only scan files staged for commit")
     
     args = parser.parse_args()
     
@@ -434,7 +640,13 @@ def main():
         print(json.dumps({"error": f"Directory not found: {args.project_path}"}))
         sys.exit(1)
     
-    result = run_full_scan(args.project_path, args.scan_type)
+    try:
+        scope = changed_paths(args.project_path, args.changed_since, args.staged)
+    except RuntimeError as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
+    
+    result = run_full_scan(args.project_path, args.scan_type, args.jobs, not args.no_cache, scope)
     
     if args.output == "summary":
         print(f"\n{'='*60}")
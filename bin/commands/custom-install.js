@@ -263,6 +263,9 @@ async function run() {
 
   // 7. Update .gitignore
   ensureGitignore(targetDir, '.agents/locks/');
+  ensureGitignore(targetDir, '.agents/cache/');
+  ensureGitignore(targetDir, '.agents/logs/');
+  ensureGitignore(targetDir, 'docs/08-Logs-Sessoes/.sessions/');
   ensureGitignore(targetDir, '.agents/.session_state.json');
   ensureGitignore(targetDir, '.agents.bak/');
   ensureGitignore(targetDir, '.gemini/mcp.json');
@@ -239,6 +239,144 @@ class TestPlatformCompat:
         result = get_agent_root()
         assert isinstance(result, Path)
 
+    def test_log_sessions_parsed_in_one_pass(self, tmp_path):
+        """parse_log_file() and metrics.parse_session_log() share one tokenizer."""
+        from platform_compat import parse_log_file
+        from metrics import parse_session_log
+
+        log = tmp_path / "2026-02-06.md"
+        log.write_text(
+            "# LOG DIÁRIO — 2026-02-06\n\n- Projeto: demo\n\n## Sessões\n\n"
+            "1. 09:00 — 10:30 (01:30) [🔵 claude_code]\n   - Atividades:\n     - Story 1.1 setup\n     - \n\n"
+            "2. 11:00 — 11:05 (00:05)\n   - Atividades:\n     - Story 1.2 auth\n",
+            encoding="utf-8",
+        )
+
+        sessions = parse_log_file(log)
+        assert [(s.start, s.duration_minutes, s.agent_source) for s in sessions] == [
+            ("09:00", 90, "claude_code"), ("11:00", 5, "unknown"),
+        ]
+        assert sessions[0].project == "demo"
+        assert sessions[0].activities == ["Atividades:", "Story 1.1 setup"]
+        assert sessions[1].activities == ["Story 1.2 auth"]  # untagged header eats the first indent
+
+        records = parse_session_log(log)
+        assert [r["agent"] for r in records] == ["claude_code", "antigravity"]
+        assert [r["activities"] for r in records] == [s.activities for s in sessions]
+
+    def test_daily_log_discovery_is_date_pruned(self, tmp_path):
+        """iter_daily_logs() yields in-range logs in date order, probing or listing only overlapping years."""
+        from datetime import date
+        from platform_compat import iter_daily_logs
+
+        for name in ("2024/2024-12-31.md", "2025/2025-01-01.md", "2025/2025-03-10.md",
+                     "2025/2025-01-02_Auditoria.md", "2025/notes.md", "archive/2025-01-03.md"):
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text("# LOG\n", encoding="utf-8")
+        (tmp_path / "2023").write_text("not a directory", encoding="utf-8")
+
+        short = [d.isoformat() for d, _ in iter_daily_logs(tmp_path, date(2024, 12, 30), date(2025, 1, 5))]
+        assert short == ["2024-12-31", "2025-01-01"]
+
+        long = [(d.isoformat(), p.name) for d, p in iter_daily_logs(tmp_path, date(2025, 1, 1), date(2025, 12, 31))]
+        assert long == [("2025-01-01", "2025-01-01.md"), ("2025-03-10", "2025-03-10.md")]
+
+        assert len(list(iter_daily_logs(tmp_path))) == 3
+        assert list(iter_daily_logs(tmp_path, date(2025, 2, 1), date(2025, 1, 1))) == []
+
+    def test_session_store_mirrors_daily_logs(self, tmp_path):
+        """SessionStore serves the same sessions as the markdown and re-syncs edited logs."""
+        import os
+        from datetime import date
+        from platform_compat import parse_log_file
+        from session_store import SessionStore
+
+        logs = tmp_path / "logs"
+        (logs / "2026").mkdir(parents=True)
+        day = logs / "2026" / "2026-02-06.md"
+        day.write_text(
+            "# LOG DIÁRIO — 2026-02-06\n- Projeto: demo\n\n"
+            "1. 09:00 — 10:00 (01:00) [🔵 codex]\n   - Atividades:\n     - Story 1.1\n",
+            encoding="utf-8",
+        )
+        os.utime(day, ns=(1, 1))
+        (logs / "2026" / "2026-02-06_Auditoria.md").write_text("# LOG DIÁRIO — 2026-02-06\n", encoding="utf-8")
+
+        store = SessionStore(logs)
+        assert store.rebuild() == 1
+        assert store.query(date(2026, 2, 1), date(2026, 2, 28)) == parse_log_file(day)
+        assert store.query(date(2026, 3, 1), date(2026, 3, 31)) == []
+
+        day.write_text(day.read_text(encoding="utf-8") + "\n2. 11:00 — 11:30 (00:30) [🔵 claude_code]\n", encoding="utf-8")
+        records = SessionStore(logs).query_records(date(2026, 2, 6), date(2026, 2, 6))
+        assert [(r["start"], r["agent"]) for r in records] == [("09:00", "codex"), ("11:00", "claude_code")]
+
+        day.unlink()
+        assert SessionStore(logs).query(date(2026, 2, 1), date(2026, 2, 28)) == []
+
+    def test_metrics_rollups_match_raw_sessions(self, tmp_path, monkeypatch):
+        """collect_metrics() from daily rollups equals a single-pass rollup of the raw sessions; unchanged days are not recomputed."""
+        import os
+        from datetime import date, timedelta
+        import metrics
+
+        monkeypatch.chdir(tmp_path)
+        logs = tmp_path / "docs" / "08-Logs-Sessoes"
+        for offset, agent in ((1, "codex"), (2, "claude_code")):
+            day = (date.today() - timedelta(days=offset)).isoformat()
+            (logs / day[:4]).mkdir(parents=True, exist_ok=True)
+            log = logs / day[:4] / f"{day}.md"
+            log.write_text(
+                f"# LOG DIÁRIO — {day}\n\n"
+                f"1. 09:00 — 10:30 (01:30) [🔵 {agent}]\n   - Atividades:\n     - Story {offset}.1 concluída\n\n"
+                f"2. 14:00 — 14:45 (00:45) [🔵 {agent}]\n   - Atividades:\n     - Story 3.{offset} em andamento\n",
+                encoding="utf-8",
+            )
+            os.utime(log, ns=(1, 1))
+
+        sessions = metrics.get_sessions_in_range(7)
+        single = metrics.merge_rollups([metrics.compute_day_rollup(sessions)])
+        result = metrics.collect_metrics(7)
+        assert result["time_metrics"]["time_per_epic"] == metrics.calculate_time_per_epic(sessions)
+        assert result["focus_score"] == metrics.calculate_focus_score(single)
+        assert result["session_patterns"] == metrics.analyze_session_patterns(single)
+        assert result["agent_distribution"] == metrics.calculate_agent_distribution(single)
+        assert result["session_patterns"]["avg_session_duration_minutes"] == 67.5
+        assert result["session_patterns"]["most_common_start_hour"] == 9
+        assert result["agent_distribution"]["codex"] == {"sessions": 2, "minutes": 135, "percentage": 50.0}
+
+        def _fail(_sessions):
+            raise AssertionError("unchanged day recomputed")
+
+        monkeypatch.setattr(metrics, "compute_day_rollup", _fail)
+        assert metrics.collect_metrics(7)["period"] == result["period"]
+
+    def test_frontmatter_reader_is_bounded_and_cached(self, tmp_path, monkeypatch):
+        import os
+        from platform_compat import (
+            load_story_frontmatters, parse_story_frontmatter, read_frontmatter_block,
+        )
+
+        monkeypatch.chdir(tmp_path)
+        stories = tmp_path / "docs" / "stories"
+        stories.mkdir(parents=True)
+        story = stories / "STORY-1-1_setup.md"
+        header = '---\nstory: "1.1"\nstatus: pending\nunlocks: ["1.2"]\n---\n'
+        story.write_text(header + "## Agent Workspace\n" + "x" * 100_000, encoding="utf-8")
+        (stories / "STORY-1-2_auth.md").write_text('---\nstory: "1.2"\nstatus: pending\n---\n', encoding="utf-8")
+
+        assert len(read_frontmatter_block(story)) < 10_000
+        assert parse_story_frontmatter(story) == {"story": "1.1", "status": "pending", "unlocks": ["1.2"]}
+
+        story.write_text(header.replace("pending", "done"), encoding="utf-8")
+        os.utime(story, ns=(1, 1))  # Different mtime -> cache miss
+        assert parse_story_frontmatter(story)["status"] == "done"
+
+        loaded = load_story_frontmatters(max_workers=4)
+        assert sorted(loaded) == ["1.1", "1.2"]
+        assert loaded["1.1"][1]["status"] == "done"
+        assert load_story_frontmatters(max_workers=1) == loaded
+
 
 # ===========================================================================
 # 6. Generated web data
@@ -356,3 +494,1021 @@ class TestGeneratedData:
         except json.JSONDecodeError as exc:
             pytest.fail(f"{filename} contains invalid JSON: {exc}")
         assert data, f"{filename} is empty"
+
+
+# ===========================================================================
+# 8. Backlog index
+# ===========================================================================
+
+SAMPLE_BACKLOG = """# Backlog
+
+## Epic 1: Fundacao [P0] [OWNER: claude_code] [MODEL: opus-4-5]
+
+- [x] Story 1.1: Setup do projeto
+- [ ] **Story 1.2:** Autenticacao
+  Descricao da story.
+  - [ ] Criterio de aceite
+
+## Epic 2: Dashboard
+
+- [ ] Story 2.1: Painel principal
+"""
+
+
+class TestBacklogIndex:
+    """Tests for the shared backlog parser (backlog_index.py)."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_parse_lean_and_fat_formats(self):
+        """Epics, tags, stories and checkbox counts are parsed in one pass."""
+        from backlog_index import parse_backlog
+
+        backlog = parse_backlog(SAMPLE_BACKLOG)
+        assert [e.num for e in backlog.epics] == [1, 2]
+        epic = backlog.epic(1)
+        assert (epic.priority, epic.owner, epic.model) == ("P0", "claude_code", "opus-4-5")
+        assert (epic.done, epic.total) == (1, 2)
+        assert [s.id for s in epic.stories] == ["1.1", "1.2"]
+        assert backlog.get("Story 1.2").style == "fat"
+        assert "Descricao da story." in backlog.get("1.2").description
+
+    def test_mark_done_flips_checkbox_and_refreshes_cache(self, tmp_path):
+        """mark_done() patches the byte offset and keeps the cached tree valid."""
+        from backlog_index import load_backlog, mark_done
+
+        path = tmp_path / "BACKLOG.md"
+        path.write_text(SAMPLE_BACKLOG, encoding="utf-8")
+        cache_dir = tmp_path / "cache"
+
+        marked, missing = mark_done(path, ["1.2", "1.1", "9.9"], cache_dir=cache_dir)
+        assert marked == ["1.2"]
+        assert missing == ["1.1", "9.9"]
+        assert "- [x] **Story 1.2:** Autenticacao" in path.read_text(encoding="utf-8")
+
+        fresh = load_backlog(path, cache_dir=cache_dir, use_cache=False)
+        cached = load_backlog(path, cache_dir=cache_dir)
+        assert cached.to_dict() == fresh.to_dict()
+        assert cached.epic(1).done == 2
+
+    def test_bold_story_label_with_colon_after_it(self):
+        """'**Story 1.2**: Title' parses like '**Story 1.2:** Title'; traceability also keeps prose mentions."""
+        from backlog_index import parse_backlog
+        from validate_traceability import extract_stories
+
+        text = ("## Epic 1: Auth\n\n"
+                "### Story 1.1: Login\n"
+                "- [x] **Story 1.2**: Logout flow\n\n"
+                "Depende da **Story 1.3**: Perfil do usuario\n\n"
+                "| Story | Escopo |\n|---|---|\n| **Story 1.4** | Exportacao |\n")
+        backlog = parse_backlog(text)
+        item = backlog.get("1.2")
+        assert (item.title, item.style, item.checked) == ("Logout flow", "fat", True)
+
+        stories = {s["id"]: s["description"] for s in extract_stories(backlog, text)}
+        assert list(stories) == ["Story-1.1", "Story-1.2", "Story-1.3", "Story-1.4"]
+        assert stories["Story-1.2"] == "Logout flow"
+        assert [s["id"] for s in extract_stories(text)] == list(stories)
+        assert [s["id"] for s in extract_stories(backlog)] == ["Story-1.1", "Story-1.2"]
+
+    def test_failed_mark_done_leaves_the_cached_tree_alone(self, tmp_path, monkeypatch):
+        """A write that fails does not mark the memoized tree; a retry still finds the task."""
+        import os
+        import backlog_index
+        from backlog_index import load_backlog, mark_done
+
+        path = tmp_path / "BACKLOG.md"
+        path.write_text(SAMPLE_BACKLOG, encoding="utf-8")
+        os.utime(path, ns=(1, 1))
+        cache_dir = tmp_path / "cache"
+        assert load_backlog(path, cache_dir=cache_dir).get("1.2").checked is False
+
+        def _fail(*_args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(backlog_index.os, "replace", _fail)
+        with pytest.raises(OSError):
+            mark_done(path, ["1.2"], cache_dir=cache_dir)
+        monkeypatch.undo()
+        assert load_backlog(path, cache_dir=cache_dir).get("1.2").checked is False
+        assert load_backlog(path, cache_dir=cache_dir).epic(1).done == 1
+        assert not list(tmp_path.glob(".BACKLOG.md.*.tmp"))
+        assert mark_done(path, ["1.2"], cache_dir=cache_dir) == (["1.2"], [])
+
+    def test_racy_backlog_stamp_is_not_trusted(self, tmp_path):
+        """A same-size edit within the same mtime tick is seen (racy entries are never reused)."""
+        import os
+        from backlog_index import load_backlog
+
+        path = tmp_path / "BACKLOG.md"
+        path.write_text(SAMPLE_BACKLOG, encoding="utf-8")
+        cache_dir = tmp_path / "cache"
+        mtime_ns = path.stat().st_mtime_ns
+        assert load_backlog(path, cache_dir=cache_dir).get("2.1").checked is False
+
+        path.write_text(SAMPLE_BACKLOG.replace("- [ ] Story 2.1", "- [x] Story 2.1"), encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        assert load_backlog(path, cache_dir=cache_dir).get("2.1").checked is True
+
+
+# ===========================================================================
+# 9. Story sharding (shard_epic.py)
+# ===========================================================================
+
+
+class TestShardEpic:
+    """Tests for incremental story generation (shard_epic.py)."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_generate_manifest_skips_unchanged_stories(self, tmp_path, monkeypatch, capsys):
+        """shard_epic generate only rewrites stories whose spec changed."""
+        import shard_epic
+
+        monkeypatch.chdir(tmp_path)
+        backlog = tmp_path / "BACKLOG.md"
+        backlog.write_text(SAMPLE_BACKLOG, encoding="utf-8")
+        output = tmp_path / "stories"
+        args = shard_epic.build_parser().parse_args(
+            ["generate", "--backlog", str(backlog), "--output", str(output)]
+        )
+
+        assert shard_epic.generate_command(args) == 0
+        manifest = shard_epic.load_manifest(output)
+        assert sorted(manifest) == ["1.1", "1.2", "2.1"]
+
+        backlog.write_text(SAMPLE_BACKLOG.replace("Painel principal", "Painel novo"), encoding="utf-8")
+        capsys.readouterr()
+        assert shard_epic.generate_command(args) == 0
+        out = capsys.readouterr().out
+        assert "Atualizados: 1" in out and "Inalterados: 2" in out
+        assert shard_epic.load_manifest(output)["2.1"]["file"] == "STORY-2-1_painel-novo.md"
+
+
+# ===========================================================================
+# 10. Story index (platform_compat.StoryIndex)
+# ===========================================================================
+
+
+class TestStoryIndex:
+    """Tests for the story ID -> file index (platform_compat.StoryIndex)."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_story_index_resolves_and_tracks_changes(self, tmp_path):
+        """StoryIndex maps IDs to files and follows directory changes."""
+        from platform_compat import StoryIndex
+
+        stories = tmp_path / "stories"
+        stories.mkdir()
+        (stories / "STORY-1-1_setup.md").write_text("---\n---\n", encoding="utf-8")
+        (stories / "STORY-1-2_auth.md").write_text("---\n---\n", encoding="utf-8")
+        index = StoryIndex(stories, cache_dir=tmp_path / "cache")
+
+        assert index.get("1.1").name == "STORY-1-1_setup.md"
+        resolved = index.resolve_many(["1.2", "9.9"])
+        assert resolved["1.2"].name == "STORY-1-2_auth.md"
+        assert resolved["9.9"] is None
+
+        (stories / "STORY-1-1_setup.md").rename(stories / "STORY-1-1_setup-v2.md")
+        assert index.get("1.1").name == "STORY-1-1_setup-v2.md"
+
+    def test_record_and_forget_do_not_rescan(self, tmp_path, monkeypatch):
+        """Our own writes update the map in place; only foreign changes rescan."""
+        from platform_compat import StoryIndex
+
+        stories = tmp_path / "stories"
+        stories.mkdir()
+        index = StoryIndex(stories, cache_dir=tmp_path / "cache")
+        scans = []
+        scan = index._scan
+        monkeypatch.setattr(index, "_scan", lambda: scans.append(1) or scan())
+        assert index.all() == {}
+
+        for n in range(200):
+            path = stories / f"STORY-1-{n}_story.md"
+            before_ns = index.snapshot()
+            path.write_text("---\n---\n", encoding="utf-8")
+            index.record(f"1.{n}", path, before_ns)
+        before_ns = index.snapshot()
+        (stories / "STORY-1-0_story.md").unlink()
+        index.forget("1.0", before_ns)
+        assert len(index.all()) == 199
+        assert len(scans) == 1
+
+        (stories / "STORY-2-1_foreign.md").write_text("---\n---\n", encoding="utf-8")
+        before_ns = index.snapshot()
+        (stories / "STORY-3-1_ours.md").write_text("---\n---\n", encoding="utf-8")
+        index.record("3.1", stories / "STORY-3-1_ours.md", before_ns)
+        assert len(scans) == 2
+        assert {"2.1", "3.1"} <= set(index.all())
+
+
+# ===========================================================================
+# 11. Task completion (finish_task.py)
+# ===========================================================================
+
+
+class TestFinishTask:
+    """Tests for batch task completion (finish_task.py)."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_finish_task_batch_marks_all_in_one_pass(self, tmp_path, monkeypatch):
+        """mark_tasks_complete() validates every ID first and writes once."""
+        from finish_task import mark_tasks_complete
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("AGENT_SOURCE", "claude_code")
+        backlog = tmp_path / "BACKLOG.md"
+        backlog.write_text(SAMPLE_BACKLOG, encoding="utf-8")
+
+        ok, messages = mark_tasks_complete(backlog, ["1.2", "9.9"])
+        assert not ok and "9.9" in messages[0]
+        assert backlog.read_text(encoding="utf-8") == SAMPLE_BACKLOG
+
+        ok, messages = mark_tasks_complete(backlog, ["1.1", "1.2", "2.1"])
+        assert ok
+        assert "ja estava concluida" in messages[0]
+        assert backlog.read_text(encoding="utf-8").count("- [ ]") == 1  # only the AC line
+
+    def test_update_story_files_writes_each_story_once(self, tmp_path, monkeypatch):
+        """Status flips to done and downstream stories get the context, one write per file."""
+        from platform_compat import parse_frontmatter_content
+        from shard_epic import _safe_filename, generate_story_content
+        from finish_task import update_story_files
+
+        monkeypatch.chdir(tmp_path)
+        stories_dir = tmp_path / "docs" / "stories"
+        stories_dir.mkdir(parents=True)
+        epic = {"epic_num": 1, "epic_name": "Fundacao"}
+        specs = [
+            ("1.1", "Setup do projeto", [], ["1.2", "1.3"], "Configurou o monorepo\nAdicionou CI"),
+            ("1.2", "Autenticacao", ["1.1"], ["1.3"], ""),
+            ("1.3", "Perfil", ["1.1", "1.2"], [], ""),
+        ]
+        paths = {}
+        for sid, title, depends, unlocks, workspace in specs:
+            paths[sid] = stories_dir / _safe_filename(sid, title)
+            paths[sid].write_text(generate_story_content(
+                {"id": sid, "title": title, "status": "in_progress"}, epic, existing_workspace=workspace,
+                depends_on=depends, unlocks=unlocks), encoding="utf-8")
+
+        writes = []
+        write_text = Path.write_text
+        monkeypatch.setattr(Path, "write_text", lambda self, *a, **kw: writes.append(self.name) or write_text(self, *a, **kw))
+        messages = update_story_files(["1.1", "1.2"])
+
+        assert sorted(writes) == sorted(p.name for p in paths.values())
+        status = {sid: parse_frontmatter_content(p.read_text(encoding="utf-8"))["status"] for sid, p in paths.items()}
+        assert status == {"1.1": "done", "1.2": "done", "1.3": "in_progress"}
+        from_setup = "> Story 1.1 (Setup do projeto): Configurou o monorepo; Adicionou CI"
+        assert from_setup in paths["1.2"].read_text(encoding="utf-8")
+        downstream = paths["1.3"].read_text(encoding="utf-8")
+        assert from_setup in downstream and "> Story 1.2 (Autenticacao): implementada" in downstream
+        assert "contexto sera injetado" not in downstream
+        assert sum("Downstream" in m for m in messages) == 3
+
+        writes.clear()
+        assert all("ja estava 'done'" in m for m in update_story_files(["1.1", "1.2"]))
+        assert writes == []
+
+
+# ===========================================================================
+# 12. Story graph (story_graph.py)
+# ===========================================================================
+
+
+class TestStoryGraph:
+    """Tests for the story dependency graph (story_graph.py)."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_story_graph_ready_order_and_critical_path(self):
+        from story_graph import StoryGraph
+
+        graph = StoryGraph.from_frontmatter({
+            "1.1": (None, {"epic": "1", "status": "done", "unlocks": ["1.2", "1.3"]}),
+            "1.2": (None, {"epic": "1", "status": "pending", "depends_on": ["1.1"]}),
+            "1.3": (None, {"epic": "1", "status": "pending", "depends_on": ["1.1"], "unlocks": ["1.4"]}),
+            "1.4": (None, {"epic": "1", "status": "pending", "depends_on": ["1.3", "9.9"]}),
+        })
+        assert graph.topological_order() == ["1.1", "1.2", "1.3", "1.4"]
+        assert graph.ready() == ["1.2", "1.3"]
+        assert graph.blockers("1.4") == ["1.3", "9.9"]
+        assert graph.critical_paths() == {1: ["1.3", "1.4"]}
+        assert graph.cycles == []
+
+        cyclic = StoryGraph.from_frontmatter({
+            "2.1": (None, {"depends_on": "2.2"}),
+            "2.2": (None, {"depends_on": "2.1"}),
+        })
+        assert cyclic.cycles == [["2.2", "2.1"]]
+        assert cyclic.ready() == []
+
+
+# ===========================================================================
+# 13. Lock manager
+# ===========================================================================
+
+
+class TestLockManager:
+    """Tests for the multi-agent lock manager (lock_manager.py)."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_blocking_acquire_wakes_on_release(self, tmp_path):
+        import threading
+        import time
+        from lock_manager import LockManager
+
+        holder = LockManager(tmp_path)
+        assert holder.acquire("backlog", "claude_code", wait=0)
+        assert LockManager(tmp_path).acquire("backlog", "codex", wait=0.2) is False
+
+        threading.Timer(0.3, holder.release_lock, args=("backlog", "claude_code")).start()
+        waiter = LockManager(tmp_path)
+        t0 = time.monotonic()
+        assert waiter.acquire("backlog", "codex", wait=5)
+        assert time.monotonic() - t0 < 2
+        assert waiter.get_lock_info("backlog")["locked_by"] == "codex"
+
+        assert waiter.release_lock("backlog", "codex")
+        assert waiter.list_active_locks() == {}
+
+    def test_gates_are_removed_with_the_last_holder(self, tmp_path):
+        """Per-story gate files do not pile up in locks_dir once released."""
+        from lock_manager import LockManager, SHARED
+
+        mgr = LockManager(tmp_path)
+        for story in ("3.1", "3.2", "3.3"):
+            assert mgr.acquire(f"backlog/epic-3/story-{story}", "claude_code", wait=0)
+        assert mgr.acquire("backlog/epic-9", "codex", mode=SHARED, wait=0)
+        assert (tmp_path / "backlog" / "epic-3" / "story-3.2.X.gate").exists()
+
+        assert mgr.release_lock("backlog/epic-3/story-3.2", "claude_code")
+        assert not (tmp_path / "backlog" / "epic-3" / "story-3.2.X.gate").exists()
+        assert (tmp_path / "backlog" / "epic-3.IX.gate").exists()  # 3.1 and 3.3 still inside
+
+        for story in ("3.1", "3.3"):
+            assert mgr.release_lock(f"backlog/epic-3/story-{story}", "claude_code")
+        gates = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*.gate"))
+        assert gates == ["backlog.IS.gate", "backlog/epic-9.S.gate"]
+        assert mgr.release_lock("backlog/epic-9", "codex")
+        assert list(tmp_path.rglob("*.gate")) == []
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="flock gates")
+    def test_abandoned_gate_waits_are_bounded(self, tmp_path, monkeypatch):
+        """Timed-out waits park a thread until release; past the cap, waits poll instead."""
+        import time
+        import lock_manager
+        from lock_manager import LockManager
+
+        monkeypatch.setattr(lock_manager, "_MAX_PARKED_WAITERS", 2)
+        holder = LockManager(tmp_path)
+        assert holder.acquire("stories", "claude_code", wait=0)
+        parked = []
+        monkeypatch.setattr(lock_manager, "_flock_wait",
+                            lambda fd, wait, _real=lock_manager._flock_wait: parked.append(fd) or _real(fd, wait))
+        for _ in range(4):
+            assert not LockManager(tmp_path).acquire("stories", "codex", wait=0.1)
+        assert len(parked) == 2 and lock_manager._parked_waiters == 2
+
+        assert holder.release_lock("stories", "claude_code")
+        end = time.monotonic() + 5
+        while lock_manager._parked_waiters and time.monotonic() < end:
+            time.sleep(0.01)
+        assert lock_manager._parked_waiters == 0
+
+    def test_shared_and_hierarchical_modes(self, tmp_path):
+        from lock_manager import LockManager, SHARED
+
+        mgr = LockManager(tmp_path)
+        assert mgr.acquire_lock("backlog", "claude_code", mode=SHARED)
+        assert mgr.acquire_lock("backlog", "codex", mode=SHARED)
+        assert not mgr.acquire_lock("backlog", "antigravity")
+        assert {h["locked_by"] for h in mgr.get_lock_info("backlog")["holders"]} == {"claude_code", "codex"}
+        assert mgr.release_lock("backlog", "claude_code")
+        assert mgr.release_lock("backlog", "codex")
+
+        # Disjoint stories don't block each other; their parents carry intention locks
+        assert mgr.acquire_lock("backlog/epic-3/story-3.2", "claude_code")
+        assert mgr.acquire_lock("backlog/epic-4/story-4.1", "codex")
+        assert not mgr.acquire_lock("backlog/epic-3/story-3.2", "codex")
+        assert not mgr.acquire_lock("backlog", "antigravity", mode=SHARED)
+        assert not mgr.acquire_lock("backlog/epic-3", "antigravity", mode=SHARED)
+        assert mgr.acquire_lock("backlog/epic-3/story-3.3", "antigravity", mode=SHARED)
+        assert sorted(mgr.list_active_locks()) == [
+            "backlog/epic-3/story-3.2", "backlog/epic-3/story-3.3", "backlog/epic-4/story-4.1",
+        ]
+        assert mgr.get_lock_info("backlog")["mode"] == "IX"
+
+        assert not mgr.release_lock("backlog/epic-3/story-3.2", "codex")
+        for resource, agent in [
+            ("backlog/epic-3/story-3.2", "claude_code"),
+            ("backlog/epic-4/story-4.1", "codex"),
+            ("backlog/epic-3/story-3.3", "antigravity"),
+        ]:
+            assert mgr.release_lock(resource, agent)
+        assert mgr.list_active_locks(include_intents=True) == {}
+        assert mgr.acquire_lock("backlog", "antigravity")
+        mgr.release_lock("backlog", "antigravity")
+
+    def test_lease_renewal_and_dead_holder_reclaim(self, tmp_path):
+        import json
+        import subprocess
+        import time
+        from lock_manager import LockManager
+
+        mgr = LockManager(tmp_path)
+        with mgr.hold("stories", "claude_code", timeout=1, renew_every=0.1):
+            time.sleep(1.3)  # Longer than the lease: kept alive by the renewer
+            assert not mgr.acquire_lock("stories", "codex")
+        assert mgr.get_lock_info("stories") is None
+        assert not mgr.renew("stories", "claude_code")
+
+        # A holder whose process is gone is reclaimed without waiting for the lease
+        dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+        assert mgr.acquire_lock("backlog/epic-1/story-1.1", "claude_code")
+        lock_file = tmp_path / "backlog" / "epic-1" / "story-1.1.lock"
+        data = json.loads(lock_file.read_text())
+        for holder in data["holders"]:
+            holder["pid"] = int(dead.stdout)
+        lock_file.write_text(json.dumps(data))
+        assert mgr.acquire_lock("backlog/epic-1/story-1.1", "codex")
+
+    def test_acquire_many_is_all_or_none(self, tmp_path):
+        import threading
+        from lock_manager import LockManager, SHARED
+
+        mgr = LockManager(tmp_path)
+        assert mgr.acquire_lock("stories", "codex")
+        assert not mgr.acquire_many(["stories", "backlog"], "claude_code", wait=0)
+        assert mgr.get_lock_info("backlog") is None  # Nothing held from the failed batch
+        mgr.release_lock("stories", "codex")
+
+        # Overlapping batches in opposite order never deadlock
+        results = []
+
+        def worker(agent, batch):
+            for _ in range(5):
+                with LockManager(tmp_path).hold_many(batch, agent, wait=10):
+                    results.append(agent)
+
+        threads = [
+            threading.Thread(target=worker, args=("claude_code", ["backlog", "stories"])),
+            threading.Thread(target=worker, args=("codex", ["stories", ("backlog", SHARED)])),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=30)
+        assert len(results) == 10
+
+        # Re-entrant per manager: a nested release keeps the outer batch
+        with mgr.hold_many(["backlog", "stories"], "claude_code"):
+            assert mgr.acquire_lock("backlog", "claude_code")
+            assert mgr.release_lock("backlog", "claude_code")
+            assert mgr.get_lock_info("backlog")["locked_by"] == "claude_code"
+        assert mgr.list_active_locks(include_intents=True) == {}
+
+    def test_contention_stats_are_recorded(self, tmp_path):
+        import json
+        from lock_manager import LockManager
+
+        mgr = LockManager(tmp_path)
+        assert mgr.acquire_lock("backlog", "claude_code")
+        assert not mgr.acquire("backlog", "codex", wait=0.1)
+        mgr.release_lock("backlog", "claude_code")
+
+        # An expired holder taken over counts as a steal
+        (tmp_path / "stories.lock").write_text(json.dumps(
+            {"locked_by": "codex", "locked_at": "2020-01-01T00:00:00", "timeout": 1}
+        ))
+        assert mgr.acquire_lock("stories", "claude_code")
+        mgr.release_lock("stories", "claude_code")
+
+        # Nested re-entrant acquires count once, with the outer hold
+        with mgr.hold("plan", "claude_code"):
+            assert mgr.acquire("plan", "claude_code")
+            assert mgr.acquire_lock("plan", "claude_code")
+            mgr.release_lock("plan", "claude_code")
+            mgr.release_lock("plan", "claude_code")
+
+        stats = mgr.lock_stats()
+        assert (stats["plan"]["attempts"], len(stats["plan"]["hold_ms"])) == (1, 1)
+        assert stats["backlog"]["attempts"] == 2
+        assert stats["backlog"]["timeouts"] == 1
+        assert stats["backlog"]["wait_ms"][-1] >= 100
+        assert len(stats["backlog"]["hold_ms"]) == 1
+        assert stats["stories"]["steals"] == 1
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="needs Unix domain sockets")
+    def test_broker_grants_in_fifo_order_and_falls_back_to_files(self, tmp_path):
+        import threading
+        import time
+        from lock_manager import LockManager, SHARED, broker_running
+        from lock_broker import LockBroker
+
+        # A lock taken through the files is carried over when the broker starts
+        assert LockManager(tmp_path).acquire_lock("stories", "antigravity")
+        broker = LockBroker(tmp_path)
+        server = threading.Thread(target=broker.run, daemon=True)
+        server.start()
+        for _ in range(200):
+            if broker_running(tmp_path):
+                break
+            time.sleep(0.01)
+        mgr = LockManager(tmp_path)
+        assert not (tmp_path / "stories.lock").exists()
+        assert mgr.get_lock_info("stories")["locked_by"] == "antigravity"
+
+        # Waiters are served in arrival order: the writer first, then the reader
+        assert mgr.acquire("backlog", "claude_code", wait=0)
+        order = []
+
+        def _worker(agent, mode):
+            worker = LockManager(tmp_path)
+            if worker.acquire("backlog", agent, wait=5, mode=mode):
+                order.append(agent)
+                time.sleep(0.05)
+                worker.release_lock("backlog", agent)
+
+        threads = [threading.Thread(target=_worker, args=args) for args in [("codex", "X"), ("antigravity", SHARED)]]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.1)
+        assert mgr.release_lock("backlog", "claude_code")
+        for thread in threads:
+            thread.join(10)
+        assert order == ["codex", "antigravity"]
+
+        # On shutdown the remaining locks go back to files
+        assert mgr.acquire_lock("backlog/epic-1/story-1.1", "claude_code")
+        broker.stop()
+        server.join(10)
+        assert not broker_running(tmp_path)
+        assert not LockManager(tmp_path).acquire_lock("backlog", "codex")
+        assert mgr.release_lock("backlog/epic-1/story-1.1", "claude_code")
+        assert LockManager(tmp_path).acquire_lock("backlog", "codex")
+
+
+# ===========================================================================
+# 14. Check runner (verify_all.py / _check_runner.py)
+# ===========================================================================
+
+
+class TestCheckRunner:
+    """Tests for the shared check runner and the verify_all scheduler."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    @staticmethod
+    def _job(name, code, after=(), required=True, category="Checks", cwd="."):
+        return {"name": name, "category": category, "required": required, "after": list(after),
+                "cmd": [sys.executable, "-c", code], "cwd": cwd, "timeout": 30}
+
+    def test_independent_checks_overlap_and_dependencies_wait(self, tmp_path):
+        import time
+        from verify_all import run_plan
+
+        stamp = "import time, pathlib; pathlib.Path({!r}).write_text(str(time.time())); time.sleep(0.5)"
+        plan = [
+            self._job("first", stamp.format(str(tmp_path / "first"))),
+            self._job("lint", stamp.format(str(tmp_path / "lint")), after=["first"]),
+            self._job("types", stamp.format(str(tmp_path / "types")), after=["first"]),
+        ]
+        t0 = time.monotonic()
+        results, stopped = run_plan(plan, jobs=3)
+        elapsed = time.monotonic() - t0
+
+        assert not stopped
+        assert [r["name"] for r in results] == ["first", "lint", "types"]
+        assert all(r["passed"] for r in results)
+        started = {name: float((tmp_path / name).read_text()) for name in ("first", "lint", "types")}
+        assert started["lint"] >= started["first"] + 0.5 and started["types"] >= started["first"] + 0.5
+        assert elapsed < 1.5  # lint and types ran side by side
+
+    def test_stop_on_fail_cancels_running_checks(self):
+        import time
+        from verify_all import run_plan
+
+        plan = [
+            self._job("slow", "import time; time.sleep(30)", required=False),
+            self._job("broken", "import sys; sys.exit(1)"),
+            self._job("after", "pass", after=["broken"]),
+        ]
+        t0 = time.monotonic()
+        results, stopped = run_plan(plan, jobs=2, stop_on_fail=True)
+
+        assert stopped
+        assert time.monotonic() - t0 < 10
+        by_name = {r["name"]: r for r in results}
+        assert by_name["slow"].get("cancelled") and by_name["slow"]["skipped"]
+        assert not by_name["broken"]["passed"]
+        assert "after" not in by_name
+
+    def test_check_results_are_cached_by_input_content(self, tmp_path):
+        from _check_runner import expand_inputs, run_check
+
+        (tmp_path / "src" / "lib").mkdir(parents=True)
+        (tmp_path / "src" / "lib" / "a.ts").write_text("export const a = 1\n")
+        (tmp_path / "notes.md").write_text("unrelated\n")
+        (tmp_path / "node_modules" / "x").mkdir(parents=True)
+        (tmp_path / "node_modules" / "x" / "b.ts").write_text("ignored\n")
+        assert [p.name for p in expand_inputs(tmp_path, ["src/**", "*.json", "**/*.ts"])] == ["a.ts"]
+
+        runs = tmp_path / "runs.txt"
+        cmd = [sys.executable, "-c", f"open({str(runs)!r}, 'a').write('x'); print('ok')"]
+        cache_dir = tmp_path / ".agents" / "cache" / "checks"
+
+        def _run():
+            return run_check("Counter", cmd, str(tmp_path), inputs=["src/**"], cache_dir=cache_dir)
+
+        first = _run()
+        assert first["passed"] and not first.get("cached")
+        (tmp_path / "notes.md").write_text("still unrelated\n")
+        second = _run()
+        assert second["cached"] and second["output"] == first["output"]
+        assert runs.read_text() == "x"
+
+        (tmp_path / "src" / "lib" / "a.ts").write_text("export const a = 2\n")
+        assert not _run().get("cached")
+        assert runs.read_text() == "xx"
+        assert not run_check("Counter", cmd, str(tmp_path), inputs=["src/**"]).get("cached")
+
+    def test_check_output_streams_to_log_with_bounded_tail(self, tmp_path):
+        from _check_runner import _TAIL_LINES, run_check
+
+        code = ("import sys\n"
+                "for i in range(1000): print(f'line {i}')\n"
+                "print('boom', file=sys.stderr); sys.exit(3)")
+        log_dir = tmp_path / "logs"
+        result = run_check("Noisy Check", [sys.executable, "-c", code], str(tmp_path),
+                           log_dir=log_dir, echo=False)
+
+        assert not result["passed"] and result["error"] == "boom\n"
+        kept = result["output"].splitlines()
+        assert kept[0] == f"... ({1000 - _TAIL_LINES} earlier line(s) omitted)"
+        assert kept[1:] == [f"line {i}" for i in range(1000 - _TAIL_LINES, 1000)]
+
+        log = Path(result["log"])
+        assert log == log_dir / "noisy-check.log"
+        text = log.read_text()
+        assert "out: line 0\n" in text and "out: line 999\n" in text
+        assert "err: boom\n" in text and "exit code 3" in text
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inspects /proc")
+    def test_timeout_kills_the_whole_process_group(self, tmp_path):
+        from _check_runner import run_check
+
+        pid_file = tmp_path / "grandchild.pid"
+        code = ("import subprocess, sys, time\n"
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+                f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+                "end = time.process_time() + 0.3\n"
+                "while time.process_time() < end: pass\n"
+                "time.sleep(60)")
+        result = run_check("Hang", [sys.executable, "-c", code], str(tmp_path), timeout=2, echo=False)
+
+        assert result["error"] == "Timeout" and result["duration"] < 10
+        assert result["cpu"] >= 0.25 and result["max_rss_mb"] > 1
+
+        stat = Path(f"/proc/{pid_file.read_text()}/stat")
+        # Gone, or a zombie waiting for a reaper that is not ours
+        assert not stat.exists() or stat.read_text().split(")")[1].split()[0] == "Z"
+
+    @staticmethod
+    def _sleeper(pid_file):
+        """Code that starts a grandchild, writes its pid and sleeps."""
+        return ("import subprocess, sys, time\n"
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+                f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+                "time.sleep(60)")
+
+    @staticmethod
+    def _wait_for(path):
+        import time
+
+        end = time.monotonic() + 10
+        while not path.exists() or not path.read_text():
+            assert time.monotonic() < end
+            time.sleep(0.05)
+
+    @staticmethod
+    def _gone(pid):
+        """The process died (SIGKILL lands asynchronously) within a few seconds."""
+        import time
+
+        stat = Path(f"/proc/{pid}/stat")
+        end = time.monotonic() + 5
+        while time.monotonic() < end:
+            try:
+                if stat.read_text().split(")")[1].split()[0] == "Z":
+                    return True
+            except OSError:
+                return True
+            time.sleep(0.05)
+        return False
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inspects /proc")
+    def test_interrupted_check_kills_its_process_group(self, tmp_path):
+        from _check_runner import run_check
+
+        pid_file = tmp_path / "grandchild.pid"
+        wait_for = self._wait_for
+
+        class _CtrlC:
+            """Stands in for the SIGINT the check's own session never gets."""
+
+            def is_set(self):
+                wait_for(pid_file)
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            run_check("Sleep", [sys.executable, "-c", self._sleeper(pid_file)], str(tmp_path),
+                      cancel=_CtrlC(), echo=False)
+        assert self._gone(pid_file.read_text())
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inspects /proc")
+    def test_interrupted_plan_cancels_running_checks(self, tmp_path, monkeypatch):
+        import time
+        import verify_all
+
+        pid_file = tmp_path / "grandchild.pid"
+
+        def _ctrl_c(*_args, **_kwargs):
+            self._wait_for(pid_file)
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(verify_all, "wait", _ctrl_c)
+        t0 = time.monotonic()
+        with pytest.raises(KeyboardInterrupt):
+            verify_all.run_plan([self._job("slow", self._sleeper(pid_file))], jobs=1)
+        assert time.monotonic() - t0 < 10
+        assert self._gone(pid_file.read_text())
+
+
+# ===========================================================================
+# 15. Scan engine (scan_engine.py + skill audit rule sets)
+# ===========================================================================
+
+
+class TestScanEngine:
+    """Tests for the single-walk scan engine and its rule-set plugins."""
+
+    @pytest.fixture(autouse=True)
+    def _add_scripts_to_path(self, agents_root):
+        """Temporarily add .agents/scripts/ to sys.path."""
+        scripts_dir = str(agents_root / "scripts")
+        sys.path.insert(0, scripts_dir)
+        yield
+        sys.path.remove(scripts_dir)
+
+    def test_single_walk_reads_each_file_once_for_all_rule_sets(self, tmp_path, monkeypatch):
+        from scan_engine import RULE_SETS, load_rule_set, run_scan
+
+        (tmp_path / "src" / "app").mkdir(parents=True)
+        (tmp_path / "src" / "app" / "page.tsx").write_text(
+            'const api_key = "abcdefghijklmnop";\nexport default () => <h1>Hello World</h1>\n')
+        (tmp_path / "src" / "util.py").write_text("data = pickle.loads(blob)\n")
+        (tmp_path / "node_modules" / "x").mkdir(parents=True)
+        (tmp_path / "node_modules" / "x" / "index.js").write_text("eval(code)\n")
+
+        reads = []
+        read_text = Path.read_text
+        monkeypatch.setattr(Path, "read_text", lambda self, *a, **kw: reads.append(self.name) or read_text(self, *a, **kw))
+
+        rule_sets = [load_rule_set(name, tmp_path) for name in RULE_SETS]
+        stats = run_scan(tmp_path, rule_sets)
+
+        assert sorted(reads) == ["page.tsx", "util.py"]
+        assert stats["files_read"] == 2
+        assert stats["files_by_rule_set"]["security"] == 2
+
+        security = rule_sets[0].report()
+        assert [f["file"] for f in security["secrets"]["findings"]] == ["src/app/page.tsx"]
+        assert [(f["file"], f["line"]) for f in security["patterns"]["findings"]] == [("src/util.py", 1)]
+        assert not security["passed"]
+        assert all("passed" in rs.report() for rs in rule_sets)
+
+    def test_security_prefilter_matches_the_plain_pattern_scan(self, tmp_path):
+        import re
+        from scan_engine import load_rule_set
+
+        load_rule_set("security", tmp_path)
+        security = sys.modules["_rules_security"]
+        content = "\n".join([
+            'const api_key = "0123456789abcdef"; el.innerHTML = html',
+            'db = "postgres://user:pw@host/db"  # noqa',
+            'x = "a" + name + "b" SELECT * FROM t; eval(code); EXEC(cmd)',
+            'requests.get(url, verify=False)',
+            'paſsword = "hunter22"; data = pickle.loads(blob)',
+            'token: "short"',
+        ])
+
+        expected_secrets = [[name, sev, len(re.findall(p, content, re.IGNORECASE))]
+                            for p, name, sev in security.SECRET_PATTERNS
+                            if re.search(p, content, re.IGNORECASE)]
+        expected_patterns = [[n, name, sev, cat, line.strip()[:80]]
+                             for n, line in enumerate(content.split("\n"), 1)
+                             for p, name, sev, cat in security.DANGEROUS_PATTERNS
+                             if re.search(p, line, re.IGNORECASE)]
+
+        assert security._secrets_in(content) == expected_secrets
+        assert security._patterns_in(content) == expected_patterns
+        assert {row[1] for row in expected_patterns} >= {"eval() usage", "SSL Verify Disabled", "pickle usage"}
+
+    def test_parallel_scan_reports_match_the_serial_scan(self, tmp_path):
+        from scan_engine import RULE_SETS, load_rule_set, run_scan
+
+        for i in range(12):
+            page = tmp_path / "src" / f"page{i:02d}.tsx"
+            page.parent.mkdir(exist_ok=True)
+            page.write_text(f'const password = "secret{i:04d}";\n'
+                            f'<img src="/a{i}.png"/>\n'
+                            f'el.innerHTML = html{i}; eval(code)\n')
+
+        def scan(jobs):
+            rule_sets = [load_rule_set(name, tmp_path) for name in RULE_SETS]
+            stats = run_scan(tmp_path, rule_sets, jobs=jobs)
+            return stats, [rs.report() for rs in rule_sets]
+
+        serial = scan(1)
+        assert serial[0]["files_read"] == 12
+        assert scan(3) == serial
+
+    def test_cached_scan_rescans_only_changed_files(self, tmp_path):
+        import os
+        from scan_engine import SCAN_CACHE_DIR, load_rule_set, run_scan
+
+        src = tmp_path / "src"
+        src.mkdir()
+        for name, text in [("a.py", "eval(code)\n"), ("b.py", "x = 1\n"), ("c.py", "y = 2\n")]:
+            (src / name).write_text(text)
+            os.utime(src / name, ns=(1_000_000_000, 1_000_000_000))
+        cache_dir = tmp_path / SCAN_CACHE_DIR
+
+        def scan(cache=True):
+            rules = load_rule_set("security", tmp_path)
+            stats = run_scan(tmp_path, [rules], cache_dir=cache_dir if cache else None)
+            return stats, rules.report()
+
+        cold = scan()
+        assert (cold[0]["files_read"], cold[0]["files_cached"]) == (3, 0)
+        warm = scan()
+        assert (warm[0]["files_read"], warm[0]["files_cached"]) == (0, 3)
+        assert warm[1] == cold[1]
+
+        (src / "b.py").write_text("pickle.loads(blob)\n")  # Changed
+        os.utime(src / "c.py")                              # Touched only
+        changed = scan()
+        assert (changed[0]["files_read"], changed[0]["files_cached"]) == (2, 1)
+        assert changed[1] == scan(cache=False)[1]
+        assert [f["file"] for f in changed[1]["patterns"]["findings"]] == ["src/a.py", "src/b.py"]
+        assert not any(".agents" in f["file"] for f in changed[1]["secrets"]["findings"])
+
+    def test_scoped_lint_keeps_the_project_lint_script(self, agents_root, tmp_path):
+        """--changed-since never swaps 'npm run lint' for bare eslint; whole-project linters say so."""
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "lint_runner", agents_root / "skills" / "lint-and-validate" / "scripts" / "lint_runner.py")
+        lint_runner = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(lint_runner)
+
+        (tmp_path / "package.json").write_text(json.dumps({
+            "scripts": {"lint": "eslint --max-warnings 0 src"},
+            "devDependencies": {"eslint": "^9", "typescript": "^5"},
+        }))
+        full = lint_runner.detect_project_type(tmp_path)["linters"]
+        scoped = lint_runner.detect_project_type(tmp_path, ["src/a.ts", "README.md"])["linters"]
+        assert [l["cmd"] for l in scoped] == [l["cmd"] for l in full]
+        assert [l["cmd"][:3] for l in scoped] == [["npm", "run", "lint"], ["npx", "tsc", "--noEmit"]]
+        assert all(l.get("note") for l in scoped) and not any(l.get("note") for l in full)
+        assert lint_runner.detect_project_type(tmp_path, ["README.md"])["linters"] == []
+
+    def test_i18n_code_cap_prefers_app_files_like_the_baseline(self, tmp_path):
+        """The capped hardcoded-string audit picks files by extension (.tsx first), not walk order."""
+        from scan_engine import load_rule_set, run_scan
+
+        tools = tmp_path / ".agents" / "scripts"
+        tools.mkdir(parents=True)
+        for i in range(60):
+            (tools / f"tool_{i:02}.py").write_text("x = 1\n")
+        (tmp_path / "web" / "src" / "lib").mkdir(parents=True)
+        (tmp_path / "web" / "src" / "page.tsx").write_text("export default () => <h1>Hello World</h1>\n")
+        (tmp_path / "web" / "src" / "nav.tsx").write_text("export const Nav = () => null\n")
+        for name in ("api.ts", "util.ts"):
+            (tmp_path / "web" / "src" / "lib" / name).write_text("export const x = 1\n")
+
+        # Baseline selection: rglob per extension, in this order, first 50
+        baseline = []
+        for ext in (".tsx", ".jsx", ".ts", ".js", ".vue", ".py"):
+            baseline.extend(f.relative_to(tmp_path).as_posix() for f in tmp_path.rglob(f"*{ext}"))
+        baseline = baseline[:50]
+
+        rules = load_rule_set("i18n", tmp_path)
+        run_scan(tmp_path, [rules])
+        assert len(rules.selected) == len(baseline) == 50
+        assert {p for p in rules.selected if not p.endswith(".py")} == {p for p in baseline if not p.endswith(".py")}
+        report = rules.report()
+        assert not report["passed"]
+        assert any("page.tsx" in issue for issue in report["code"]["issues"])
+
+    def test_scoped_scan_uses_git_changes_and_cached_project_state(self, tmp_path):
+        import os
+        import subprocess
+        from scan_engine import SCAN_CACHE_DIR, changed_paths, load_rule_set, run_scan
+
+        def git(*args):
+            subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+        (tmp_path / "locales" / "en").mkdir(parents=True)
+        (tmp_path / "locales" / "pt").mkdir(parents=True)
+        (tmp_path / "locales" / "en" / "common.json").write_text('{"a": 1, "b": 2}')
+        (tmp_path / "locales" / "pt" / "common.json").write_text('{"a": 1, "b": 2}')
+        (tmp_path / "app.py").write_text("x = 1\n")
+        for name in ("locales/en/common.json", "locales/pt/common.json", "app.py"):
+            os.utime(tmp_path / name, ns=(1, 1))  # Not racy: the full run's stamps hold
+        git("init", "-q")
+        git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+        git("add", ".")
+        git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "files")
+        cache_dir = tmp_path / SCAN_CACHE_DIR
+
+        def scan(only):
+            rule_sets = [load_rule_set(name, tmp_path) for name in ("security", "i18n")]
+            stats = run_scan(tmp_path, rule_sets, cache_dir=cache_dir, only=only)
+            return stats, [rs.report() for rs in rule_sets]
+
+        scan(None)  # Full run fills the cache
+        (tmp_path / "locales" / "pt" / "common.json").write_text('{"a": 1}')
+        os.utime(tmp_path / "locales" / "pt" / "common.json", ns=(2, 2))
+        (tmp_path / "new.py").write_text("eval(code)\n")
+        git("add", "new.py")
+
+        assert changed_paths(tmp_path) is None
+        assert changed_paths(tmp_path, staged=True) == ["new.py"]
+        changed = changed_paths(tmp_path, since="HEAD")
+        assert {"locales/pt/common.json", "new.py"} <= set(changed)
+        with pytest.raises(RuntimeError):
+            changed_paths(tmp_path, since="no-such-ref")
+
+        stats, (security, i18n) = scan(["locales/pt/common.json"])
+        assert stats["files_read"] == 1
+        assert security["patterns"]["findings"] == []
+        # en/common.json comes from the cache, so the missing key is still found
+        assert any("Missing 1 keys" in issue for issue in i18n["locales"]["issues"])
+
+        # An out-of-scope file changed since it was cached is read, not replayed
+        (tmp_path / "locales" / "en" / "common.json").write_text('{"a": 1, "b": 2, "c": 3}')
+        stats, (_, i18n) = scan(["locales/pt/common.json"])
+        assert stats["files_read"] == 1
+        assert any("Missing 2 keys" in issue for issue in i18n["locales"]["issues"])
+
+        stats, (security, _) = scan(changed)
+        assert [f["file"] for f in security["patterns"]["findings"]] == ["new.py"]